@@ -8,7 +8,7 @@ from django.utils import timezone
 
 from cms.bundles.enums import ACTIVE_BUNDLE_STATUS_CHOICES, EDITABLE_BUNDLE_STATUSES, BundleStatus
 from cms.core.forms import DeduplicateInlinePanelAdminForm
-from cms.workflows.models import ReadyToPublishGroupTask
+from cms.workflows.utils import get_pages_ready_to_publish
 
 if TYPE_CHECKING:
     from .models import Bundle
@@ -94,25 +94,23 @@ class BundleAdminForm(DeduplicateInlinePanelAdminForm):
                     raise ValidationError(f"'{page}' is already set as the Release Calendar page for this bundle.")
 
     def _validate_bundled_pages_status(self) -> None:
-        has_pages = False
-        num_pages_not_ready = 0
+        page_forms = []
         for form in self.formsets["bundled_pages"].forms:
             if form.cleaned_data["DELETE"]:
                 continue
 
             if page := form.clean().get("page"):
-                has_pages = True
-                page = page.specific
-                workflow_state = page.current_workflow_state
+                page_forms.append((page.pk, form))
 
-                if not (
-                    workflow_state
-                    and isinstance(workflow_state.current_task_state.task.specific, ReadyToPublishGroupTask)
-                ):
-                    form.add_error("page", "This page is not ready to be published")
-                    num_pages_not_ready += 1
+        # Check the workflow state of all the pages at once, rather than page by page
+        ready_page_ids = get_pages_ready_to_publish(page_id for page_id, _form in page_forms)
+        num_pages_not_ready = 0
+        for page_id, form in page_forms:
+            if page_id not in ready_page_ids:
+                form.add_error("page", "This page is not ready to be published")
+                num_pages_not_ready += 1
 
-        if not has_pages and not self._has_datasets():
+        if not page_forms and not self._has_datasets():
             raise ValidationError("Cannot approve the bundle without any pages or datasets")
 
         if num_pages_not_ready:
@@ -0,0 +1,188 @@
+import logging
+import time
+from typing import Any
+
+import psycopg
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from cms.bundles.enums import BundleStatus
+from cms.bundles.models import Bundle
+from cms.bundles.publishing import BundlePublicationPlan
+from cms.bundles.scheduling import BUNDLE_SCHEDULE_CHANNEL, bundle_publishing_lock, get_bundle_timeline
+from cms.bundles.utils import prepare_bundle_publication, publish_bundle
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Publishes bundles at their release date, as a long-running process.
+
+    Keeps a timeline of the approved bundles in memory and sleeps until the next release date.
+    The timeline is reloaded when a bundle changes, using Postgres LISTEN/NOTIFY, and every
+    BUNDLE_SCHEDULER_RESYNC_INTERVAL seconds in case a notification is missed. A bundle stays
+    approved until it is published, so a bundle that fails, or that is due while the scheduler
+    is not running, is published by a later attempt. Like publish_bundles --include-future, the
+    publication of each bundle is prepared ahead of its release date.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # The release time of each approved bundle, as a timestamp, by bundle id
+        self.timeline: dict[int, float] = {}
+        # When to try publishing the bundles that failed again, by bundle id
+        self.retry_at: dict[int, float] = {}
+        # The plans prepared for the bundles due before the next sync, by bundle id
+        self.publication_plans: dict[int, BundlePublicationPlan] = {}
+        # The database connection LISTEN was issued on. Django replaces it when it reconnects.
+        self.listening_connection: Any = None
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if connection.vendor != "postgresql":
+            raise CommandError("The bundle scheduler needs a PostgreSQL database, to listen for bundle changes.")
+
+        next_sync_at = 0.0
+        while True:
+            # Only bundle changes committed after this are notified, so listen before loading the timeline.
+            # Changes may have been missed while reconnecting, so the timeline is then loaded again.
+            if self.listen():
+                self.stdout.write("Listening for bundle schedule changes")
+                next_sync_at = 0.0
+
+            if time.time() >= next_sync_at:
+                self.sync_timeline()
+                next_sync_at = time.time() + settings.BUNDLE_SCHEDULER_RESYNC_INTERVAL
+
+            self.publish_due_bundles()
+            self.prepare_upcoming_bundles(next_sync_at)
+
+            if self.wait_for_changes(min(next_sync_at, self.get_next_run_at()) - time.time()):
+                next_sync_at = 0.0
+
+    def listen(self) -> bool:
+        """Listens for bundle schedule changes, unless already listening on the current database connection.
+
+        A LISTEN only lasts as long as the connection it was issued on, so it is issued again
+        whenever Django has reconnected to the database.
+
+        Returns:
+            bool: True if LISTEN was issued.
+        """
+        connection.ensure_connection()
+        if connection.connection is self.listening_connection:
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {BUNDLE_SCHEDULE_CHANNEL}")
+        self.listening_connection = connection.connection
+        return True
+
+    def sync_timeline(self) -> None:
+        timeline = get_bundle_timeline()
+        self.timeline = {bundle_id: release_date.timestamp() for bundle_id, release_date in timeline.items()}
+        # Forget the failures of bundles that are no longer scheduled
+        self.retry_at = {bundle_id: at for bundle_id, at in self.retry_at.items() if bundle_id in self.timeline}
+        self.publication_plans = {
+            bundle_id: plan for bundle_id, plan in self.publication_plans.items() if bundle_id in self.timeline
+        }
+
+    def get_next_run_at(self) -> float:
+        """Returns when the next bundle is due, or can be retried."""
+        return min(
+            (max(release_at, self.retry_at.get(bundle_id, 0)) for bundle_id, release_at in self.timeline.items()),
+            default=float("inf"),
+        )
+
+    def publish_due_bundles(self) -> None:
+        now = time.time()
+        due_bundle_ids = [
+            bundle_id
+            for bundle_id, release_at in sorted(self.timeline.items(), key=lambda item: item[1])
+            if release_at <= now and self.retry_at.get(bundle_id, 0) <= now
+        ]
+        for bundle_id in due_bundle_ids:
+            if self.publish_bundle(bundle_id):
+                del self.timeline[bundle_id]
+                self.retry_at.pop(bundle_id, None)
+            else:
+                self.retry_at[bundle_id] = time.time() + settings.BUNDLE_SCHEDULER_RESYNC_INTERVAL
+
+    def prepare_upcoming_bundles(self, until: float) -> None:
+        """Prepares the publication of the bundles due after now and up to the given timestamp.
+
+        Plans are checked when the bundle is published, and prepared again if anything changed since.
+        """
+        now = time.time()
+        for bundle_id, release_at in self.timeline.items():
+            if bundle_id in self.publication_plans or not now < release_at <= until:
+                continue
+            try:
+                self.publication_plans[bundle_id] = prepare_bundle_publication(Bundle.objects.get(pk=bundle_id))
+            except Exception:  # pylint: disable=broad-exception-caught
+                # The bundle is prepared again when it is published
+                logger.exception(
+                    "Failed to prepare bundle publication",
+                    extra={"bundle_id": bundle_id, "event": "prepare_bundle_publication_failed"},
+                )
+
+    def publish_bundle(self, bundle_id: int) -> bool:
+        """Publishes the bundle if it is still approved and due, with its prepared plan if there is one.
+
+        Returns:
+            bool: False if publishing failed, and should be retried.
+        """
+        plan = self.publication_plans.pop(bundle_id, None)
+        try:
+            # Other replicas of the scheduler may be publishing the same bundle.
+            # If they fail, it is still approved, so it is picked up by the next sync.
+            with bundle_publishing_lock(bundle_id) as acquired:
+                if not acquired:
+                    logger.info(
+                        "Bundle is being published by another process",
+                        extra={"bundle_id": bundle_id, "event": "bundle_publishing_locked"},
+                    )
+                    return True
+                bundle = Bundle.objects.annotate_release_date().filter(pk=bundle_id).first()
+                if (
+                    bundle is None
+                    or bundle.status != BundleStatus.APPROVED
+                    or bundle.release_date is None
+                    or bundle.release_date > timezone.now()
+                ):
+                    # Changed since the timeline was loaded, the next sync will pick up any new date
+                    return True
+                publish_bundle(bundle, plan=plan)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Publish failed", extra={"bundle_id": bundle_id, "event": "publish_failed"})
+            return False
+        return True
+
+    def wait_for_changes(self, timeout: float) -> bool:
+        """Waits up to the timeout, in seconds, for a bundle schedule change to be notified.
+
+        If the connection was closed or replaced since LISTEN was issued, this returns straight away,
+        so that the caller listens again.
+
+        Returns:
+            bool: True if a change was notified, or may have been missed.
+        """
+        if connection.connection is None or connection.connection is not self.listening_connection:
+            return True
+        if timeout <= 0:
+            return False
+        try:
+            for notification in connection.connection.notifies(timeout=timeout, stop_after=1):
+                logger.info(
+                    "Bundle schedule changed",
+                    extra={"bundle_id": notification.payload, "event": "bundle_schedule_changed"},
+                )
+                return True
+        except psycopg.OperationalError:
+            logger.exception(
+                "Lost the connection listening for bundle schedule changes",
+                extra={"event": "bundle_schedule_listen_failed"},
+            )
+            connection.close()
+            return True
+        return False
@@ -5,12 +5,13 @@ from datetime import timedelta
 from typing import TYPE_CHECKING, Any
 
 from django.core.management.base import BaseCommand
-from django.db import transaction
 from django.utils import timezone
 
 from cms.bundles.enums import BundleStatus
 from cms.bundles.models import Bundle
-from cms.bundles.utils import publish_bundle
+from cms.bundles.publishing import BundlePublicationPlan
+from cms.bundles.scheduling import bundle_publishing_lock
+from cms.bundles.utils import prepare_bundle_publication, publish_bundle
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,11 @@ if TYPE_CHECKING:
 class Command(BaseCommand):
     """The management command class for bundled publishing."""
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # The plans prepared while waiting for future bundles, by bundle id
+        self.publication_plans: dict[int, BundlePublicationPlan] = {}
+
     def add_arguments(self, parser: "CommandParser") -> None:
         parser.add_argument(
             "--dry-run",
@@ -39,27 +45,49 @@ class Command(BaseCommand):
             ),
         )
 
-    # TODO: revisit after discussion.
-    @transaction.atomic
     def handle_bundle(self, bundle: Bundle) -> None:
         """Manages the bundle publication.
 
         - published related pages
         - updates the release calendar entry
+
+        If the pages are committed in chunks, a failed publication resumes where it stopped when retried.
         """
-        publish_bundle(bundle)
+        publish_bundle(bundle, plan=self.publication_plans.pop(bundle.pk, None))
 
-    def _handle_bundle_action(self, bundle: Bundle) -> None:
+    def _prepare_bundle_action(self, bundle: Bundle) -> None:
         try:
-            # Refresh the bundle immediately before publishing, in case it's changed.
-            bundle.refresh_from_db()
-
-            # Confirm the bundle is still approved
-            if bundle.status != BundleStatus.APPROVED:
-                logger.error("Bundle no longer approved", extra={"bundle_id": bundle.pk})
-                return
+            self.publication_plans[bundle.pk] = prepare_bundle_publication(bundle)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # The bundle is prepared again when it is published
+            logger.exception(
+                "Failed to prepare bundle publication",
+                extra={"bundle_id": bundle.pk, "event": "prepare_bundle_publication_failed"},
+            )
 
-            self.handle_bundle(bundle)
+    def _handle_bundle_action(self, bundle: Bundle) -> None:
+        try:
+            # Other replicas of the scheduler may be publishing the same bundle
+            with bundle_publishing_lock(bundle.pk) as acquired:
+                if not acquired:
+                    logger.info(
+                        "Bundle is being published by another process",
+                        extra={"bundle_id": bundle.pk, "event": "bundle_publishing_locked"},
+                    )
+                    return
+
+                # Refresh the bundle immediately before publishing, in case it's changed.
+                bundle.refresh_from_db()
+
+                # Confirm the bundle is still approved
+                if bundle.status == BundleStatus.PUBLISHED:
+                    logger.info("Bundle already published", extra={"bundle_id": bundle.pk})
+                    return
+                if bundle.status != BundleStatus.APPROVED:
+                    logger.error("Bundle no longer approved", extra={"bundle_id": bundle.pk})
+                    return
+
+                self.handle_bundle(bundle)
         except Exception:  # pylint: disable=broad-exception-caught
             logger.exception("Publish failed", extra={"bundle_id": bundle.pk, "event": "publish_failed"})
 
@@ -102,6 +130,8 @@ class Command(BaseCommand):
                 bundle_ts = bundle.release_date.timestamp()
                 bundle_scheduler.enterabs(bundle_ts, 1, self._handle_bundle_action, argument=(bundle,))
                 if bundle_ts > now_ts:
+                    # Prepare the publication while waiting, after publishing any bundles that are already due
+                    bundle_scheduler.enterabs(now_ts, 0, self._prepare_bundle_action, argument=(bundle,))
                     self.stdout.write(f"Publishing {bundle.name} in {bundle_ts - now_ts:.0f}s")
 
             bundle_scheduler.run()
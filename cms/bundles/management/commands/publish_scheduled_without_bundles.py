@@ -1,14 +1,26 @@
+import itertools
+import logging
 from typing import TYPE_CHECKING, Any
 
 from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import CharField, Exists, OuterRef, Q
+from django.db.models.functions import Cast
 from django.utils import timezone
 from wagtail.models import DraftStateMixin, Page, Revision
 
-from cms.bundles.mixins import BundledPageMixin
+from cms.bundles.enums import ACTIVE_BUNDLE_STATUSES
+from cms.bundles.models import BundlePage
+from cms.private_media.signal_handlers import defer_media_unpublishing
+from cms.search.coalescing import coalesce_search_updates
 
 if TYPE_CHECKING:
     from django.core.management.base import CommandParser
+    from django.db.models import QuerySet
+
+logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
@@ -25,17 +37,23 @@ class Command(BaseCommand):
             default=False,
             help="Dry run -- don't change anything.",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of expired objects to unpublish in each transaction.",
+        )
 
-    def handle(self, *args: Any, **options: dict[str, Any]) -> None:
+    def handle(self, *args: Any, **options: Any) -> None:
         dry_run = False
         if options["dry-run"]:
             self.stdout.write("Will do a dry run.")
             dry_run = True
 
-        self._unpublish_expired(dry_run)
+        self._unpublish_expired(dry_run, batch_size=options["batch_size"])
         self._publish_scheduled_without_bundles(dry_run)
 
-    def _unpublish_expired(self, dry_run: bool) -> None:
+    def _unpublish_expired(self, dry_run: bool, batch_size: int) -> None:
         models = [Page]
         models += [
             model for model in apps.get_models() if issubclass(model, DraftStateMixin) and not issubclass(model, Page)
@@ -67,21 +85,59 @@ class Command(BaseCommand):
         else:
             # Unpublish the expired objects
             for queryset in expired_objects:
-                # Cast to list to make sure the query is fully evaluated
-                # before unpublishing anything
-                for obj in list(queryset):
-                    obj.unpublish(set_expired=True, log_action="wagtail.unpublish.scheduled")
+                self._unpublish_expired_objects(queryset, batch_size)
+
+    def _unpublish_expired_objects(self, queryset: "QuerySet", batch_size: int) -> None:
+        # Cast to list to make sure the query is fully evaluated
+        # before unpublishing anything
+        objects = list(queryset)
+        unpublished_count = 0
+        # Each batch is committed together, with its search index updates sent in one batch,
+        # and the privacy of the media it references updated in one pass
+        for batch in itertools.batched(objects, batch_size, strict=False):
+            with transaction.atomic(), coalesce_search_updates(), defer_media_unpublishing():
+                for obj in batch:
+                    # Each object has its own savepoint, so one that fails to unpublish is rolled back
+                    # on its own, with its search index and media updates, and the others are still unpublished
+                    try:
+                        with transaction.atomic(), coalesce_search_updates(), defer_media_unpublishing():
+                            obj.unpublish(set_expired=True, log_action="wagtail.unpublish.scheduled")
+                    except Exception:  # pylint: disable=broad-exception-caught
+                        logger.exception(
+                            "Failed to unpublish expired object",
+                            extra={
+                                "model": queryset.model.__name__,
+                                "object_id": obj.pk,
+                                "event": "unpublish_expired_object_failed",
+                            },
+                        )
+                    else:
+                        unpublished_count += 1
+        if unpublished_count:
+            logger.info(
+                "Unpublished expired objects",
+                extra={
+                    "model": queryset.model.__name__,
+                    "count": unpublished_count,
+                    "event": "unpublished_expired_objects",
+                },
+            )
 
     def _publish_scheduled_without_bundles(self, dry_run: bool) -> None:
-        # 2. get all revisions that need to be published
-        preliminary_revs_for_publishing = Revision.objects.filter(approved_go_live_at__lt=timezone.now()).order_by(
-            "approved_go_live_at"
+        # 2. get all revisions that need to be published, except those of pages in active bundles,
+        # which are published with their bundle. This is an anti-join, so the revisions are only
+        # deserialized when published.
+        pages_in_active_bundles = (
+            BundlePage.objects.filter(parent__status__in=ACTIVE_BUNDLE_STATUSES)
+            # Revision.object_id is a string, to support any type of primary key
+            .annotate(page_object_id=Cast("page_id", output_field=CharField()))
+            .filter(page_object_id=OuterRef("object_id"))
+        )
+        revs_for_publishing = list(
+            Revision.objects.filter(approved_go_live_at__lt=timezone.now())
+            .exclude(Q(base_content_type=ContentType.objects.get_for_model(Page)) & Exists(pages_in_active_bundles))
+            .order_by("approved_go_live_at")
         )
-        revs_for_publishing = []
-        for rev in preliminary_revs_for_publishing:
-            content_object = rev.as_object()
-            if not isinstance(content_object, BundledPageMixin) or not content_object.in_active_bundle:
-                revs_for_publishing.append(rev)
         if dry_run:
             self.stdout.write("\n---------------------------------")
             if revs_for_publishing:
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("bundles", "0006_bundlepublicationstep"),
+        ("wagtailcore", "0094_alter_page_locale"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bundlepublicationstep",
+            name="revision",
+            field=models.ForeignKey(
+                null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="+", to="wagtailcore.revision"
+            ),
+        ),
+    ]
@@ -25,6 +25,9 @@ class BundledPageMixin:
 
     panels: ClassVar[list[Panel]] = [BundleNotePanel(heading="Bundle", icon="boxes-stacked")]
 
+    # Set on pages loaded with cms.bundles.utils.annotate_active_bundle_id(), e.g. in the page explorer
+    active_bundle_id: int | None
+
     @cached_property
     def bundles(self) -> QuerySet[Bundle]:
         """Return all bundles this instance belongs to."""
@@ -45,10 +48,14 @@ class BundledPageMixin:
 
     @cached_property
     def active_bundle(self) -> Bundle | None:
+        if hasattr(self, "active_bundle_id") and self.active_bundle_id is None:
+            return None
         return self.active_bundles.first()
 
     @cached_property
     def in_active_bundle(self) -> bool:
+        if hasattr(self, "active_bundle_id"):
+            return self.active_bundle_id is not None
         return self.active_bundle is not None
 
     def get_lock(self) -> Optional[BaseLock]:
@@ -18,7 +18,7 @@ from cms.core.widgets import ONSAdminDateTimeInput
 from cms.home.models import HomePage
 from cms.release_calendar.viewsets import FutureReleaseCalendarChooserWidget
 from cms.topics.models import TopicPage
-from cms.workflows.utils import is_page_ready_to_preview, is_page_ready_to_publish
+from cms.workflows.utils import get_pages_ready_to_preview, get_pages_ready_to_publish
 
 from .enums import ACTIVE_BUNDLE_STATUSES, EDITABLE_BUNDLE_STATUSES, PREVIEWABLE_BUNDLE_STATUSES, BundleStatus
 from .forms import BundleAdminForm
@@ -220,7 +220,8 @@ class Bundle(index.Indexed, ClusterableModel, models.Model):  # type: ignore[dja
         if self.status != BundleStatus.IN_REVIEW:
             return False
 
-        return all(is_page_ready_to_publish(page) for page in self.get_bundled_pages())
+        page_ids = set(self.get_bundled_pages().values_list("pk", flat=True))
+        return get_pages_ready_to_publish(page_ids) == page_ids
 
     @property
     def is_ready_to_be_published(self) -> bool:
@@ -252,13 +253,34 @@ class Bundle(index.Indexed, ClusterableModel, models.Model):  # type: ignore[dja
         return pages
 
     def get_pages_for_previewers(self) -> list[Page]:
-        return [
-            page
-            for page in self.get_bundled_pages(specific=True).not_type(PREVIEWER_EXCLUDED_PAGE_TYPES)
-            if is_page_ready_to_preview(page)
-        ]
+        pages = list(self.get_bundled_pages(specific=True).not_type(PREVIEWER_EXCLUDED_PAGE_TYPES))
+        ready_page_ids = get_pages_ready_to_preview(page.pk for page in pages)
+        return [page for page in pages if page.pk in ready_page_ids]
 
     def get_teams_display(self) -> str:
         return ", ".join(
             list(self.teams.values_list("team__name", flat=True)) or ["-"],
         )
+
+
+class BundlePublicationStep(models.Model):
+    """A page published as part of a bundle publication that has not finished yet.
+
+    Together, the steps of a bundle are its publication journal. When pages are published in chunks,
+    each is committed with its steps, so a publication that fails part way is resumed from the
+    pages that are left. A step records the revision that was published, so a page that was edited
+    since is published again. The steps are deleted once the whole bundle is published.
+    """
+
+    bundle = models.ForeignKey(Bundle, on_delete=models.CASCADE, related_name="publication_steps")
+    page = models.ForeignKey("wagtailcore.Page", on_delete=models.CASCADE, related_name="+")
+    revision = models.ForeignKey("wagtailcore.Revision", null=True, on_delete=models.SET_NULL, related_name="+")
+    published_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints: ClassVar[list[models.BaseConstraint]] = [
+            models.UniqueConstraint(fields=["bundle", "page"], name="unique_bundle_publication_step"),
+        ]
+
+    def __str__(self) -> str:
+        return f"BundlePublicationStep: page {self.page_id} in bundle {self.bundle_id}"
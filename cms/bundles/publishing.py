@@ -0,0 +1,262 @@
+import concurrent.futures
+import itertools
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, transaction
+from django.db.models import Q
+from wagtail.models import Page, Revision, WorkflowState
+
+from cms.search.coalescing import coalesce_search_updates
+from cms.workflows.utils import is_page_ready_to_publish
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from cms.bundles.models import Bundle
+    from cms.release_calendar.models import ReleaseCalendarPage
+
+logger = logging.getLogger(__name__)
+
+# The page fields that BundlePublicationPlan.is_current() compares with those of the planned pages:
+# the revision to publish, and the position in the tree, which publishing saves.
+PLANNED_PAGE_FIELDS = ("latest_revision_id", "path", "url_path", "depth")
+
+
+def get_publication_plan(pages: Iterable["Page"]) -> list[list["Page"]]:
+    """Groups the bundled pages into stages, which are published one after the other.
+
+    A page is published in a later stage than any of its ancestors in the bundle, so that it
+    does not go live before its parent. The pages in a stage do not depend on each other.
+    """
+    pages = list(pages)
+    bundled_paths = {page.path for page in pages}
+    stages: defaultdict[int, list[Page]] = defaultdict(list)
+    for page in pages:
+        ancestor_paths = (page.path[:length] for length in range(page.steplen, len(page.path), page.steplen))
+        stages[sum(path in bundled_paths for path in ancestor_paths)].append(page)
+    return [stages[stage] for stage in sorted(stages)]
+
+
+@dataclass(kw_only=True)
+class BundlePublicationPlan:
+    """Everything needed to publish a bundle, resolved ahead of its release time.
+
+    Built by prepare_bundle_publication() while publish_bundles waits for the release, so that only
+    the writes are left to do when the bundle goes live. is_current() checks that nothing the plan
+    relies on has changed since.
+    """
+
+    bundle_id: int
+    bundle_updated_at: "datetime"
+    pages: list["Page"]
+    release_calendar_page: "ReleaseCalendarPage | None" = None
+    release_calendar_content: list[dict[str, Any]] = field(default_factory=list)
+    release_calendar_datasets: list[dict[str, Any]] = field(default_factory=list)
+
+    def is_current(self, bundle: "Bundle") -> bool:
+        """Checks that the bundle, the revisions, the page tree and the workflow states are as they were when planned.
+
+        The pages' position in the tree is checked, as publishing a page that moved since it was
+        planned would save its old path and URL path.
+        """
+        release_calendar_page_id = self.release_calendar_page.pk if self.release_calendar_page else None
+        if (
+            bundle.pk != self.bundle_id
+            or bundle.updated_at != self.bundle_updated_at
+            or bundle.release_calendar_page_id != release_calendar_page_id
+        ):
+            return False
+
+        page_states = {
+            pk: tuple(state)
+            for pk, *state in Page.objects.filter(
+                Q(pk__in=bundle.bundled_pages.values("page")) | Q(pk=release_calendar_page_id)
+            ).values_list("pk", *PLANNED_PAGE_FIELDS)
+        }
+        planned_pages = [*self.pages, self.release_calendar_page] if self.release_calendar_page else self.pages
+        planned_page_states = {
+            page.pk: tuple(getattr(page, field_name) for field_name in PLANNED_PAGE_FIELDS) for page in planned_pages
+        }
+        if page_states != planned_page_states:
+            return False
+
+        current_task_state_ids = dict(
+            WorkflowState.objects.active()
+            .filter(
+                base_content_type=ContentType.objects.get_for_model(Page),
+                object_id__in=[str(page.pk) for page in self.pages],
+            )
+            .values_list("object_id", "current_task_state_id")
+        )
+        planned_task_state_ids = {
+            str(page.pk): workflow_state.current_task_state_id
+            for page in self.pages
+            if (workflow_state := page.current_workflow_state)
+        }
+        return current_task_state_ids == planned_task_state_ids
+
+
+def prepare_bundled_pages(bundle: "Bundle", pages: Iterable["Page"]) -> list["Page"]:
+    """Loads what publish_bundled_page() needs ahead of time, and logs any page that is not ready to publish.
+
+    The pages should have their latest revision selected and their workflow states prefetched. The relations
+    that Wagtail follows to the revision to publish are cached on the loaded objects, so publishing the pages
+    does not load them again.
+    """
+    pages = list(pages)
+    # Wagtail finishes workflows through the generic page, rather than the specific one
+    base_pages = Page.objects.in_bulk([page.pk for page in pages if page.current_workflow_state])
+    for page in pages:
+        if revision := page.latest_revision:
+            Revision.content_object.set_cached_value(revision, page)
+
+        if workflow_state := page.current_workflow_state:
+            base_page = base_pages[page.pk]
+            base_page.latest_revision = revision
+            WorkflowState.content_object.set_cached_value(workflow_state, base_page)
+            task_state = workflow_state.current_task_state
+            task_state.workflow_state = workflow_state
+            if revision and task_state.revision_id == revision.pk:
+                task_state.revision = revision
+            if not is_page_ready_to_publish(page):
+                logger.warning(
+                    "Bundled page is not ready to publish",
+                    extra={"bundle_id": bundle.pk, "page_id": page.pk, "event": "bundled_page_not_ready"},
+                )
+        elif not revision:
+            logger.warning(
+                "Bundled page is not in a workflow and has no revisions, so will not be published",
+                extra={"bundle_id": bundle.pk, "page_id": page.pk, "event": "bundled_page_not_ready"},
+            )
+    return pages
+
+
+def publish_bundled_page(bundle: "Bundle", page: "Page") -> bool:
+    """Publishes the page in its own transaction, by finishing its workflow if it is in one,
+    and records it in the bundle publication journal.
+
+    Returns:
+        bool: False if the page was not published as it is not in a workflow and has no revisions.
+    """
+    from cms.bundles.models import BundlePublicationStep  # pylint: disable=import-outside-toplevel
+
+    with transaction.atomic():
+        if workflow_state := page.current_workflow_state:
+            # finish the workflow
+            workflow_state.current_task_state.approve()
+        elif page.latest_revision:
+            # just run publish
+            page.latest_revision.publish(log_action="wagtail.publish.scheduled")
+        else:
+            logger.error(
+                "Did not publish page as it is not in a workflow or has no revisions",
+                extra={
+                    "bundle_id": bundle.pk,
+                    "page_id": page.pk,
+                    "event": "publish_page_failed",
+                },
+            )
+            return False
+        BundlePublicationStep.objects.update_or_create(
+            bundle=bundle, page=page, defaults={"revision": page.latest_revision}
+        )
+    return True
+
+
+def get_pages_left_to_publish(bundle: "Bundle", pages: Iterable["Page"]) -> list["Page"]:
+    """Returns the pages that are not in the bundle's publication journal at their latest revision.
+
+    Pages journaled at an older revision, e.g. edited after a failed publication, before the bundle
+    was approved again, are published again.
+    """
+    from cms.bundles.models import BundlePublicationStep  # pylint: disable=import-outside-toplevel
+
+    pages = list(pages)
+    if not (
+        published_revision_ids := dict(
+            BundlePublicationStep.objects.filter(bundle=bundle).values_list("page_id", "revision_id")
+        )
+    ):
+        return pages
+
+    published_page_ids = {
+        page.pk
+        for page in pages
+        if page.pk in published_revision_ids and published_revision_ids[page.pk] == page.latest_revision_id
+    }
+    logger.info(
+        "Resuming bundle publication",
+        extra={
+            "bundle_id": bundle.pk,
+            "published_page_count": len(published_page_ids),
+            "event": "resuming_bundle_publication",
+        },
+    )
+    return [page for page in pages if page.pk not in published_page_ids]
+
+
+def publish_bundled_pages(
+    bundle: "Bundle", pages: Iterable["Page"], *, max_workers: int, chunk_size: int
+) -> dict[int, float]:
+    """Publishes the pages following get_publication_plan(), skipping those already in the publication journal
+    at their latest revision.
+
+    The pages are published in plan order, in one transaction, sending their search index updates in one batch.
+    Publishing in chunks or in parallel is opt-in, and gives up on publishing the pages atomically:
+    with a chunk_size, the pages are committed in chunks of chunk_size pages. If a page fails, its chunk is
+    rolled back, and the publication resumes from that chunk when retried. With more than one worker, the pages
+    of each stage are published concurrently in a thread pool, and each thread uses its own database connection,
+    so each page is committed on its own. If a page fails to publish, the error is raised once its stage is done,
+    and the later stages are not started. Either way, the pages already committed stay live.
+
+    Returns:
+        dict[int, float]: How long each published page took to publish, in seconds, keyed by page id.
+    """
+    timings: dict[int, float] = {}
+    pages = get_pages_left_to_publish(bundle, pages)
+
+    def publish(page: "Page") -> None:
+        start_time = time.time()
+        if not publish_bundled_page(bundle, page):
+            return
+        timings[page.pk] = time.time() - start_time
+        logger.info(
+            "Published bundled page",
+            extra={
+                "bundle_id": bundle.pk,
+                "page_id": page.pk,
+                "duration": round(timings[page.pk] * 1000, 3),
+                "event": "published_bundle_page",
+            },
+        )
+
+    def publish_in_thread(page: "Page") -> None:
+        # Threads do not inherit the caller's search update buffer, and each commits its page on
+        # its own connection, so each page's search index updates are buffered separately.
+        try:
+            with coalesce_search_updates():
+                publish(page)
+        finally:
+            connections.close_all()
+
+    plan = get_publication_plan(pages)
+    if max_workers <= 1:
+        ordered_pages = list(itertools.chain.from_iterable(plan))
+        chunks = itertools.batched(ordered_pages, chunk_size, strict=False) if chunk_size else [ordered_pages]
+        for chunk in chunks:
+            with transaction.atomic(), coalesce_search_updates():
+                for page in chunk:
+                    publish(page)
+        return timings
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for stage in plan:
+            for future in [executor.submit(publish_in_thread, page) for page in stage]:
+                future.result()
+    return timings
@@ -0,0 +1,46 @@
+import logging
+from datetime import datetime
+
+import pglock
+from django.db import connection
+
+from cms.bundles.enums import BundleStatus
+from cms.bundles.models import Bundle
+
+logger = logging.getLogger(__name__)
+
+# The Postgres channel the bundle scheduler listens on for changes to the bundle schedule
+BUNDLE_SCHEDULE_CHANNEL = "bundle_schedule"
+
+
+def notify_bundle_schedule_changed(bundle_id: int) -> None:
+    """Tells the bundle scheduler to reload its timeline, using Postgres NOTIFY.
+
+    Inside a transaction, Postgres only delivers the notification once it commits,
+    so the scheduler never reads the schedule before the change is visible.
+    Does nothing on other databases.
+    """
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [BUNDLE_SCHEDULE_CHANNEL, str(bundle_id)])
+
+
+def get_bundle_timeline() -> dict[int, datetime]:
+    """Returns the release date of each approved bundle that has one, keyed by bundle id."""
+    return dict(
+        Bundle.objects.filter(status=BundleStatus.APPROVED, release_date__isnull=False)
+        .annotate_release_date()
+        .values_list("pk", "release_date")
+    )
+
+
+def bundle_publishing_lock(bundle_id: int) -> pglock.advisory:
+    """Returns a Postgres advisory lock on the publication of the bundle, held by the database session.
+
+    Use it as a context manager, which gives whether the lock was acquired, without waiting if another
+    process is publishing the bundle. The lock is not tied to a transaction, as the bundle pages
+    may be committed in chunks while it is held. Once the lock is acquired, the bundle should be read again,
+    as another process may have just published it.
+    """
+    return pglock.advisory(f"{__name__}.publish_bundle.{bundle_id}", timeout=0)
@@ -1,11 +1,14 @@
 from typing import Any
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from wagtail.signals import page_published
 
 from cms.bundles.enums import BundleStatus
 from cms.bundles.models import Bundle, BundleTeam
 from cms.bundles.notifications.email import send_bundle_in_review_email, send_bundle_published_email
+from cms.bundles.scheduling import notify_bundle_schedule_changed
+from cms.release_calendar.models import ReleaseCalendarPage
 
 
 @receiver(post_save, sender=BundleTeam)
@@ -39,3 +42,17 @@ def handle_bundle_publication(instance: Bundle, **kwargs: Any) -> None:
         ]
         for bundle_team in active_bundle_teams:
             send_bundle_published_email(bundle_team=bundle_team)
+
+
+@receiver(post_save, sender=Bundle)
+@receiver(post_delete, sender=Bundle)
+def handle_bundle_schedule_change(instance: Bundle, **kwargs: Any) -> None:
+    """Tells the bundle scheduler when a bundle's status or date may have changed."""
+    notify_bundle_schedule_changed(instance.pk)
+
+
+@receiver(page_published, sender=ReleaseCalendarPage)
+def handle_release_calendar_page_published(instance: ReleaseCalendarPage, **kwargs: Any) -> None:
+    """Tells the bundle scheduler when the release date of an approved bundle may have changed."""
+    for bundle_id in instance.bundles.filter(status=BundleStatus.APPROVED).values_list("pk", flat=True):
+        notify_bundle_schedule_changed(bundle_id)
@@ -7,7 +7,8 @@ from django.core.management import call_command
 from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
-from wagtail.models import ModelLogEntry, PageLogEntry
+from wagtail.models import ModelLogEntry, Page, PageLogEntry
+from wagtail.signals import unpublished
 
 from cms.articles.tests.factories import StatisticalArticlePageFactory
 from cms.bundles.enums import BundleStatus
@@ -17,6 +18,8 @@ from cms.home.models import HomePage
 from cms.methodology.tests.factories import MethodologyPageFactory
 from cms.release_calendar.enums import ReleaseStatus
 from cms.release_calendar.tests.factories import ReleaseCalendarPageFactory
+from cms.search.publishers import LogPublisher
+from cms.search.utils import build_page_uri
 from cms.workflows.models import ReadyToPublishGroupTask
 from cms.workflows.tests.utils import mark_page_as_ready_to_publish
 
@@ -104,6 +107,30 @@ class PublishBundlesCommandTestCase(TestCase):
         self.assertEqual(ModelLogEntry.objects.filter(action="wagtail.publish.scheduled").count(), 1)
         self.assertEqual(PageLogEntry.objects.filter(action="wagtail.publish.scheduled").count(), 2)
 
+    @patch("cms.search.signal_handlers.get_publisher")
+    def test_publish_bundle_sends_search_updates_in_one_batch(self, mock_get_publisher):
+        publisher = mock_get_publisher.return_value = LogPublisher()
+        another_page = StatisticalArticlePageFactory(title="Another Statistical Article", live=False)
+        another_page.save_revision()
+        BundlePageFactory(parent=self.bundle, page=self.statistical_article)
+        BundlePageFactory(parent=self.bundle, page=another_page)
+
+        with (
+            patch.object(publisher, "publish_messages") as mock_publish_messages,
+            patch.object(publisher, "flush") as mock_flush,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.call_command()
+
+        mock_publish_messages.assert_called_once()
+        channel, messages = mock_publish_messages.call_args.args
+        self.assertEqual(channel, "search-content-updated")
+        self.assertEqual(
+            [message["uri"] for message in messages],
+            [build_page_uri(self.statistical_article), build_page_uri(another_page)],
+        )
+        mock_flush.assert_called_once()
+
     @override_settings(SLACK_NOTIFICATIONS_WEBHOOK_URL="https://slack.example.com")
     @patch("cms.bundles.notifications.slack.notify_slack_of_publication_start")
     @patch("cms.bundles.notifications.slack.notify_slack_of_publish_end")
@@ -242,6 +269,23 @@ class PublishBundlesCommandTestCase(TestCase):
         self.assertIn("Found 1 bundle(s) to publish", self.stdout.getvalue())
         self.assertIn(f"Publishing {self.bundle.name} in", self.stdout.getvalue())
 
+    @patch("cms.bundles.management.commands.publish_bundles.publish_bundle")
+    def test_publish_bundle_include_future_prepares_the_publication(self, mock_publish_bundle):
+        BundlePageFactory(parent=self.bundle, page=self.statistical_article)
+
+        with time_machine.travel(self.publication_date - timedelta(seconds=2)):
+            self.call_command(include_future=2)
+
+        mock_publish_bundle.assert_called_once()
+        plan = mock_publish_bundle.call_args.kwargs["plan"]
+        self.assertEqual([page.pk for page in plan.pages], [self.statistical_article.pk])
+
+    @patch("cms.bundles.management.commands.publish_bundles.publish_bundle")
+    def test_publish_bundle_due_now_is_not_prepared_in_advance(self, mock_publish_bundle):
+        self.call_command()
+
+        mock_publish_bundle.assert_called_once_with(self.bundle, plan=None)
+
     @patch("cms.bundles.management.commands.publish_bundles.Command.handle_bundle")
     def test_publish_bundle_include_future_with_bundle_in_past(self, mock_handle_bundle):
         with time_machine.travel(self.publication_date + timedelta(days=1)):
@@ -322,3 +366,117 @@ class PublishScheduledWithoutBundlesCommandTestCase(TestCase):
         self.call_command()
 
         self.assertEqual(PageLogEntry.objects.filter(action="wagtail.publish.scheduled").count(), 1)
+
+    def test_publish_scheduled_without_bundles__page_in_inactive_bundle(self):
+        """Checks a scheduled page is published if its bundle is no longer active."""
+        page = StatisticalArticlePageFactory(live=False)
+        BundleFactory(published=True, bundled_pages=[page])
+        page.save_revision(approved_go_live_at=self.publication_date)
+
+        self.call_command()
+
+        page.refresh_from_db()
+        self.assertTrue(page.live)
+        self.statistical_article.refresh_from_db()
+        self.assertFalse(self.statistical_article.live)
+
+    def test_dry_run__does_not_deserialize_revisions(self):
+        """Checks bundled revisions are excluded in the query, rather than by loading each of them."""
+        self.home.save_revision(approved_go_live_at=self.publication_date)
+
+        with patch("wagtail.models.Revision.as_object") as mock_as_object:
+            self.call_command(dry_run=True)
+
+        mock_as_object.assert_not_called()
+        output = self.stdout.getvalue()
+        self.assertIn(self.home.title, output)
+        self.assertNotIn(self.statistical_article.title, output)
+
+    @patch("cms.private_media.signal_handlers.make_unused_media_private")
+    def test_expired_pages_are_unpublished_in_batches(self, mock_make_unused_media_private):
+        expired_pages = [
+            StatisticalArticlePageFactory(expire_at=timezone.now() - timedelta(minutes=1)) for _ in range(3)
+        ]
+
+        with self.assertLogs("cms.bundles.management.commands.publish_scheduled_without_bundles") as logs:
+            self.call_command(batch_size=2)
+
+        for page in expired_pages:
+            page.refresh_from_db()
+            self.assertFalse(page.live)
+            self.assertTrue(page.expired)
+        self.assertEqual(PageLogEntry.objects.filter(action="wagtail.unpublish.scheduled").count(), 3)
+        # The media referenced by each batch is made private in one pass
+        self.assertEqual(mock_make_unused_media_private.call_count, 2)
+        self.assertEqual([len(call.args[0]) for call in mock_make_unused_media_private.call_args_list], [2, 1])
+        self.assertEqual(logs.records[0].event, "unpublished_expired_objects")
+        self.assertEqual(logs.records[0].count, 3)
+
+    def test_failing_expired_page_does_not_stop_the_others(self):
+        expired_pages = [
+            StatisticalArticlePageFactory(expire_at=timezone.now() - timedelta(minutes=3 - i)) for i in range(3)
+        ]
+        failing_page = expired_pages[0]
+        real_unpublish = Page.unpublish
+
+        def unpublish(page, *args, **kwargs):
+            if page.pk == failing_page.pk:
+                raise RuntimeError("Unpublish failed")
+            return real_unpublish(page, *args, **kwargs)
+
+        self.home.save_revision(approved_go_live_at=self.publication_date)
+
+        with (
+            patch.object(Page, "unpublish", autospec=True, side_effect=unpublish),
+            self.assertLogs("cms.bundles.management.commands.publish_scheduled_without_bundles") as logs,
+        ):
+            self.call_command(batch_size=2)
+
+        failing_page.refresh_from_db()
+        self.assertTrue(failing_page.live)
+        for page in expired_pages[1:]:
+            page.refresh_from_db()
+            self.assertFalse(page.live)
+        self.assertEqual(
+            [(record.event, getattr(record, "count", None)) for record in logs.records],
+            [("unpublish_expired_object_failed", None), ("unpublished_expired_objects", 2)],
+        )
+        # The scheduled publications still go ahead
+        self.assertEqual(PageLogEntry.objects.filter(action="wagtail.publish.scheduled").count(), 1)
+
+    @patch("cms.private_media.signal_handlers.make_unused_media_private")
+    @patch("cms.search.signal_handlers.get_publisher")
+    def test_failing_expired_page_updates_are_discarded(self, mock_get_publisher, mock_make_unused_media_private):
+        publisher = mock_get_publisher.return_value = LogPublisher()
+        expired_pages = [
+            StatisticalArticlePageFactory(expire_at=timezone.now() - timedelta(minutes=2 - i)) for i in range(2)
+        ]
+        failing_page = expired_pages[0]
+
+        def fail_on_unpublished(instance, **kwargs):
+            # Sent after page_unpublished, so after the search index and media updates are deferred
+            if instance.pk == failing_page.pk:
+                raise RuntimeError("Unpublish failed")
+
+        unpublished.connect(fail_on_unpublished)
+        self.addCleanup(unpublished.disconnect, fail_on_unpublished)
+
+        with (
+            patch.object(publisher, "publish_messages") as mock_publish_messages,
+            self.captureOnCommitCallbacks(execute=True),
+            self.assertLogs("cms.bundles.management.commands.publish_scheduled_without_bundles"),
+        ):
+            self.call_command()
+
+        failing_page.refresh_from_db()
+        self.assertTrue(failing_page.live)
+        mock_publish_messages.assert_called_once()
+        self.assertEqual(
+            [message["uri"] for message in mock_publish_messages.call_args.args[1]],
+            [expired_pages[1].url_path],
+        )
+        mock_make_unused_media_private.assert_called_once()
+        self.assertEqual(
+            [obj.pk for obj in mock_make_unused_media_private.call_args.args[0]],
+            [expired_pages[1].pk],
+        )
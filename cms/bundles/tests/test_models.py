@@ -59,6 +59,16 @@ class BundleModelTestCase(TestCase):
         mark_page_as_ready_to_publish(self.statistical_article, UserFactory())
         self.assertTrue(self.bundle.can_be_approved)
 
+    def test_can_be_approved__queries_do_not_grow_with_the_pages(self):
+        self.bundle.status = BundleStatus.IN_REVIEW
+        for page in [self.statistical_article, *StatisticalArticlePageFactory.create_batch(3)]:
+            BundlePageFactory(parent=self.bundle, page=page)
+            mark_page_as_ready_to_publish(page, UserFactory())
+
+        # The bundled page ids, then the current task of all the pages
+        with self.assertNumQueries(2):
+            self.assertTrue(self.bundle.can_be_approved)
+
     def test_get_bundled_pages(self):
         """Test get_bundled_pages returns correct queryset."""
         BundlePageFactory(parent=self.bundle, page=self.statistical_article)
@@ -0,0 +1,352 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from wagtail.models import Page
+
+from cms.articles.tests.factories import StatisticalArticlePageFactory
+from cms.bundles.enums import BundleStatus
+from cms.bundles.models import BundlePublicationStep
+from cms.bundles.publishing import get_publication_plan, publish_bundled_page, publish_bundled_pages
+from cms.bundles.tests.factories import BundleFactory, BundlePageFactory
+from cms.bundles.utils import prepare_bundle_publication, publish_bundle
+from cms.core.tests import TransactionTestCase
+from cms.release_calendar.enums import ReleaseStatus
+from cms.release_calendar.tests.factories import ReleaseCalendarPageFactory
+from cms.standard_pages.tests.factories import IndexPageFactory, InformationPageFactory
+from cms.workflows.tests.utils import mark_page_as_ready_for_review, mark_page_as_ready_to_publish
+
+
+class PublicationPlanTestCase(SimpleTestCase):
+    def test_pages_are_published_after_their_bundled_ancestors(self):
+        parent = SimpleNamespace(path="00010001", steplen=Page.steplen)
+        child = SimpleNamespace(path="000100010001", steplen=Page.steplen)
+        grandchild = SimpleNamespace(path="0001000100010001", steplen=Page.steplen)
+        # The parent of this one is not in the bundle
+        cousin = SimpleNamespace(path="000100020001", steplen=Page.steplen)
+        unrelated = SimpleNamespace(path="00010003", steplen=Page.steplen)
+
+        plan = get_publication_plan([grandchild, cousin, child, unrelated, parent])
+
+        self.assertEqual(plan, [[cousin, unrelated, parent], [child], [grandchild]])
+
+    def test_no_pages(self):
+        self.assertEqual(get_publication_plan([]), [])
+
+
+class PublishBundledPagesTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.bundle = BundleFactory(approved=True)
+
+    def setUp(self):
+        self.index_page = IndexPageFactory(live=False)
+        self.index_page.save_revision()
+        self.page = InformationPageFactory(parent=self.index_page, live=False)
+        self.page.save_revision()
+        self.article = StatisticalArticlePageFactory(live=False)
+        self.article.save_revision()
+
+    def get_pages(self):
+        return Page.objects.filter(pk__in=[self.index_page.pk, self.page.pk, self.article.pk]).specific()
+
+    def test_publishes_the_pages_and_reports_their_timings(self):
+        with self.assertLogs("cms.bundles.publishing", level="INFO") as logs:
+            timings = publish_bundled_pages(self.bundle, self.get_pages(), max_workers=1, chunk_size=50)
+
+        self.assertEqual(set(timings), {self.index_page.pk, self.page.pk, self.article.pk})
+        for page in (self.index_page, self.page, self.article):
+            page.refresh_from_db()
+            self.assertTrue(page.live)
+        logged_page_ids = [record.page_id for record in logs.records if record.event == "published_bundle_page"]
+        self.assertCountEqual(logged_page_ids, timings)
+        # The information page is published after its parent
+        self.assertEqual(logged_page_ids[-1], self.page.pk)
+
+    def test_pages_without_revisions_are_not_published(self):
+        page = InformationPageFactory(live=False)
+        page.latest_revision = None
+
+        with self.assertLogs("cms.bundles.publishing", level="ERROR"):
+            timings = publish_bundled_pages(self.bundle, [page], max_workers=1, chunk_size=50)
+
+        self.assertEqual(timings, {})
+
+    def test_failure_stops_later_stages(self):
+        with (
+            patch("cms.bundles.publishing.publish_bundled_page", side_effect=RuntimeError("Publish failed")) as mock,
+            self.assertRaisesMessage(RuntimeError, "Publish failed"),
+        ):
+            publish_bundled_pages(self.bundle, self.get_pages(), max_workers=1, chunk_size=50)
+
+        mock.assert_called_once()
+
+    def test_published_pages_are_journaled(self):
+        publish_bundled_pages(self.bundle, self.get_pages(), max_workers=1, chunk_size=2)
+
+        self.assertCountEqual(
+            self.bundle.publication_steps.values_list("page_id", flat=True),
+            [self.index_page.pk, self.page.pk, self.article.pk],
+        )
+
+    def test_failed_chunk_is_rolled_back_and_resumed(self):
+        real_publish_bundled_page = publish_bundled_page
+
+        def fail_on_article(bundle, page):
+            if page.pk == self.article.pk:
+                raise RuntimeError("Publish failed")
+            return real_publish_bundled_page(bundle, page)
+
+        with (
+            patch("cms.bundles.publishing.publish_bundled_page", side_effect=fail_on_article),
+            self.assertRaisesMessage(RuntimeError, "Publish failed"),
+        ):
+            publish_bundled_pages(self.bundle, self.get_pages(), max_workers=1, chunk_size=50)
+
+        # The index page was published in the same chunk as the article, so it is rolled back
+        self.index_page.refresh_from_db()
+        self.assertFalse(self.index_page.live)
+        self.assertFalse(self.bundle.publication_steps.exists())
+
+        timings = publish_bundled_pages(self.bundle, self.get_pages(), max_workers=1, chunk_size=50)
+
+        self.assertEqual(set(timings), {self.index_page.pk, self.page.pk, self.article.pk})
+
+    def test_pages_are_published_in_one_transaction_without_a_chunk_size(self):
+        real_publish_bundled_page = publish_bundled_page
+
+        def fail_on_child(bundle, page):
+            if page.pk == self.page.pk:
+                raise RuntimeError("Publish failed")
+            return real_publish_bundled_page(bundle, page)
+
+        with (
+            patch("cms.bundles.publishing.publish_bundled_page", side_effect=fail_on_child),
+            self.assertRaisesMessage(RuntimeError, "Publish failed"),
+        ):
+            publish_bundled_pages(self.bundle, self.get_pages(), max_workers=1, chunk_size=0)
+
+        # The parent is published in an earlier stage, but committed with its child
+        self.index_page.refresh_from_db()
+        self.assertFalse(self.index_page.live)
+
+    def test_bundle_is_published_atomically_by_default(self):
+        release_calendar_page = ReleaseCalendarPageFactory()
+        bundle = BundleFactory(approved=True, release_calendar_page=release_calendar_page)
+        BundlePageFactory(parent=bundle, page=self.index_page)
+        BundlePageFactory(parent=bundle, page=self.page)
+
+        with (
+            patch(
+                "cms.bundles.utils.update_bundle_linked_release_calendar_page",
+                side_effect=RuntimeError("Release calendar update failed"),
+            ),
+            self.assertRaisesMessage(RuntimeError, "Release calendar update failed"),
+        ):
+            publish_bundle(bundle)
+
+        # Nothing is published, as the pages are committed with the release calendar page
+        for page in (self.index_page, self.page):
+            page.refresh_from_db()
+            self.assertFalse(page.live)
+        self.assertFalse(bundle.publication_steps.exists())
+        bundle.refresh_from_db()
+        self.assertEqual(bundle.status, BundleStatus.APPROVED)
+
+    @override_settings(BUNDLE_PUBLISHING_CHUNK_SIZE=1)
+    def test_committed_pages_stay_live_when_the_bundle_fails_to_publish(self):
+        release_calendar_page = ReleaseCalendarPageFactory()
+        bundle = BundleFactory(approved=True, release_calendar_page=release_calendar_page)
+        BundlePageFactory(parent=bundle, page=self.index_page)
+        BundlePageFactory(parent=bundle, page=self.page)
+        real_publish_bundled_page = publish_bundled_page
+
+        def fail_on_child(bundle, page):
+            if page.pk == self.page.pk:
+                raise RuntimeError("Publish failed")
+            return real_publish_bundled_page(bundle, page)
+
+        with (
+            patch("cms.bundles.publishing.publish_bundled_page", side_effect=fail_on_child),
+            self.assertRaisesMessage(RuntimeError, "Publish failed"),
+        ):
+            publish_bundle(bundle)
+
+        # The bundle is partly published: the first chunk is live, but not the release calendar page
+        self.index_page.refresh_from_db()
+        self.assertTrue(self.index_page.live)
+        self.page.refresh_from_db()
+        self.assertFalse(self.page.live)
+        release_calendar_page.refresh_from_db()
+        self.assertNotEqual(release_calendar_page.status, ReleaseStatus.PUBLISHED)
+        bundle.refresh_from_db()
+        self.assertEqual(bundle.status, BundleStatus.APPROVED)
+
+        publish_bundle(bundle)
+
+        self.page.refresh_from_db()
+        self.assertTrue(self.page.live)
+        release_calendar_page.refresh_from_db()
+        self.assertEqual(release_calendar_page.status, ReleaseStatus.PUBLISHED)
+
+    def test_journaled_pages_are_skipped(self):
+        BundlePublicationStep.objects.create(
+            bundle=self.bundle, page=self.index_page, revision=self.index_page.latest_revision
+        )
+
+        with self.assertLogs("cms.bundles.publishing", level="INFO") as logs:
+            timings = publish_bundled_pages(self.bundle, self.get_pages(), max_workers=1, chunk_size=1)
+
+        self.assertEqual(logs.records[0].event, "resuming_bundle_publication")
+        self.assertEqual(set(timings), {self.page.pk, self.article.pk})
+        self.index_page.refresh_from_db()
+        self.assertFalse(self.index_page.live)
+
+    def test_journaled_pages_edited_since_are_published_again(self):
+        BundlePublicationStep.objects.create(
+            bundle=self.bundle, page=self.index_page, revision=self.index_page.latest_revision
+        )
+        new_revision = self.index_page.save_revision()
+
+        timings = publish_bundled_pages(self.bundle, self.get_pages(), max_workers=1, chunk_size=1)
+
+        self.assertEqual(set(timings), {self.index_page.pk, self.page.pk, self.article.pk})
+        self.index_page.refresh_from_db()
+        self.assertEqual(self.index_page.live_revision, new_revision)
+        self.assertEqual(self.bundle.publication_steps.get(page=self.index_page).revision, new_revision)
+
+    def test_publish_bundle_clears_the_journal(self):
+        bundle = BundleFactory(approved=True)
+        BundlePageFactory(parent=bundle, page=self.page)
+        mark_page_as_ready_to_publish(self.page)
+
+        publish_bundle(bundle)
+
+        self.page.refresh_from_db()
+        self.assertTrue(self.page.live)
+        self.assertFalse(bundle.publication_steps.exists())
+
+
+class BundlePublicationPlanTestCase(TestCase):
+    def setUp(self):
+        self.bundle = BundleFactory(approved=True)
+        self.page = InformationPageFactory(live=False)
+        self.page.save_revision()
+        self.article = StatisticalArticlePageFactory(live=False)
+        mark_page_as_ready_to_publish(self.article)
+        BundlePageFactory(parent=self.bundle, page=self.page)
+        BundlePageFactory(parent=self.bundle, page=self.article)
+
+    def test_prepare_bundle_publication(self):
+        release_calendar_page = ReleaseCalendarPageFactory()
+        self.bundle.release_calendar_page = release_calendar_page
+        self.bundle.save(update_fields=["release_calendar_page"])
+
+        with self.assertLogs("cms.bundles.utils", level="INFO") as logs:
+            plan = prepare_bundle_publication(self.bundle)
+
+        self.assertCountEqual([page.pk for page in plan.pages], [self.page.pk, self.article.pk])
+        self.assertEqual(plan.release_calendar_page, release_calendar_page)
+        self.assertEqual(plan.release_calendar_content[0]["value"]["title"], "Publications")
+        self.assertTrue(plan.is_current(self.bundle))
+        self.assertEqual(logs.records[0].event, "prepared_bundle_publication")
+
+    def test_publishing_a_plan(self):
+        plan = prepare_bundle_publication(self.bundle)
+
+        publish_bundle(self.bundle, plan=plan)
+
+        for page in (self.page, self.article):
+            page.refresh_from_db()
+            self.assertTrue(page.live)
+            self.assertIsNone(page.current_workflow_state)
+
+    def test_pages_that_are_not_ready_are_logged(self):
+        page = InformationPageFactory(live=False)
+        mark_page_as_ready_for_review(page)
+        BundlePageFactory(parent=self.bundle, page=page)
+
+        with self.assertLogs("cms.bundles.publishing", level="WARNING") as logs:
+            prepare_bundle_publication(self.bundle)
+
+        self.assertEqual([record.page_id for record in logs.records], [page.pk])
+
+    def test_plan_is_not_current_after_a_new_revision(self):
+        plan = prepare_bundle_publication(self.bundle)
+
+        self.page.save_revision()
+
+        self.assertFalse(plan.is_current(self.bundle))
+
+    def test_plan_is_not_current_after_the_workflow_changes(self):
+        plan = prepare_bundle_publication(self.bundle)
+
+        self.article.current_workflow_state.cancel()
+
+        self.assertFalse(plan.is_current(self.bundle))
+
+    def test_plan_is_not_current_after_a_page_moves(self):
+        plan = prepare_bundle_publication(self.bundle)
+
+        self.page.move(IndexPageFactory(), pos="last-child")
+
+        self.assertFalse(plan.is_current(self.bundle))
+
+    def test_plan_is_not_current_after_the_bundle_changes(self):
+        plan = prepare_bundle_publication(self.bundle)
+
+        self.bundle.save()
+
+        self.assertFalse(plan.is_current(self.bundle))
+
+    def test_stale_plan_is_prepared_again(self):
+        plan = prepare_bundle_publication(self.bundle)
+        self.page.title = "Updated title"
+        self.page.save_revision()
+
+        with self.assertLogs("cms.bundles.utils", level="WARNING") as logs:
+            publish_bundle(self.bundle, plan=plan)
+
+        self.assertEqual(logs.records[0].event, "stale_bundle_publication_plan")
+        self.page.refresh_from_db()
+        self.assertEqual(self.page.title, "Updated title")
+
+
+class ParallelPublishBundledPagesTestCase(TransactionTestCase):
+    def test_publishes_the_pages_concurrently(self):
+        bundle = BundleFactory(approved=True)
+        index_page = IndexPageFactory(live=False)
+        index_page.save_revision()
+        pages = InformationPageFactory.create_batch(3, parent=index_page, live=False)
+        for page in pages:
+            page.save_revision()
+
+        timings = publish_bundled_pages(
+            bundle,
+            Page.objects.filter(pk__in=[index_page.pk, *(page.pk for page in pages)]).specific(),
+            max_workers=2,
+            chunk_size=50,
+        )
+
+        self.assertEqual(set(timings), {index_page.pk, *(page.pk for page in pages)})
+        self.assertEqual(Page.objects.filter(pk__in=timings, live=True).count(), 4)
+
+    def test_failure_stops_later_stages(self):
+        bundle = BundleFactory(approved=True)
+        index_page = IndexPageFactory(live=False)
+        index_page.save_revision()
+        page = InformationPageFactory(parent=index_page, live=False)
+        page.save_revision()
+
+        with (
+            patch("cms.bundles.publishing.publish_bundled_page", side_effect=RuntimeError("Publish failed")) as mock,
+            self.assertRaisesMessage(RuntimeError, "Publish failed"),
+        ):
+            publish_bundled_pages(
+                bundle,
+                Page.objects.filter(pk__in=[index_page.pk, page.pk]).specific(),
+                max_workers=2,
+                chunk_size=50,
+            )
+
+        mock.assert_called_once()
@@ -0,0 +1,275 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import psycopg
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from cms.bundles.enums import BundleStatus
+from cms.bundles.management.commands.bundle_scheduler import Command
+from cms.bundles.scheduling import (
+    BUNDLE_SCHEDULE_CHANNEL,
+    bundle_publishing_lock,
+    get_bundle_timeline,
+    notify_bundle_schedule_changed,
+)
+from cms.bundles.tests.factories import BundleFactory
+from cms.core.tests import TransactionTestCase
+from cms.release_calendar.tests.factories import ReleaseCalendarPageFactory
+
+
+@contextmanager
+def bundle_publishing_locked_elsewhere(bundle_id):
+    """Holds the publishing lock of the bundle on another database connection, like another scheduler replica."""
+    locked = threading.Event()
+    released = threading.Event()
+
+    def hold_lock():
+        try:
+            with bundle_publishing_lock(bundle_id):
+                locked.set()
+                released.wait(timeout=10)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=hold_lock)
+    thread.start()
+    locked.wait(timeout=10)
+    try:
+        yield
+    finally:
+        released.set()
+        thread.join()
+
+
+class BundleTimelineTestCase(TestCase):
+    def test_get_bundle_timeline(self):
+        bundle = BundleFactory(approved=True)
+        release_calendar_page = ReleaseCalendarPageFactory()
+        bundle_with_release_calendar_page = BundleFactory(
+            approved=True, publication_date=None, release_calendar_page=release_calendar_page
+        )
+        BundleFactory(in_review=True)
+        BundleFactory(published=True)
+
+        self.assertEqual(
+            get_bundle_timeline(),
+            {
+                bundle.pk: bundle.publication_date,
+                bundle_with_release_calendar_page.pk: release_calendar_page.release_date,
+            },
+        )
+
+    @patch("cms.bundles.signal_handlers.notify_bundle_schedule_changed")
+    def test_saving_a_bundle_notifies_the_scheduler(self, mock_notify):
+        bundle = BundleFactory()
+        mock_notify.assert_called_with(bundle.pk)
+
+        mock_notify.reset_mock()
+        bundle_id = bundle.pk
+        bundle.delete()
+        mock_notify.assert_called_once_with(bundle_id)
+
+    @patch("cms.bundles.signal_handlers.notify_bundle_schedule_changed")
+    def test_publishing_a_release_calendar_page_notifies_the_scheduler(self, mock_notify):
+        release_calendar_page = ReleaseCalendarPageFactory()
+        bundle = BundleFactory(approved=True, publication_date=None, release_calendar_page=release_calendar_page)
+        BundleFactory(published=True, publication_date=None, release_calendar_page=release_calendar_page)
+        mock_notify.reset_mock()
+
+        release_calendar_page.save_revision().publish()
+
+        mock_notify.assert_called_once_with(bundle.pk)
+
+
+@override_settings(BUNDLE_SCHEDULER_RESYNC_INTERVAL=60)
+class BundleSchedulerTestCase(TestCase):
+    def setUp(self):
+        self.command = Command()
+
+    def test_publishes_due_bundles(self):
+        due_bundle = BundleFactory(approved=True, publication_date=timezone.now() - timedelta(seconds=1))
+        future_bundle = BundleFactory(approved=True)
+        self.command.sync_timeline()
+
+        self.command.publish_due_bundles()
+
+        due_bundle.refresh_from_db()
+        self.assertEqual(due_bundle.status, BundleStatus.PUBLISHED)
+        future_bundle.refresh_from_db()
+        self.assertEqual(future_bundle.status, BundleStatus.APPROVED)
+        self.assertEqual(list(self.command.timeline), [future_bundle.pk])
+        self.assertEqual(self.command.get_next_run_at(), future_bundle.publication_date.timestamp())
+
+    def test_does_not_publish_bundles_that_changed(self):
+        bundle = BundleFactory(approved=True, publication_date=timezone.now() - timedelta(seconds=1))
+        self.command.sync_timeline()
+        bundle.publication_date = timezone.now() + timedelta(hours=1)
+        bundle.save(update_fields=["publication_date"])
+
+        self.command.publish_due_bundles()
+
+        bundle.refresh_from_db()
+        self.assertEqual(bundle.status, BundleStatus.APPROVED)
+        self.assertEqual(self.command.timeline, {})
+
+    def test_failed_bundles_are_retried_later(self):
+        bundle = BundleFactory(approved=True, publication_date=timezone.now() - timedelta(seconds=1))
+        self.command.sync_timeline()
+
+        with (
+            patch(
+                "cms.bundles.management.commands.bundle_scheduler.publish_bundle",
+                side_effect=Exception("Publish failed"),
+            ),
+            self.assertLogs("cms.bundles.management.commands.bundle_scheduler", level="ERROR") as logs,
+        ):
+            self.command.publish_due_bundles()
+
+        self.assertEqual(logs.records[0].event, "publish_failed")
+        bundle.refresh_from_db()
+        self.assertEqual(bundle.status, BundleStatus.APPROVED)
+        self.assertIn(bundle.pk, self.command.timeline)
+        self.assertGreater(self.command.get_next_run_at(), time.time() + 50)
+
+        # Reloading the timeline does not retry it early
+        self.command.sync_timeline()
+        self.assertGreater(self.command.get_next_run_at(), time.time() + 50)
+
+    def test_upcoming_bundles_are_published_with_their_prepared_plan(self):
+        bundle = BundleFactory(approved=True, publication_date=timezone.now() + timedelta(seconds=30))
+        self.command.sync_timeline()
+
+        self.command.prepare_upcoming_bundles(time.time() + 60)
+
+        plan = self.command.publication_plans[bundle.pk]
+        self.assertEqual(plan.bundle_id, bundle.pk)
+
+        type(bundle).objects.filter(pk=bundle.pk).update(publication_date=timezone.now() - timedelta(seconds=1))
+        self.command.sync_timeline()
+        with patch("cms.bundles.management.commands.bundle_scheduler.publish_bundle") as mock_publish_bundle:
+            self.command.publish_due_bundles()
+
+        mock_publish_bundle.assert_called_once()
+        self.assertIs(mock_publish_bundle.call_args.kwargs["plan"], plan)
+        self.assertEqual(self.command.publication_plans, {})
+
+    def test_only_bundles_due_before_the_next_sync_are_prepared(self):
+        BundleFactory(approved=True, publication_date=timezone.now() + timedelta(hours=1))
+        self.command.sync_timeline()
+
+        self.command.prepare_upcoming_bundles(time.time() + 60)
+
+        self.assertEqual(self.command.publication_plans, {})
+
+    def test_next_run_without_bundles(self):
+        self.assertEqual(self.command.get_next_run_at(), float("inf"))
+
+
+class BundlePublishingLockTestCase(TestCase):
+    def setUp(self):
+        self.bundle = BundleFactory(approved=True, publication_date=timezone.now() - timedelta(seconds=1))
+
+    def test_publish_bundles_skips_locked_bundles(self):
+        with (
+            bundle_publishing_locked_elsewhere(self.bundle.pk),
+            self.assertLogs("cms.bundles.management.commands.publish_bundles", level="INFO") as logs,
+        ):
+            call_command("publish_bundles", stdout=StringIO())
+
+        self.assertEqual(logs.records[0].event, "bundle_publishing_locked")
+        self.bundle.refresh_from_db()
+        self.assertEqual(self.bundle.status, BundleStatus.APPROVED)
+
+        # Once the lock is released, the bundle is published on the next run
+        call_command("publish_bundles", stdout=StringIO())
+        self.bundle.refresh_from_db()
+        self.assertEqual(self.bundle.status, BundleStatus.PUBLISHED)
+
+    def test_bundle_scheduler_skips_locked_bundles(self):
+        command = Command()
+        command.sync_timeline()
+
+        with bundle_publishing_locked_elsewhere(self.bundle.pk):
+            command.publish_due_bundles()
+
+        self.bundle.refresh_from_db()
+        self.assertEqual(self.bundle.status, BundleStatus.APPROVED)
+        # Left to the next sync, in case the other process fails
+        self.assertEqual(command.timeline, {})
+        self.assertEqual(command.retry_at, {})
+
+    @patch("cms.bundles.management.commands.publish_bundles.Command.handle_bundle")
+    def test_publish_bundles_skips_bundles_published_by_another_process(self, mock_handle_bundle):
+        # e.g. published by another replica between the bundles being listed and locked
+        real_lock = bundle_publishing_lock
+
+        def publish_then_lock(bundle_id):
+            type(self.bundle).objects.filter(pk=bundle_id).update(status=BundleStatus.PUBLISHED)
+            return real_lock(bundle_id)
+
+        with patch(
+            "cms.bundles.management.commands.publish_bundles.bundle_publishing_lock", side_effect=publish_then_lock
+        ):
+            call_command("publish_bundles", stdout=StringIO())
+
+        mock_handle_bundle.assert_not_called()
+
+
+class BundleSchedulerNotificationTestCase(TransactionTestCase):
+    def setUp(self):
+        self.command = Command()
+        self.assertTrue(self.command.listen())
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"UNLISTEN {BUNDLE_SCHEDULE_CHANNEL}")
+
+    def test_waits_for_bundle_changes(self):
+        self.assertFalse(self.command.wait_for_changes(0.1))
+
+        bundle = BundleFactory(approved=True)
+
+        with self.assertLogs("cms.bundles.management.commands.bundle_scheduler", level="INFO") as logs:
+            self.assertTrue(self.command.wait_for_changes(1))
+        self.assertEqual(logs.records[0].bundle_id, str(bundle.pk))
+
+    def test_notifications_are_sent_on_commit(self):
+        with connection.cursor() as cursor:
+            cursor.execute("BEGIN")
+            notify_bundle_schedule_changed(1)
+            self.assertFalse(self.command.wait_for_changes(0.1))
+            cursor.execute("COMMIT")
+
+        self.assertTrue(self.command.wait_for_changes(1))
+
+    def test_listens_again_after_reconnecting(self):
+        self.assertFalse(self.command.listen())
+
+        connection.close()
+
+        # Changes may have been missed, so the caller is told to reload the timeline
+        self.assertTrue(self.command.wait_for_changes(1))
+        self.assertTrue(self.command.listen())
+        self.assertFalse(self.command.wait_for_changes(0.1))
+
+        notify_bundle_schedule_changed(1)
+        with self.assertLogs("cms.bundles.management.commands.bundle_scheduler", level="INFO"):
+            self.assertTrue(self.command.wait_for_changes(1))
+
+    def test_lost_connection_is_closed(self):
+        with (
+            patch.object(connection.connection, "notifies", side_effect=psycopg.OperationalError("Connection lost")),
+            self.assertLogs("cms.bundles.management.commands.bundle_scheduler", level="ERROR") as logs,
+        ):
+            self.assertTrue(self.command.wait_for_changes(1))
+
+        self.assertEqual(logs.records[0].event, "bundle_schedule_listen_failed")
+        self.assertIsNone(connection.connection)
+        self.assertTrue(self.command.listen())
@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from wagtail.test.utils.wagtail_tests import WagtailTestUtils
 
@@ -177,3 +179,23 @@ class WagtailHooksTestCase(WagtailTestUtils, TestCase):
             with self.subTest(msg=f"Non-bundleable page - {context}"):
                 response = self.client.get(url)
                 self.assertNotContains(response, add_to_bundle_url)
+
+    def test_add_to_bundle_buttons__listing_bundle_queries_do_not_grow_with_the_pages(self):
+        """Checks that the active bundle of the pages in the explorer listing is loaded with the listing."""
+
+        def get_bundle_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.article_parent_url)
+            return response, [query for query in queries.captured_queries if "bundles_" in query["sql"]]
+
+        self.client.force_login(self.publishing_officer)
+        BundlePageFactory(parent=self.in_review_bundle, page=self.statistical_article_page)
+
+        response, single_page_queries = get_bundle_queries()
+        self.assertNotContains(response, "Add to Bundle")
+
+        StatisticalArticlePageFactory.create_batch(3, parent=self.statistical_article_page.get_parent())
+
+        response, many_pages_queries = get_bundle_queries()
+        self.assertContains(response, "Add to Bundle", count=3)
+        self.assertEqual(len(many_pages_queries), len(single_page_queries))
@@ -1,9 +1,13 @@
 import logging
 import time
 import uuid
+from contextlib import ExitStack
 from functools import cache
 from typing import TYPE_CHECKING, Any, cast
 
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
 from django.urls import reverse
 from wagtail.coreutils import resolve_model_string
 from wagtail.log_actions import log
@@ -11,15 +15,19 @@ from wagtail.models import Page, get_page_models
 
 from cms.bundles.enums import ACTIVE_BUNDLE_STATUSES, BundleStatus
 from cms.bundles.permissions import user_can_manage_bundles
+from cms.bundles.publishing import BundlePublicationPlan, prepare_bundled_pages, publish_bundled_pages
 from cms.core.fields import StreamField
 from cms.release_calendar.enums import ReleaseStatus
+from cms.search.coalescing import coalesce_search_updates
 
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from django.contrib.auth.models import AnonymousUser
+    from django.db.models import QuerySet
 
     from cms.bundles.models import Bundle
+    from cms.release_calendar.models import ReleaseCalendarPage
     from cms.users.models import User
 
 
@@ -41,6 +49,21 @@ def get_pages_in_active_bundles() -> list[int]:
     )
 
 
+def annotate_active_bundle_id(queryset: "QuerySet[Page]") -> "QuerySet[Page]":
+    """Annotates the pages with the id of their active bundle, or None, in the same query.
+
+    BundledPageMixin.in_active_bundle and active_bundle use the annotation, so listing pages
+    doesn't query their bundles page by page.
+    """
+    bundle_page_class = resolve_model_string("bundles.BundlePage")
+
+    active_bundle_ids = bundle_page_class.objects.filter(
+        page=OuterRef("pk"), parent__status__in=ACTIVE_BUNDLE_STATUSES
+    ).values("parent")[:1]
+    annotated_queryset: QuerySet[Page] = queryset.annotate(active_bundle_id=Subquery(active_bundle_ids))
+    return annotated_queryset
+
+
 def _create_content_dict_for_pages(pages: list[tuple[dict[str, Any], str]]) -> list[dict[str, Any]]:
     """Helper function to create content dictionary for article and methodology pages."""
     article_pages: list[dict[str, Any]] = []
@@ -179,24 +202,57 @@ def get_page_title_with_workflow_status(page: Page) -> str:
     return f"{title} (Draft)"
 
 
-def update_bundle_linked_release_calendar_page(bundle: "Bundle") -> None:
-    """Updates the release calendar page related to the bundle with the pages in the bundle."""
-    page = bundle.release_calendar_page
-    if page:  # To satisfy mypy, ensure page is not None
-        content = serialize_bundle_content_for_published_release_calendar_page(bundle)
-        datasets = serialize_datasets_for_release_calendar_page(bundle)
+def update_bundle_linked_release_calendar_page(
+    page: "ReleaseCalendarPage", content: list[dict[str, Any]], datasets: list[dict[str, Any]]
+) -> None:
+    """Updates the release calendar page of a bundle with the serialized bundle content, then publishes it."""
+    page.content = cast(StreamField, content)
+    page.datasets = cast(StreamField, datasets)
+    page.status = ReleaseStatus.PUBLISHED
+    revision = page.save_revision(log_action=True)
+    revision.publish()
+
+
+def prepare_bundle_publication(bundle: "Bundle") -> BundlePublicationPlan:
+    """Resolves the pages, revisions, workflow states and release calendar content needed to publish the bundle.
+
+    This does all the reads, so it can be done ahead of the release time, leaving publish_bundle() to do the writes.
+    """
+    start_time = time.time()
+    pages = prepare_bundled_pages(
+        bundle,
+        bundle.get_bundled_pages().specific(defer=True).select_related("latest_revision").prefetch_workflow_states(),
+    )
+
+    plan = BundlePublicationPlan(bundle_id=bundle.pk, bundle_updated_at=bundle.updated_at, pages=pages)
+    if release_calendar_page := bundle.release_calendar_page:
+        plan.release_calendar_page = release_calendar_page
+        plan.release_calendar_content = serialize_bundle_content_for_published_release_calendar_page(bundle)
+        plan.release_calendar_datasets = serialize_datasets_for_release_calendar_page(bundle)
 
-        page.content = cast(StreamField, content)
-        page.datasets = cast(StreamField, datasets)
-        page.status = ReleaseStatus.PUBLISHED
-        revision = page.save_revision(log_action=True)
-        revision.publish()
+    logger.info(
+        "Prepared bundle publication",
+        extra={
+            "bundle_id": bundle.pk,
+            "page_count": len(pages),
+            "duration": round((time.time() - start_time) * 1000, 3),
+            "event": "prepared_bundle_publication",
+        },
+    )
+    return plan
 
 
-def publish_bundle(bundle: "Bundle", *, update_status: bool = True) -> None:
+def publish_bundle(bundle: "Bundle", *, update_status: bool = True, plan: BundlePublicationPlan | None = None) -> None:
     """Publishes a given bundle.
 
     This means it publishes the related pages, as well as updates the linked release calendar.
+    A plan from prepare_bundle_publication() is used if it is still current, otherwise one is prepared now.
+
+    By default, the pages, the release calendar page and the bundle status are committed in one transaction,
+    so the bundle goes live all at once, or not at all. With BUNDLE_PUBLISHING_CHUNK_SIZE or
+    BUNDLE_PUBLISHING_MAX_WORKERS set, the pages go live as they are committed, by publish_bundled_pages().
+    If one fails, those already committed stay live, while the release calendar page is not published
+    and the bundle stays approved, until a retry publishes the rest.
     """
     # using this rather than inline import to placate pyright complaining about cyclic imports
     notifications = __import__(
@@ -211,37 +267,49 @@ def publish_bundle(bundle: "Bundle", *, update_status: bool = True) -> None:
         },
     )
     start_time = time.time()
+    if plan is not None and not plan.is_current(bundle):
+        logger.warning(
+            "Bundle changed since its publication was prepared",
+            extra={"bundle_id": bundle.pk, "event": "stale_bundle_publication_plan"},
+        )
+        plan = None
+    if plan is None:
+        plan = prepare_bundle_publication(bundle)
+
     notifications.notify_slack_of_publication_start(bundle, url=bundle.full_inspect_url)
-    for page in bundle.get_bundled_pages().specific(defer=True).select_related("latest_revision"):
-        if workflow_state := page.current_workflow_state:
-            # finish the workflow
-            workflow_state.current_task_state.approve()
-        elif page.latest_revision:
-            # just run publish
-            page.latest_revision.publish(log_action="wagtail.publish.scheduled")
-        else:
-            logger.error(
-                "Did not publish page as it is not in a workflow or has no revisions",
-                extra={
-                    "bundle_id": bundle.pk,
-                    "page_id": page.pk,
-                    "event": "publish_page_failed",
-                },
-            )
-
-    # update the related release calendar and publish
-    if bundle.release_calendar_page_id:
-        update_bundle_linked_release_calendar_page(bundle)
-
-    if update_status:
-        bundle.status = BundleStatus.PUBLISHED
-        bundle.save()
+    max_workers = settings.BUNDLE_PUBLISHING_MAX_WORKERS
+    chunk_size = settings.BUNDLE_PUBLISHING_CHUNK_SIZE
+    # Unless chunked or parallel commits are enabled, the whole bundle is published in one transaction
+    is_atomic = max_workers <= 1 and not chunk_size
+    with ExitStack() as stack:
+        if is_atomic:
+            stack.enter_context(transaction.atomic())
+            stack.enter_context(coalesce_search_updates())
+        # With chunked or parallel commits, the committed pages are recorded in the publication journal,
+        # so a retry after a failure only publishes the pages that are not live yet.
+        page_timings = publish_bundled_pages(bundle, plan.pages, max_workers=max_workers, chunk_size=chunk_size)
+
+        with transaction.atomic(), coalesce_search_updates():
+            # update the related release calendar and publish, once all the pages are live
+            if plan.release_calendar_page:
+                update_bundle_linked_release_calendar_page(
+                    plan.release_calendar_page, plan.release_calendar_content, plan.release_calendar_datasets
+                )
+
+            if update_status:
+                bundle.status = BundleStatus.PUBLISHED
+                bundle.save()
+
+            # The bundle is done, so a later publication, e.g. by an admin, starts from scratch
+            bundle.publication_steps.all().delete()
     publish_duration = time.time() - start_time
     logger.info(
         "Published bundle",
         extra={
             "bundle_id": bundle.pk,
             "duration": round(publish_duration * 1000, 3),
+            "page_count": len(page_timings),
+            "slowest_page_duration": round(max(page_timings.values(), default=0) * 1000, 3),
             "event": "published_bundle",
         },
     )
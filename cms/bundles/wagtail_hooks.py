@@ -12,6 +12,7 @@ from wagtail.permission_policies import ModelPermissionPolicy
 from . import admin_urls
 from .mixins import BundledPageMixin
 from .models import Bundle
+from .utils import annotate_active_bundle_id
 from .viewsets.bundle import bundle_viewset
 from .viewsets.bundle_chooser import bundle_chooser_viewset
 from .viewsets.bundle_page_chooser import bundle_page_chooser_viewset
@@ -88,6 +89,19 @@ def page_listing_buttons(page: "Page", user: "User", next_url: str | None = None
     yield PageAddToBundleButton(page=page, user=user, priority=10, next_url=next_url)
 
 
+@hooks.register("construct_explorer_page_queryset")
+def annotate_explorer_pages_with_active_bundle(
+    parent_page: "Page",  # pylint: disable=unused-argument
+    pages: QuerySet["Page"],
+    request: "HttpRequest",
+) -> QuerySet["Page"]:
+    """Annotates the pages in the explorer listing with their active bundle, for the add to bundle button.
+
+    @see https://docs.wagtail.org/en/stable/reference/hooks.html#construct-explorer-page-queryset.
+    """
+    return annotate_active_bundle_id(pages)
+
+
 @hooks.register("register_admin_urls")
 def register_admin_urls() -> list[Union["URLPattern", "URLResolver"]]:
     """Registers the admin urls for Bundles.
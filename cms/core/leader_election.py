@@ -0,0 +1,59 @@
+import logging
+
+import pglock
+from django.db import DatabaseError, connection
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElection:
+    """Elects one leader among several processes, using a session-level Postgres advisory lock.
+
+    The leader is the process whose database connection holds the lock. The lock is released when
+    that connection closes, e.g. when the process stops or loses the database, so another process
+    can take over the next time it calls elect(). As the lock belongs to the connection of the
+    calling thread, elect() must always be called from the same thread.
+    """
+
+    def __init__(self, lock_id: str) -> None:
+        self.lock_id = lock_id
+        self.is_leader = False
+
+    def elect(self) -> bool:
+        """Checks that this process is still the leader, or tries to become it.
+
+        Returns:
+            bool: Whether this process is the leader.
+        """
+        try:
+            if self.is_leader and not self._holds_lock():
+                logger.warning("Lost the leadership", extra={"lock_id": self.lock_id, "event": "leadership_lost"})
+                self.is_leader = False
+            if not self.is_leader and pglock.advisory(self.lock_id, timeout=0).acquire():
+                logger.info("Became the leader", extra={"lock_id": self.lock_id, "event": "leadership_acquired"})
+                self.is_leader = True
+        except DatabaseError:
+            logger.exception(
+                "Leader election failed", extra={"lock_id": self.lock_id, "event": "leader_election_failed"}
+            )
+            if self.is_leader:
+                logger.warning("Lost the leadership", extra={"lock_id": self.lock_id, "event": "leadership_lost"})
+            self.is_leader = False
+            # Start again with a new connection next time, the lock of the old one is released with it
+            connection.close()
+        return self.is_leader
+
+    def _holds_lock(self) -> bool:
+        lock_id = pglock.advisory(self.lock_id).int_lock_id
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT EXISTS(
+                    SELECT 1 FROM pg_locks
+                    WHERE locktype = 'advisory' AND pid = pg_backend_pid() AND granted
+                    AND classid = %s AND objid = %s AND objsubid = 1
+                )
+                """,
+                [(lock_id >> 32) & 0xFFFFFFFF, lock_id & 0xFFFFFFFF],
+            )
+            return bool(cursor.fetchone()[0])
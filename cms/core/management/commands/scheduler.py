@@ -1,22 +1,39 @@
 import atexit
 import signal
+from datetime import UTC, datetime
 from functools import partial
 from typing import Any
 
 from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from django.conf import settings
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
 
+from cms.core.leader_election import LeaderElection
+
+LEADER_LOCK_ID = f"{__name__}.leader"
+
 
 class Command(BaseCommand):
-    """APSchedule management command."""
+    """APSchedule management command.
+
+    Several replicas can run at the same time. The jobs that are safe to run concurrently run on every replica,
+    the others only on the replica elected as the leader.
+    """
 
     def handle(self, *args: Any, **options: Any) -> None:
         """Defines the scheduler and its cleanup."""
-        self.scheduler = BlockingScheduler(executors={"default": ThreadPoolExecutor()})  # pylint: disable=W0201
+        self.scheduler = BlockingScheduler(  # pylint: disable=W0201
+            executors={
+                "default": ThreadPoolExecutor(),
+                # A single thread, so that the leader lock is always held by the same database connection
+                "leader_election": ThreadPoolExecutor(max_workers=1),
+            }
+        )
+        self.leader_election = LeaderElection(LEADER_LOCK_ID)  # pylint: disable=W0201
 
         self.setup_signals()
 
@@ -35,22 +52,52 @@ class Command(BaseCommand):
         if self.scheduler.running:
             self.scheduler.shutdown(wait=False)
 
-    def add_management_command(self, command_name: str, trigger: CronTrigger, **kwargs: Any) -> None:
-        """Adds the given management command to the list of scheduled jobs."""
-        func = partial(call_command, command_name, **kwargs)
+    def add_management_command(
+        self, command_name: str, trigger: CronTrigger, *, leader_only: bool = False, **kwargs: Any
+    ) -> None:
+        """Adds the given management command to the list of scheduled jobs.
+
+        Commands that are not safe to run on several replicas at once are leader_only.
+        """
+        func = partial(self.run_management_command, command_name, leader_only=leader_only, **kwargs)
         self.scheduler.add_job(func, name=command_name, trigger=trigger)
 
+    def run_management_command(self, command_name: str, *, leader_only: bool, **kwargs: Any) -> None:
+        if leader_only and not self.leader_election.is_leader:
+            return
+        call_command(command_name, **kwargs)
+
     def configure_scheduler(self) -> None:
         """Configures the scheduler and triggers."""
+        # Try to become the leader straight away, then check the leadership regularly
+        self.scheduler.add_job(
+            self.leader_election.elect,
+            name="leader_election",
+            trigger=IntervalTrigger(seconds=settings.SCHEDULER_LEADER_ELECTION_INTERVAL),
+            executor="leader_election",
+            next_run_time=datetime.now(tz=UTC),
+        )
+
         # "second=0" run the task every minute, on the minute (ie when the seconds = 0)
-        self.add_management_command("publish_bundles", CronTrigger(second=0))
+        # Not needed when bundles are published by the bundle_scheduler command.
+        # Each bundle is locked while it is published, so the replicas share the bundles due at the same time.
+        if not settings.BUNDLE_SCHEDULER_ENABLED:
+            self.add_management_command("publish_bundles", CronTrigger(second=0))
 
         # Run every 5 minutes.
         # See https://apscheduler.readthedocs.io/en/3.x/modules/triggers/cron.html#expression-types
-        self.add_management_command("publish_scheduled_without_bundles", CronTrigger(minute="*/5"))
+        self.add_management_command("publish_scheduled_without_bundles", CronTrigger(minute="*/5"), leader_only=True)
+
+        # Relay search index events recorded in the outbox, every 10 seconds.
+        # Only on the leader, so that the events for each page are sent in order. Without the outbox,
+        # the messages that Kafka fails to take are still spooled there when the circuit breaker is enabled.
+        if settings.SEARCH_INDEX_OUTBOX_ENABLED or (
+            settings.SEARCH_INDEX_PUBLISHER_BACKEND == "kafka" and settings.SEARCH_PUBLISH_CIRCUIT_BREAKER_THRESHOLD
+        ):
+            self.add_management_command("relay_search_index_events", CronTrigger(second="*/10"), leader_only=True)
 
         # Sync teams
         if settings.AWS_COGNITO_TEAM_SYNC_ENABLED:
             self.add_management_command(
-                "sync_teams", CronTrigger(minute=f"*/{settings.AWS_COGNITO_TEAM_SYNC_FREQUENCY}")
+                "sync_teams", CronTrigger(minute=f"*/{settings.AWS_COGNITO_TEAM_SYNC_FREQUENCY}"), leader_only=True
             )
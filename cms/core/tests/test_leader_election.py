@@ -0,0 +1,69 @@
+import threading
+
+from django.db import connection, connections
+
+from cms.core.leader_election import LeaderElection
+from cms.core.tests import TransactionTestCase
+
+LOCK_ID = "cms.core.tests.test_leader_election"
+
+
+class OtherReplica(threading.Thread):
+    """Runs a leader election on its own database connection, and keeps it open until stopped."""
+
+    def __init__(self):
+        super().__init__()
+        self.elected = threading.Event()
+        self.stopped = threading.Event()
+        self.is_leader = None
+
+    def run(self):
+        try:
+            self.is_leader = LeaderElection(LOCK_ID).elect()
+            self.elected.set()
+            self.stopped.wait(timeout=10)
+        finally:
+            connections.close_all()
+
+    def __enter__(self):
+        self.start()
+        self.elected.wait(timeout=10)
+        return self
+
+    def __exit__(self, *args):
+        self.stopped.set()
+        self.join()
+
+
+class LeaderElectionTestCase(TransactionTestCase):
+    def setUp(self):
+        self.leader_election = LeaderElection(LOCK_ID)
+
+    def tearDown(self):
+        # Release the lock
+        connection.close()
+
+    def test_only_one_leader_is_elected(self):
+        with self.assertLogs("cms.core.leader_election", level="INFO") as logs:
+            self.assertTrue(self.leader_election.elect())
+        self.assertEqual(logs.records[0].event, "leadership_acquired")
+
+        # Still the leader
+        self.assertTrue(self.leader_election.elect())
+
+        with OtherReplica() as other_replica:
+            self.assertFalse(other_replica.is_leader)
+
+    def test_another_replica_takes_over_when_the_connection_is_lost(self):
+        self.assertTrue(self.leader_election.elect())
+        connection.close()
+
+        with OtherReplica() as other_replica:
+            self.assertTrue(other_replica.is_leader)
+
+            with self.assertLogs("cms.core.leader_election", level="WARNING") as logs:
+                self.assertFalse(self.leader_election.elect())
+            self.assertEqual(logs.records[0].event, "leadership_lost")
+
+        # The other replica stopped, so this one can become the leader again
+        self.assertTrue(self.leader_election.elect())
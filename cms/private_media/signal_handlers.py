@@ -1,8 +1,13 @@
+import operator
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import reduce
 from typing import TYPE_CHECKING, Any
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured
-from django.db.models import CharField, IntegerField
+from django.db.models import CharField, IntegerField, Model
 from django.db.models.functions import Cast
 from wagtail.models import Page, ReferenceIndex
 from wagtail.signals import published, unpublished
@@ -12,7 +17,10 @@ from cms.private_media.models import PrivateImageMixin
 from cms.private_media.utils import get_private_media_models
 
 if TYPE_CHECKING:
-    from django.db.models import Model
+    from collections.abc import Sequence
+
+# The objects unpublished inside a defer_media_unpublishing() block. None when no block is active.
+_deferred_unpublished_objects: ContextVar[list[Model] | None] = ContextVar("deferred_unpublished_objects", default=None)
 
 
 def publish_media_on_publish(instance: "Model", **kwargs: Any) -> None:
@@ -48,11 +56,52 @@ def unpublish_media_on_unpublish(instance: "Model", **kwargs: Any) -> None:
     signals for all publishable models. It is responsible for identifying any
     privacy-controlled media used solely by the object, and ensuring that it is
     made private again.
+
+    Inside a defer_media_unpublishing() block, this is done once for all the
+    objects unpublished in the block, when it exits.
+    """
+    if (deferred := _deferred_unpublished_objects.get()) is not None:
+        deferred.append(instance)
+        return
+    make_unused_media_private([instance])
+
+
+@contextmanager
+def defer_media_unpublishing() -> Iterator[None]:
+    """Groups the media privacy updates of the objects unpublished inside the block,
+    so the media they reference is checked and made private in one pass when it exits.
+    Nested blocks join the outermost one. Like a savepoint, a nested block that raises
+    an exception drops the objects deferred inside it.
+    """
+    if (outer_deferred := _deferred_unpublished_objects.get()) is not None:
+        deferred_count = len(outer_deferred)
+        try:
+            yield
+        except Exception:
+            del outer_deferred[deferred_count:]
+            raise
+        return
+
+    deferred: list[Model] = []
+    token = _deferred_unpublished_objects.set(deferred)
+    try:
+        yield
+    finally:
+        _deferred_unpublished_objects.reset(token)
+    if deferred:
+        make_unused_media_private(deferred)
+
+
+def make_unused_media_private(instances: "Sequence[Model]") -> None:
+    """Makes the privacy-controlled media referenced by the given unpublished objects
+    private, unless it is also referenced by a live page.
     """
     page_ct = ContentType.objects.get_for_model(Page)
+    # Combined into one query, with the conditions for each object OR-ed together
+    all_references = reduce(operator.or_, (ReferenceIndex.get_references_for_object(obj) for obj in instances))
     for model_class in get_private_media_models():
         model_ct = ContentType.objects.get_for_model(model_class)
-        references = ReferenceIndex.get_references_for_object(instance).filter(to_content_type=model_ct)
+        references = all_references.filter(to_content_type=model_ct)
         referenced_pks = set(references.values_list("to_object_id", flat=True).distinct())
         if not referenced_pks:
             continue
@@ -5,6 +5,7 @@ from wagtail.models import Site
 from wagtail_factories import DocumentFactory, ImageFactory
 
 from cms.private_media.constants import Privacy
+from cms.private_media.signal_handlers import defer_media_unpublishing
 from cms.standard_pages.models import InformationPage
 
 
@@ -131,3 +132,30 @@ class SignalHandlersTestCase(TestCase):
         # because it is still referenced by the original live page
         new_page.unpublish()
         self.assertMediaPrivacy(Privacy.PUBLIC)
+
+    def test_deferred_unpublishing_updates_media_privacy_when_the_block_exits(self):
+        """Tests that media privacy is updated once for all the pages unpublished in a deferred block."""
+        self.test_page.content = self.generate_media_referencing_content()
+        self.test_page.save_revision().publish()
+        new_page = self.make_information_page(content=self.test_page.content)
+        new_page.save_revision().publish()
+
+        with defer_media_unpublishing():
+            self.test_page.unpublish()
+            new_page.unpublish()
+            # Nothing changes until the block exits
+            self.assertMediaPrivacy(Privacy.PUBLIC)
+
+        # Both pages referencing the media are unpublished, so it becomes private
+        self.assertMediaPrivacy(Privacy.PRIVATE)
+
+    def test_failed_nested_deferred_block_drops_its_own_objects(self):
+        self.test_page.content = self.generate_media_referencing_content()
+        self.test_page.save_revision().publish()
+
+        with defer_media_unpublishing(), self.assertRaises(RuntimeError), defer_media_unpublishing():
+            self.test_page.unpublish()
+            raise RuntimeError("Failed")
+
+        # The unpublication failed, so the media is left public
+        self.assertMediaPrivacy(Privacy.PUBLIC)
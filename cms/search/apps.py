@@ -2,6 +2,7 @@ from django.apps import AppConfig
 
 
 class SearchConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
     name = "cms.search"
 
     def ready(self) -> None:
@@ -3,8 +3,12 @@ from typing import TYPE_CHECKING, Any
 
 from django.conf import settings
 from django.core.checks import Error, register
+from django.utils.module_loading import import_string
+from kafka import codec
 from wagtail.models import get_page_models
 
+from cms.search.pagination import COUNT_STRATEGIES
+
 if TYPE_CHECKING:
     from django.apps import AppConfig
 
@@ -34,6 +38,28 @@ def check_kafka_settings(app_configs: Iterable["AppConfig"] | None, **kwargs: An
                 )
             )
 
+    compression_type = getattr(settings, "KAFKA_COMPRESSION_TYPE", None)
+    if compression_type and not getattr(codec, f"has_{compression_type}", lambda: False)():
+        errors.append(
+            Error(
+                f"KAFKA_COMPRESSION_TYPE '{compression_type}' is not supported or its library is not installed.",
+                hint="Use one of 'gzip', 'snappy', 'lz4' or 'zstd', and install the matching compression library.",
+                id="search.E003",
+            )
+        )
+
+    if partitioner := getattr(settings, "KAFKA_PARTITIONER", None):
+        try:
+            import_string(partitioner)
+        except ImportError:
+            errors.append(
+                Error(
+                    f"KAFKA_PARTITIONER '{partitioner}' cannot be imported.",
+                    hint="Set KAFKA_PARTITIONER to the dotted path of a partitioner callable, or leave it unset.",
+                    id="search.E004",
+                )
+            )
+
     return errors
 
 
@@ -67,3 +93,18 @@ def check_search_index_content_type(app_configs: Iterable["AppConfig"] | None, *
             )
 
     return errors
+
+
+@register()
+def check_search_api_settings(app_configs: Iterable["AppConfig"] | None, **kwargs: Any) -> list[Error]:  # pylint: disable=unused-argument
+    """Check that the Resource API count strategy is supported."""
+    strategy = getattr(settings, "SEARCH_API_COUNT_STRATEGY", "exact")
+    if strategy not in COUNT_STRATEGIES:
+        return [
+            Error(
+                f"SEARCH_API_COUNT_STRATEGY '{strategy}' is not supported.",
+                hint=f"Use one of {', '.join(repr(choice) for choice in COUNT_STRATEGIES)}.",
+                id="search.E005",
+            )
+        ]
+    return []
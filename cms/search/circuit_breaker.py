@@ -0,0 +1,60 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency for a while, so callers fail fast instead of waiting on it.
+
+    The breaker opens after `failure_threshold` consecutive failures. While open, allow_request()
+    returns False until `reset_timeout` seconds have passed, then lets a single request through
+    to probe the dependency. A success closes the breaker, a failure keeps it open for another
+    `reset_timeout`. The state is per process, and safe to share between threads.
+    """
+
+    def __init__(self, name: str, *, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failure_count = 0
+        self._opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Half open: restart the timer so only this request probes the dependency
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Circuit breaker closed", extra={"breaker": self.name, "event": "circuit_breaker_closed"})
+            self._failure_count = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failure_count += 1
+            if self._failure_count < self.failure_threshold:
+                return
+            if self._opened_at is None:
+                logger.warning(
+                    "Circuit breaker opened",
+                    extra={
+                        "breaker": self.name,
+                        "failure_count": self._failure_count,
+                        "event": "circuit_breaker_opened",
+                    },
+                )
+            self._opened_at = time.monotonic()
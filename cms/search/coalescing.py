@@ -0,0 +1,108 @@
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import groupby
+from typing import TYPE_CHECKING
+
+from django.db import transaction
+
+if TYPE_CHECKING:
+    from cms.search.publishers import BasePublisher
+
+logger = logging.getLogger(__name__)
+
+# The buffered messages, keyed by page URI. None when no coalescing block is active.
+_buffer: ContextVar["dict[str, tuple[BasePublisher, str, dict]] | None"] = ContextVar(
+    "search_index_buffer", default=None
+)
+
+
+@contextmanager
+def coalesce_search_updates() -> Iterator[None]:
+    """Buffers the search index messages sent by the publishers inside the block.
+
+    Only the last message for each URI is kept, e.g. a page published twice is sent once,
+    and a page published then unpublished is only sent as deleted. When the block exits,
+    the messages are sent in one batch, in the order of their last update, and the
+    publishers are flushed once. With the outbox, they are recorded in one batch instead,
+    and sent by the relay. Inside a transaction, they are only sent once it commits,
+    and dropped if it is rolled back. Nested blocks join the outermost one. Like a savepoint,
+    a nested block that raises an exception discards the messages buffered inside it.
+
+    If the block raises an exception, the messages are discarded, so it should be used inside
+    the transaction that makes the changes. The buffer is held in a context variable, which
+    threads started inside the block, e.g. by a thread pool, do not inherit.
+    """
+    if (outer_buffer := _buffer.get()) is not None:
+        saved_buffer = dict(outer_buffer)
+        try:
+            yield
+        except Exception:
+            outer_buffer.clear()
+            outer_buffer.update(saved_buffer)
+            raise
+        return
+
+    buffer: dict[str, tuple[BasePublisher, str, dict]] = {}
+    token = _buffer.set(buffer)
+    try:
+        yield
+    finally:
+        _buffer.reset(token)
+    # Only reached if the block succeeded. Otherwise, the changes are rolled back with the transaction.
+    _send_buffered_messages(
+        [(publisher, channel, uri, message) for uri, (publisher, channel, message) in buffer.items()]
+    )
+
+
+def buffer_message(publisher: "BasePublisher", uri: str, channel: str, message: dict) -> bool:
+    """Adds the message to the active buffer, replacing any earlier message for the same URI.
+
+    Returns:
+        bool: False if no coalescing block is active, in which case the message should be sent now.
+    """
+    if (buffer := _buffer.get()) is None:
+        return False
+
+    buffer.pop(uri, None)
+    buffer[uri] = (publisher, channel, message)
+    return True
+
+
+def _send_buffered_messages(entries: list[tuple["BasePublisher", str, str, dict]]) -> None:
+    # Publishers that record messages in the database (the outbox) write them in the current
+    # transaction, so they are committed or rolled back with the changes.
+    in_transaction = [entry for entry in entries if entry[0].records_in_transaction]
+    on_commit = [entry for entry in entries if not entry[0].records_in_transaction]
+
+    if in_transaction:
+        _send(in_transaction)
+    if on_commit:
+        transaction.on_commit(lambda: _send(on_commit))
+
+
+def _send(entries: list[tuple["BasePublisher", str, str, dict]]) -> None:
+    publishers = {entry[0] for entry in entries}
+    try:
+        # Consecutive messages for the same channel are sent together, so that they are pipelined
+        for (publisher, channel), group in groupby(entries, key=lambda entry: (entry[0], entry[1])):
+            group_entries = list(group)
+            publisher.publish_messages_or_spool(
+                channel, [entry[3] for entry in group_entries], [entry[2] for entry in group_entries]
+            )
+        for publisher in publishers:
+            publisher.flush()
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception(
+            "Failed to send coalesced search index messages",
+            extra={"message_count": len(entries), "event": "search_publish_failed"},
+        )
+        if any(publisher.records_in_transaction for publisher in publishers):
+            raise
+        return
+
+    logger.info(
+        "Sent coalesced search index messages",
+        extra={"message_count": len(entries), "event": "search_messages_coalesced"},
+    )
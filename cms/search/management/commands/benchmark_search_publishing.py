@@ -0,0 +1,105 @@
+import statistics
+import time
+import uuid
+from typing import TYPE_CHECKING, Any
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from cms.home.models import HomePage
+from cms.search.publishers import BasePublisher, InMemoryPublisher, KafkaPublisher, OutboxPublisher
+from cms.search.signal_handlers import get_publisher, index_published_page
+from cms.standard_pages.models import InformationPage
+
+if TYPE_CHECKING:
+    from django.core.management.base import CommandParser
+
+
+class Command(BaseCommand):
+    """Measures how fast pages are published to the search index, to catch regressions locally.
+
+    Creates synthetic pages, sends each of them through the page_published signal handler's code with
+    the chosen publisher, and reports the throughput, latency and database queries per event.
+    Everything is done in a transaction that is rolled back, so no pages or outbox events are kept.
+    By default, an InMemoryPublisher stands in for Kafka, whatever the publisher settings.
+    """
+
+    publisher_choices = ("memory", "outbox", "configured")
+
+    def add_arguments(self, parser: "CommandParser") -> None:
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=200,
+            help="How many synthetic pages to publish (default: %(default)r)",
+        )
+        parser.add_argument(
+            "--publisher",
+            choices=self.publisher_choices,
+            default="memory",
+            help=(
+                "The publisher to measure: the in-memory stand-in for Kafka, the outbox, "
+                "or the one configured by the settings, unless it is Kafka (default: %(default)r)"
+            ),
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        page_count: int = options["pages"]
+        if page_count < 1:
+            raise CommandError("--pages must be at least 1.")
+        if (home_page := HomePage.objects.first()) is None:
+            raise CommandError("A home page is needed to create the synthetic pages under.")
+
+        publisher = self.get_publisher(options["publisher"])
+        with transaction.atomic():
+            pages = self.create_pages(home_page, page_count)
+
+            latencies: list[float] = []
+            with CaptureQueriesContext(connection) as queries:
+                start_time = time.perf_counter()
+                for page in pages:
+                    page_start_time = time.perf_counter()
+                    index_published_page(page, publisher)
+                    latencies.append(time.perf_counter() - page_start_time)
+                publisher.flush()
+                elapsed = time.perf_counter() - start_time
+
+            transaction.set_rollback(True)
+
+        p50, p99 = (statistics.quantiles(latencies, n=100, method="inclusive")[i] for i in (49, 98))
+        self.stdout.write(
+            f"Published {page_count} page(s) with {type(publisher).__name__} in {elapsed:.2f}s: "
+            f"{page_count / elapsed:.0f} messages/s"
+        )
+        self.stdout.write(f"Publish latency: p50 {p50 * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms")
+        self.stdout.write(f"Queries per event: {len(queries) / page_count:.1f}")
+        if isinstance(publisher, InMemoryPublisher):
+            self.stdout.write(f"Sent {publisher.message_count} message(s) in {publisher.request_count} request(s)")
+
+    def get_publisher(self, name: str) -> BasePublisher:
+        if name == "memory":
+            return InMemoryPublisher()
+        if name == "outbox":
+            return OutboxPublisher()
+        publisher = get_publisher()
+        # The synthetic pages are rolled back, but messages sent to Kafka would reach the search service
+        if isinstance(publisher, KafkaPublisher):
+            raise CommandError("--publisher=configured cannot be used with Kafka, use --publisher=memory instead.")
+        return publisher
+
+    def create_pages(self, parent: HomePage, page_count: int) -> list[InformationPage]:
+        prefix = f"search-benchmark-{uuid.uuid4().hex[:8]}"
+        pages = []
+        for i in range(page_count):
+            page = InformationPage(
+                title=f"Search benchmark page {i}",
+                slug=f"{prefix}-{i}",
+                summary="<p>A synthetic page for the search publishing benchmark.</p>",
+                content=[("rich_text", "<p>Benchmark content.</p>")],
+                last_published_at=timezone.now(),
+            )
+            parent.add_child(instance=page)
+            pages.append(page)
+        return pages
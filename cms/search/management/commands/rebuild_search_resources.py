@@ -0,0 +1,44 @@
+from typing import TYPE_CHECKING, Any
+
+from django.core.management.base import BaseCommand
+
+from cms.search.models import SearchResource
+from cms.search.serializers import store_search_resources
+from cms.search.utils import get_indexable_pages
+
+if TYPE_CHECKING:
+    from django.core.management.base import CommandParser
+
+
+class Command(BaseCommand):
+    """Rebuilds the precomputed Resource API payloads in the SearchResource table.
+
+    Run this before enabling SEARCH_API_USE_PRECOMPUTED_RESOURCES, and after changes that affect
+    the payloads without publishing the pages, e.g. a change to the resource format.
+    """
+
+    def add_arguments(self, parser: "CommandParser") -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="How many pages to load and store at a time (default: %(default)r)",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        chunk_size: int = options["chunk_size"]
+        pages = get_indexable_pages().order_by("pk")
+
+        last_id = 0
+        stored = 0
+        while chunk := list(pages.filter(pk__gt=last_id).specific().defer_streamfields()[:chunk_size]):
+            store_search_resources(chunk)
+
+            stored += len(chunk)
+            last_id = chunk[-1].pk
+            self.stdout.write(f"Stored {stored} resource(s).")
+
+        # Remove the resources of pages that are no longer indexable
+        removed, _ = SearchResource.objects.exclude(page__in=pages.values("pk")).delete()
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {stored} search resource(s), removed {removed}."))
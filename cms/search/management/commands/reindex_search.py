@@ -0,0 +1,89 @@
+import time
+from typing import TYPE_CHECKING, Any
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from cms.search.serializers import ResourceSerializer
+from cms.search.signal_handlers import get_backend_publisher
+from cms.search.utils import build_page_uri, get_indexable_pages
+
+if TYPE_CHECKING:
+    from django.core.management.base import CommandParser
+
+CHECKPOINT_CACHE_KEY = "cms.search.reindex_search.checkpoint"
+# Keep the checkpoint long enough to resume an interrupted run the next working day.
+CHECKPOINT_CACHE_TIMEOUT = 60 * 60 * 24 * 3
+
+
+class Command(BaseCommand):
+    """Sends every indexable page to the search service, e.g. to backfill or rebuild the search index.
+
+    Pages are walked in primary key order, in chunks, so each chunk is a cheap keyset query
+    no matter how far into the run we are. Each chunk is serialized in a constant number of queries.
+    The last sent page id is stored as a checkpoint after each chunk, so an interrupted run
+    can be resumed with --resume.
+    """
+
+    def add_arguments(self, parser: "CommandParser") -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="How many pages to load and send at a time (default: %(default)r)",
+        )
+        parser.add_argument(
+            "--start-after",
+            type=int,
+            default=0,
+            help="Only send pages with an id greater than this one.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            default=False,
+            help="Resume from the checkpoint saved by a previous, unfinished, run.",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=0,
+            help="The maximum number of pages to send per second. Unlimited by default.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        chunk_size: int = options["chunk_size"]
+        rate: float = options["rate"]
+        last_id: int = options["start_after"]
+        if options["resume"]:
+            last_id = cache.get(CHECKPOINT_CACHE_KEY, 0)
+            self.stdout.write(f"Resuming after page {last_id}.")
+
+        pages = get_indexable_pages().order_by("pk")
+        total = pages.filter(pk__gt=last_id).count()
+        self.stdout.write(f"Reindexing {total} page(s).")
+
+        publisher = get_backend_publisher()
+        sent = 0
+        start_time = time.monotonic()
+
+        while chunk := list(pages.filter(pk__gt=last_id).specific().defer_streamfields()[:chunk_size]):
+            publisher.publish_messages(
+                publisher.CREATED_OR_UPDATED_CHANNEL,
+                ResourceSerializer(chunk, many=True).data,
+                keys=[build_page_uri(p) for p in chunk],
+            )
+
+            sent += len(chunk)
+            last_id = chunk[-1].pk
+            cache.set(CHECKPOINT_CACHE_KEY, last_id, CHECKPOINT_CACHE_TIMEOUT)
+
+            elapsed = time.monotonic() - start_time
+            if rate and (delay := sent / rate - elapsed) > 0:
+                time.sleep(delay)
+                elapsed += delay
+
+            self.stdout.write(f"Sent {sent}/{total} page(s), {sent / max(elapsed, 0.001):.0f}/s. Checkpoint: {last_id}")
+
+        cache.delete(CHECKPOINT_CACHE_KEY)
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {sent} page(s) in {time.monotonic() - start_time:.1f}s."))
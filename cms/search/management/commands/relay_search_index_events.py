@@ -0,0 +1,46 @@
+from typing import TYPE_CHECKING, Any
+
+import pglock
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from cms.search.outbox import relay_pending_events
+from cms.search.signal_handlers import get_backend_publisher
+
+if TYPE_CHECKING:
+    from django.core.management.base import CommandParser
+
+
+class Command(BaseCommand):
+    """Drains the search index outbox, sending pending events to the configured publisher backend.
+
+    Only one relay runs at a time, so that the events for each page are sent in order. If another relay
+    is already running, the command exits straight away.
+    """
+
+    def add_arguments(self, parser: "CommandParser") -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.SEARCH_INDEX_OUTBOX_BATCH_SIZE,
+            help="How many events to send per batch (default: %(default)r)",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        batch_size = options["batch_size"]
+        publisher = get_backend_publisher()
+
+        total = 0
+        with pglock.advisory(lock_id=__name__, timeout=0) as acquired:
+            if not acquired:
+                self.stdout.write("Another relay is running.")
+                return
+
+            while True:
+                relayed = relay_pending_events(publisher, batch_size=batch_size)
+                total += relayed
+                # A short batch means the outbox is empty, or that sending failed and should be retried later.
+                if relayed < batch_size:
+                    break
+
+        self.stdout.write(f"Relayed {total} search index event(s).")
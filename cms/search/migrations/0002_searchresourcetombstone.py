@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchResourceTombstone",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ("uri", models.CharField(max_length=2048, unique=True)),
+                ("page_id", models.PositiveIntegerField(blank=True, null=True)),
+                ("deleted_at", models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                "ordering": ["pk"],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Indexes wagtailcore_page.last_published_at, which backs the Resource API "since" filter.
+
+    Wagtail does not index that column, and the Page model belongs to another app, so the
+    index is managed here with SQL. It is built concurrently, so that writes to the page table
+    are not blocked while it is built, which needs the migration to run outside a transaction.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("search", "0002_searchresourcetombstone"),
+        ("wagtailcore", "0094_alter_page_locale"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS search_page_last_published_at_idx "
+                "ON wagtailcore_page (last_published_at, id) WHERE live"
+            ),
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS search_page_last_published_at_idx",
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0003_page_last_published_at_index"),
+        ("wagtailcore", "0094_alter_page_locale"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchResource",
+            fields=[
+                (
+                    "page",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_resource",
+                        serialize=False,
+                        to="wagtailcore.page",
+                    ),
+                ),
+                ("payload", models.JSONField()),
+                ("last_published_at", models.DateTimeField(db_index=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["pk"],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0004_searchresource"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="searchindexevent",
+            name="key",
+            field=models.CharField(blank=True, max_length=2048),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Indexes the wagtailcore_page columns behind the Resource API content_type and locale filters,
+    so filtered crawls only read the matching rows.
+
+    The Page model belongs to another app, so the indexes are managed here with SQL. They are built
+    concurrently, so that writes to the page table are not blocked while they are built, which needs
+    the migration to run outside a transaction.
+    """
+
+    atomic = False
+
+    dependencies = [
+        ("search", "0005_searchindexevent_key"),
+        ("wagtailcore", "0094_alter_page_locale"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS search_page_content_type_idx "
+                "ON wagtailcore_page (content_type_id, id) WHERE live"
+            ),
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS search_page_content_type_idx",
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS search_page_locale_idx "
+                "ON wagtailcore_page (locale_id, id) WHERE live"
+            ),
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS search_page_locale_idx",
+        ),
+    ]
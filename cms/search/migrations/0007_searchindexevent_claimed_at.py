@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0006_page_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="searchindexevent",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0007_searchindexevent_claimed_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="searchindexevent",
+            name="dead_lettered_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
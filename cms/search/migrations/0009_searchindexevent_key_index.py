@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0008_searchindexevent_dead_lettered_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="searchindexevent",
+            name="key",
+            field=models.CharField(blank=True, db_index=True, max_length=2048),
+        ),
+    ]
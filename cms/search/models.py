@@ -0,0 +1,74 @@
+from typing import ClassVar
+
+from django.db import models
+from django.utils import timezone
+
+
+class SearchIndexEvent(models.Model):
+    """A search index message waiting to be relayed to the search service.
+
+    Events are written in the same database transaction as the change that caused them
+    (the "transactional outbox" pattern), so they are only sent for committed changes
+    and survive a message broker outage. See cms.search.outbox for the relay.
+    """
+
+    channel = models.CharField(max_length=255)
+    # The message key, i.e. the page URI, which determines the Kafka partition.
+    # Indexed, as KafkaPublisher checks for spooled messages for the page before each send.
+    key = models.CharField(max_length=2048, blank=True, db_index=True)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_attempted_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    # When a relay claimed the event to send it. Other relays skip it until the claim expires.
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    # When the event ran out of attempts. Dead lettered events are no longer relayed.
+    dead_lettered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering: ClassVar[list[str]] = ["pk"]
+
+    def __str__(self) -> str:
+        return f"SearchIndexEvent: {self.channel} {self.payload.get('uri', '')}"
+
+
+class SearchResourceTombstone(models.Model):
+    """Records that an indexable page was unpublished or deleted, so consumers polling the
+    Resource API for changes since a given time also learn about removals.
+
+    There is at most one tombstone per URI. It is refreshed if the page is removed again,
+    and cleared when a page is published at that URI.
+    """
+
+    uri = models.CharField(max_length=2048, unique=True)
+    page_id = models.PositiveIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering: ClassVar[list[str]] = ["pk"]
+
+    def __str__(self) -> str:
+        return f"SearchResourceTombstone: {self.uri}"
+
+
+class SearchResource(models.Model):
+    """The ready-to-serve Resource API payload of an indexable page.
+
+    Kept up to date by the signal handlers when pages are published or unpublished, and
+    rebuilt in bulk with the rebuild_search_resources management command, so that the
+    Resource API can list resources without building them on each request.
+    """
+
+    page = models.OneToOneField(
+        "wagtailcore.Page", on_delete=models.CASCADE, primary_key=True, related_name="search_resource"
+    )
+    payload = models.JSONField()
+    last_published_at = models.DateTimeField(null=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering: ClassVar[list[str]] = ["pk"]
+
+    def __str__(self) -> str:
+        return f"SearchResource: {self.payload.get('uri', '')}"
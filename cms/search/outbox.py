@@ -0,0 +1,139 @@
+import logging
+from datetime import timedelta
+from itertools import groupby
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from cms.search.models import SearchIndexEvent
+
+if TYPE_CHECKING:
+    from cms.search.publishers import BasePublisher
+
+logger = logging.getLogger(__name__)
+
+# How long a relay can take to send the events it claimed, before another relay can claim them
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+def relay_pending_events(publisher: "BasePublisher", *, batch_size: int) -> int:
+    """Sends the next batch of pending search index events using the given publisher.
+
+    The batch is claimed in a short transaction, then sent outside of any transaction, so no row locks
+    are held while waiting on the broker. Events are sent in the order they were recorded, and consecutive
+    events for the same channel are sent together with publish_messages(), so they are pipelined. If a group
+    fails, its events are sent one by one, so that only the event that fails is retried. Sent events are then
+    removed from the outbox in another short transaction. On the first failure, the failed event is marked
+    for retry and the rest of the batch is released for the next run, so that ordering is preserved.
+    Once an event has failed SEARCH_INDEX_OUTBOX_MAX_ATTEMPTS times, it is dead lettered, so that it
+    no longer holds up the events recorded after it.
+
+    Only one relay should run at a time, otherwise a batch released after a failure could be sent
+    after newer events for the same pages. The relay_search_index_events command takes care of that.
+
+    Returns:
+        int: The number of events that were sent.
+    """
+    events = claim_pending_events(batch_size)
+
+    sent_ids: list[int] = []
+    failed_event: SearchIndexEvent | None = None
+    error = ""
+    for channel, channel_events in groupby(events, key=lambda event: event.channel):
+        group = list(channel_events)
+        try:
+            publisher.publish_messages(
+                channel, [event.payload for event in group], keys=[event.key or None for event in group]
+            )
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.warning(
+                "Failed to relay search index events, sending them one by one",
+                extra={
+                    "event_ids": [event.pk for event in group],
+                    "channel": channel,
+                    "event": "search_event_relay_retrying",
+                },
+            )
+            group_sent_ids, failed_event, error = send_events_one_by_one(publisher, channel, group)
+            sent_ids += group_sent_ids
+            if failed_event is not None:
+                break
+        else:
+            sent_ids += [event.pk for event in group]
+
+    with transaction.atomic():
+        if sent_ids:
+            SearchIndexEvent.objects.filter(pk__in=sent_ids).delete()
+        if failed_event is not None:
+            record_failed_attempt(failed_event, error)
+        # Release the failed event, and those that were not sent after it, for the next run
+        SearchIndexEvent.objects.filter(pk__in=[event.pk for event in events if event.pk not in sent_ids]).update(
+            claimed_at=None
+        )
+
+    return len(sent_ids)
+
+
+def send_events_one_by_one(
+    publisher: "BasePublisher", channel: str, events: list[SearchIndexEvent]
+) -> tuple[list[int], SearchIndexEvent | None, str]:
+    """Sends the given events separately, stopping at the first one that fails.
+
+    Returns:
+        tuple: The ids of the events that were sent, then the event that failed and the error, if any.
+    """
+    sent_ids: list[int] = []
+    for event in events:
+        try:
+            publisher.publish_messages(channel, [event.payload], keys=[event.key or None])
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.exception(
+                "Failed to relay search index event",
+                extra={"event_id": event.pk, "channel": channel, "event": "search_event_relay_failed"},
+            )
+            return sent_ids, event, str(e)
+        sent_ids.append(event.pk)
+    return sent_ids, None, ""
+
+
+def record_failed_attempt(event: SearchIndexEvent, error: str) -> None:
+    """Records a failed attempt to send the given event, dead lettering it once it ran out of attempts."""
+    now = timezone.now()
+    max_attempts = settings.SEARCH_INDEX_OUTBOX_MAX_ATTEMPTS
+    is_dead_lettered = bool(max_attempts) and event.attempts + 1 >= max_attempts
+    SearchIndexEvent.objects.filter(pk=event.pk).update(
+        attempts=F("attempts") + 1,
+        last_attempted_at=now,
+        last_error=error,
+        dead_lettered_at=now if is_dead_lettered else None,
+    )
+    if is_dead_lettered:
+        logger.error(
+            "Search index event dead lettered",
+            extra={
+                "event_id": event.pk,
+                "channel": event.channel,
+                "attempts": event.attempts + 1,
+                "event": "search_event_dead_lettered",
+            },
+        )
+
+
+def claim_pending_events(batch_size: int) -> list[SearchIndexEvent]:
+    """Claims the next batch of events that no other relay is sending, in a short transaction.
+
+    Dead lettered events are skipped. Claims expire after CLAIM_TIMEOUT, so the events
+    of a relay that stopped part way are sent by the next one.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            SearchIndexEvent.objects.select_for_update(skip_locked=True)
+            .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - CLAIM_TIMEOUT), dead_lettered_at__isnull=True)
+            .order_by("pk")[:batch_size]
+        )
+        SearchIndexEvent.objects.filter(pk__in=[event.pk for event in events]).update(claimed_at=now)
+    return events
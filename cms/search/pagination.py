@@ -1,7 +1,53 @@
+import hashlib
+import json
+from typing import TYPE_CHECKING, Any, cast
+
 from django.conf import settings
-from rest_framework.pagination import LimitOffsetPagination
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
 from rest_framework.response import Response
 
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+    from rest_framework.request import Request
+    from rest_framework.views import APIView
+
+COUNT_STRATEGIES = ("exact", "cached", "estimated")
+
+
+def get_cached_count(queryset: "QuerySet") -> int:
+    """Returns the number of items in the queryset, cached for SEARCH_API_COUNT_CACHE_TIMEOUT seconds."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.md5(f"{sql}{params}".encode(), usedforsecurity=False).hexdigest()
+    return cast(
+        int, cache.get_or_set(f"cms.search.count.{digest}", queryset.count, settings.SEARCH_API_COUNT_CACHE_TIMEOUT)
+    )
+
+
+def get_estimated_count(queryset: "QuerySet") -> int:
+    """Returns the Postgres query planner's estimate of the number of items in the queryset.
+
+    The estimate is based on the table statistics, so it costs no more than planning the query.
+    It is only used for large results, where it is close enough. Below
+    SEARCH_API_COUNT_ESTIMATE_THRESHOLD, or on other databases, the items are counted.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        (plan,) = cursor.fetchone()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    if estimate < settings.SEARCH_API_COUNT_ESTIMATE_THRESHOLD:
+        return queryset.count()
+    return estimate
+
 
 class CustomLimitOffsetPagination(LimitOffsetPagination):
     """Limit/offset pagination that matches the DP API spec:
@@ -10,6 +56,37 @@ class CustomLimitOffsetPagination(LimitOffsetPagination):
 
     default_limit = settings.SEARCH_API_DEFAULT_PAGE_SIZE  # Default number of items per page
     max_limit = settings.SEARCH_API_MAX_PAGE_SIZE  # Maximum number of items per page
+    exact_count_query_param = "exact_count"
+
+    def __init__(self) -> None:
+        # Set by paginate_queryset()
+        self.request: Request | None = None
+        self.limit: int | None = None
+        self.count = 0
+        self.offset = 0
+
+    def paginate_queryset(self, queryset: "QuerySet", request: "Request", view: "APIView | None" = None) -> list[Any]:
+        """Unlike DRF, always query the requested slice, as a cached or estimated count
+        may be lower than the actual number of items.
+        """
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.count = self.get_count(queryset)
+        self.offset = self.get_offset(request)
+        return list(queryset[self.offset : self.offset + self.limit])
+
+    def get_count(self, queryset: "QuerySet") -> int:
+        """Returns the total number of items, as configured by SEARCH_API_COUNT_STRATEGY.
+        Pass ?exact_count=true to always count them.
+        """
+        strategy = settings.SEARCH_API_COUNT_STRATEGY
+        if strategy == "exact" or (
+            self.request is not None and self.request.query_params.get(self.exact_count_query_param) == "true"
+        ):
+            return queryset.count()
+        if strategy == "cached":
+            return get_cached_count(queryset)
+        return get_estimated_count(queryset)
 
     def get_paginated_response(self, data: list) -> Response:
         """Override DRF's default so we output the keys required by
@@ -24,3 +101,31 @@ class CustomLimitOffsetPagination(LimitOffsetPagination):
                 "total_count": self.count,  # size of the whole set
             }
         )
+
+
+class CustomCursorPagination(CursorPagination):
+    """Keyset pagination for crawling the whole set.
+
+    Items are ordered by page id, which is unique and indexed, so each page is fetched with
+    "WHERE id > <cursor>" rather than an OFFSET, and no COUNT(*) is needed. Deep pages cost
+    the same as the first one. The opaque cursor for the next page is returned in "next".
+    """
+
+    ordering = "pk"
+    page_size = settings.SEARCH_API_DEFAULT_PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = settings.SEARCH_API_MAX_PAGE_SIZE
+
+    def get_paginated_response(self, data: list) -> Response:
+        """Output the same keys as CustomLimitOffsetPagination where they apply,
+        plus links to the next and previous pages.
+        """
+        return Response(
+            {
+                "count": len(data),  # size of this slice
+                "items": data,  # results payload
+                "limit": self.page_size,  # the limit that was applied
+                "next": self.get_next_link(),  # URL of the next slice, or None on the last one
+                "previous": self.get_previous_link(),  # URL of the previous slice, or None on the first one
+            }
+        )
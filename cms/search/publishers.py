@@ -1,21 +1,30 @@
 import json
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, cast
+from collections import Counter, defaultdict, deque
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any, cast
 
 from aws_msk_iam_sasl_signer import MSKAuthTokenProvider
 from django.conf import settings
+from django.utils.module_loading import import_string
 from kafka import KafkaProducer
+from kafka.partitioner.default import DefaultPartitioner
 from kafka.sasl.oauth import AbstractTokenProvider
 
 from cms.core.cache import memory_cache
-from cms.search.utils import build_resource_dict
+from cms.search.circuit_breaker import CircuitBreaker
+from cms.search.coalescing import buffer_message
+from cms.search.models import SearchIndexEvent
+from cms.search.utils import build_page_uri, build_resource_dict
 
 logger = logging.getLogger(__name__)
 
 
 if TYPE_CHECKING:
-    from kafka.producer.future import RecordMetadata
+    from kafka.producer.future import FutureRecordMetadata, RecordMetadata
     from wagtail.models import Page
 
 
@@ -33,31 +42,161 @@ class BasePublisher(ABC):
 
     CREATED_OR_UPDATED_CHANNEL = "search-content-updated"
     DELETED_CHANNEL = "search-content-deleted"
+    # Whether messages are recorded in the current database transaction, rather than sent.
+    records_in_transaction = False
+    # When set, single messages are not sent while the breaker is open. Messages that are not sent,
+    # or fail to send, are spooled to the outbox instead, to be sent later by the relay.
+    circuit_breaker: CircuitBreaker | None = None
 
-    def publish_created_or_updated(self, page: "Page") -> None:
-        """Build the message for the created/updated event.
+    def publish_created_or_updated(self, page: "Page", message: dict | None = None) -> None:
+        """Build the message for the created/updated event, unless it was already built.
         Delegate sending to the subclass's _publish().
         """
-        return self._publish(self.CREATED_OR_UPDATED_CHANNEL, build_resource_dict(page))
+        return self._publish_or_buffer(
+            page, self.CREATED_OR_UPDATED_CHANNEL, message if message is not None else build_resource_dict(page)
+        )
 
     def publish_deleted(self, page: "Page") -> None:
         """Build the message for the deleted event.
         Delegate sending to the subclass's _publish().
         """
-        return self._publish(
+        return self._publish_or_buffer(
+            page,
             self.DELETED_CHANNEL,
             {
                 "uri": page.url_path,
             },
         )
 
+    def _publish_or_buffer(self, page: "Page", channel: str, message: dict) -> None:
+        """Send the message, keyed by the page URI, unless inside a coalesce_search_updates() block,
+        which sends it later.
+        """
+        uri = build_page_uri(page)
+        if buffer_message(self, uri, channel, message):
+            return None
+        return self._publish_or_spool(channel, message, key=uri)
+
+    def _publish_or_spool(self, channel: str, message: dict, key: str) -> None:
+        """Send the message, through the circuit breaker if there is one.
+
+        While earlier messages for the same key are spooled, the message is spooled after them,
+        so that the messages for a page are still sent in order.
+        """
+        if self.circuit_breaker is None:
+            return self._publish(channel, message, key=key)
+
+        if self._get_spooled_keys([key]) or not self.circuit_breaker.allow_request():
+            return self._spool(channel, message, key)
+        try:
+            result = self._publish(channel, message, key=key)
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.circuit_breaker.record_failure()
+            logger.exception(
+                "Failed to publish search index message",
+                extra={"channel": channel, "uri": key, "event": "search_publish_failed"},
+            )
+            return self._spool(channel, message, key)
+
+        self.circuit_breaker.record_success()
+        return result
+
+    def publish_messages_or_spool(self, channel: str, messages: list[dict], keys: list[str]) -> None:
+        """Send several messages with their keys, like _publish_or_spool() does for a single message.
+        Used to send the messages buffered by coalesce_search_updates().
+        """
+        if self.circuit_breaker is None:
+            return self.publish_messages(channel, messages, keys=keys)
+
+        spooled_keys = self._get_spooled_keys(keys)
+        entries = [(message, key) for message, key in zip(messages, keys, strict=True) if key not in spooled_keys]
+        for message, key in zip(messages, keys, strict=True):
+            if key in spooled_keys:
+                self._spool(channel, message, key)
+        if not entries:
+            return None
+
+        if not self.circuit_breaker.allow_request():
+            for message, key in entries:
+                self._spool(channel, message, key)
+            return None
+        try:
+            self.publish_messages(channel, [entry[0] for entry in entries], keys=[entry[1] for entry in entries])
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.circuit_breaker.record_failure()
+            logger.exception(
+                "Failed to publish search index messages",
+                extra={"channel": channel, "message_count": len(entries), "event": "search_publish_failed"},
+            )
+            # Some of the messages may have been sent. Sending them again is harmless, as they are upserts.
+            for message, key in entries:
+                self._spool(channel, message, key)
+            return None
+
+        self.circuit_breaker.record_success()
+        return None
+
+    def _get_spooled_keys(self, keys: list[str]) -> set[str]:
+        """Returns the keys that have messages waiting in the outbox. Dead lettered messages are not waiting."""
+        return set(
+            SearchIndexEvent.objects.filter(key__in=keys, dead_lettered_at__isnull=True).values_list("key", flat=True)
+        )
+
+    def _spool(self, channel: str, message: dict, key: str) -> None:
+        """Record the message in the outbox, for the relay_search_index_events command to send later."""
+        SearchIndexEvent.objects.create(channel=channel, key=key, payload=message)
+        logger.warning(
+            "Spooled search index message to the outbox",
+            extra={"channel": channel, "uri": key, "event": "search_message_spooled"},
+        )
+
+    def publish_messages(
+        self, channel: str | None, messages: Iterable[dict], keys: Iterable[str | None] | None = None
+    ) -> None:
+        """Send several already built messages to the same channel, with their keys if given.
+        Subclasses can override this to pipeline the sends.
+        """
+        for message, key in _with_keys(messages, keys):
+            self._publish(channel, message, key=key)
+
+    def flush(self) -> None:
+        """Wait for any buffered messages to be sent.
+        Call at the end of bulk operations when the publisher sends asynchronously.
+        This does nothing for publishers that record messages in the transaction, as those
+        are sent later by the outbox relay.
+        """
+        return None
+
     @abstractmethod
-    def _publish(self, channel: str | None, message: dict) -> None:
+    def _publish(self, channel: str | None, message: dict, key: str | None = None) -> None:
         """Each child class defines how to actually send/publish
-        the message (e.g., Kafka, logging, etc.).
+        the message (e.g., Kafka, logging, etc.). The key identifies the page the message is about.
         """
 
 
+def _with_keys(messages: Iterable[dict], keys: Iterable[str | None] | None) -> list[tuple[dict, str | None]]:
+    messages = list(messages)
+    if keys is None:
+        return [(message, None) for message in messages]
+    return list(zip(messages, keys, strict=True))
+
+
+def get_partitioner() -> Callable[..., int]:
+    """Return the partitioner configured with KAFKA_PARTITIONER, or kafka-python's default, keyed murmur2 one.
+    The setting can point at a partitioner callable, or a class to instantiate, like DefaultPartitioner.
+    """
+    partitioner = import_string(settings.KAFKA_PARTITIONER) if settings.KAFKA_PARTITIONER else DefaultPartitioner
+    return cast(Callable[..., int], partitioner() if isinstance(partitioner, type) else partitioner)
+
+
+def serialize_value(value: dict) -> bytes:
+    return json.dumps(value).encode("utf-8")
+
+
+def serialize_key(key: str | None) -> bytes | None:
+    return key.encode("utf-8") if key is not None else None
+
+
 class IAMKafkaTokenProvider(AbstractTokenProvider):
     """A token provider which uses IAM to request an auth token."""
 
@@ -93,27 +232,174 @@ class KafkaPublisher(BasePublisher):
         else:
             auth_config = {}
 
+        # Use kafka-python's default, keyed murmur2 partitioner unless another one is configured
+        partitioner_config = {"partitioner": get_partitioner()} if settings.KAFKA_PARTITIONER else {}
+
         self.producer = KafkaProducer(
             bootstrap_servers=settings.KAFKA_SERVERS,
             api_version=settings.KAFKA_API_VERSION,
-            value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+            value_serializer=serialize_value,
+            key_serializer=serialize_key,
             retries=5,
+            linger_ms=settings.KAFKA_LINGER_MS,
+            batch_size=settings.KAFKA_BATCH_SIZE,
+            compression_type=settings.KAFKA_COMPRESSION_TYPE,
+            # Bounds how long send() blocks, e.g. waiting for metadata when the broker is unreachable
+            max_block_ms=int(settings.KAFKA_SEND_TIMEOUT * 1000),
+            **partitioner_config,
             **auth_config,
         )
+        self.send_asynchronously = settings.KAFKA_ASYNC_SEND
+        self.failed_count = 0
+        if settings.SEARCH_PUBLISH_CIRCUIT_BREAKER_THRESHOLD:
+            self.circuit_breaker = CircuitBreaker(
+                "kafka",
+                failure_threshold=settings.SEARCH_PUBLISH_CIRCUIT_BREAKER_THRESHOLD,
+                reset_timeout=settings.SEARCH_PUBLISH_CIRCUIT_BREAKER_RESET_TIMEOUT,
+            )
 
-    def _publish(self, channel: str | None, message: dict) -> "RecordMetadata":
-        """Send the message to Kafka."""
+    def _publish(
+        self, channel: str | None, message: dict, key: str | None = None
+    ) -> "RecordMetadata | FutureRecordMetadata":
+        """Send the message to Kafka. Messages with the same key go to the same partition.
+
+        In asynchronous mode, this returns as soon as the message is buffered by the producer.
+        Delivery is reported by callbacks, and flush() waits for the buffer to be sent.
+        """
         logger.info("KafkaPublisher: Publishing to channel=%s, message=%s", channel, message)
-        future = self.producer.send(channel, message)
+        future = self.producer.send(channel, message, key=key)
+        if self.send_asynchronously:
+            future.add_callback(self._on_send_success, channel)
+            future.add_errback(self._on_send_error, channel, message)
+            return future
+
         # Wait for the send to complete and get the result
-        result = future.get(timeout=10)  # Wait up to 10s for send to complete
+        result = future.get(timeout=settings.KAFKA_SEND_TIMEOUT)
         logger.info("KafkaPublisher: Publish result for channel %s: %s", channel, result)
         return result
 
+    def _on_send_success(self, channel: str | None, result: "RecordMetadata") -> None:
+        logger.info("KafkaPublisher: Publish result for channel %s: %s", channel, result)
+
+    def _on_send_error(self, channel: str | None, message: dict, exception: Any) -> None:
+        """Count and log the failure. The message is not spooled, as this runs in the producer's I/O thread,
+        after later messages may have been sent, and outside of the transaction that published it.
+        """
+        self.failed_count += 1
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_failure()
+        logger.error(
+            "KafkaPublisher: Failed to publish message",
+            extra={
+                "channel": channel,
+                "uri": message.get("uri"),
+                "error": str(exception),
+                "failed_count": self.failed_count,
+                "event": "search_publish_failed",
+            },
+        )
+
+    def flush(self) -> None:
+        """Block until all buffered messages are sent, or the flush timeout is reached."""
+        self.producer.flush(timeout=settings.KAFKA_FLUSH_TIMEOUT)
+
+    def publish_messages(
+        self, channel: str | None, messages: Iterable[dict], keys: Iterable[str | None] | None = None
+    ) -> None:
+        """Send all the messages before waiting for any of them, so the sends are pipelined
+        and batched by the producer rather than done one round trip at a time.
+        """
+        futures = [self.producer.send(channel, message, key=key) for message, key in _with_keys(messages, keys)]
+        logger.info("KafkaPublisher: Publishing %s messages to channel=%s", len(futures), channel)
+        self.flush()
+        for future in futures:
+            future.get(timeout=settings.KAFKA_SEND_TIMEOUT)
+
 
 class LogPublisher(BasePublisher):
     """Publishes 'messages' by simply logging them (no real message bus)."""
 
-    def _publish(self, channel: str | None, message: dict) -> None:
+    def _publish(self, channel: str | None, message: dict, key: str | None = None) -> None:
         """Log the message."""
         logger.info("LogPublisher: Publishing to channel=%s, message=%s", channel, message)
+
+
+class InMemoryPublisher(BasePublisher):
+    """Mimics KafkaPublisher with an in-process broker, to measure publishing without a Kafka cluster.
+
+    Like the Kafka producer, messages are serialized, assigned a partition by their key, and added
+    to per-partition batches of up to KAFKA_BATCH_SIZE bytes. Each request to the broker, i.e. sending
+    a full batch or flushing, takes SEARCH_INDEX_MEMORY_BROKER_LATENCY_MS. Sent messages are counted
+    by channel and partition in `message_counts`, and only the last `recent_message_limit` are kept,
+    in `recent_messages`, so memory use stays flat however many messages are sent.
+    """
+
+    partition_count = 3
+    recent_message_limit = 100
+
+    def __init__(self) -> None:
+        self.partitioner = get_partitioner()
+        self.partitions = list(range(self.partition_count))
+        self.request_count = 0
+        self.message_counts: Counter[tuple[str, int]] = Counter()
+        # (channel, partition, key, value) tuples
+        self.recent_messages: deque[tuple[str, int, bytes | None, bytes]] = deque(maxlen=self.recent_message_limit)
+        self._batches: defaultdict[tuple[str, int], list[tuple[bytes | None, bytes]]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _publish(self, channel: str | None, message: dict, key: str | None = None) -> None:
+        """Send the message and wait for it to be acknowledged, like KafkaPublisher in synchronous mode."""
+        self._append(cast(str, channel), message, key)
+        self.flush()
+
+    def publish_messages(
+        self, channel: str | None, messages: Iterable[dict], keys: Iterable[str | None] | None = None
+    ) -> None:
+        for message, key in _with_keys(messages, keys):
+            self._append(cast(str, channel), message, key)
+        self.flush()
+
+    def flush(self) -> None:
+        """Send all the pending batches, in a single request."""
+        with self._lock:
+            batches = [batch for batch in self._batches.items() if batch[1]]
+            self._batches.clear()
+        if batches:
+            self._send_batches(batches)
+
+    def _append(self, channel: str, message: dict, key: str | None) -> None:
+        record = (serialize_key(key), serialize_value(message))
+        partition = self.partitioner(record[0], self.partitions, self.partitions)
+        with self._lock:
+            batch = self._batches[channel, partition]
+            batch.append(record)
+            if sum(len(value) for _, value in batch) < settings.KAFKA_BATCH_SIZE:
+                return
+            del self._batches[channel, partition]
+        self._send_batches([((channel, partition), batch)])
+
+    def _send_batches(self, batches: list[tuple[tuple[str, int], list[tuple[bytes | None, bytes]]]]) -> None:
+        time.sleep(settings.SEARCH_INDEX_MEMORY_BROKER_LATENCY_MS / 1000)
+        with self._lock:
+            self.request_count += 1
+            for (channel, partition), batch in batches:
+                self.message_counts[channel, partition] += len(batch)
+                self.recent_messages.extend((channel, partition, key, value) for key, value in batch)
+
+    @property
+    def message_count(self) -> int:
+        return sum(self.message_counts.values())
+
+
+class OutboxPublisher(BasePublisher):
+    """Records messages in the search index outbox, in the current database transaction.
+
+    The messages are sent to the configured backend by the relay_search_index_events
+    management command, so publishing never waits on the message broker.
+    """
+
+    records_in_transaction = True
+
+    def _publish(self, channel: str | None, message: dict, key: str | None = None) -> None:
+        """Store the message in the outbox."""
+        SearchIndexEvent.objects.create(channel=cast(str, channel), key=key or "", payload=message)
@@ -1,13 +1,51 @@
 from typing import TYPE_CHECKING
 
 from rest_framework import serializers
+from wagtail.coreutils import get_locales_display_names
 
-from cms.search.utils import build_resource_dict
+from cms.search.models import SearchResource
+from cms.search.utils import build_resource_dict, get_topic_ids_by_page, load_deferred_release_date_changes
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
+
     from wagtail.models import Page
 
 
+class ResourceListSerializer(serializers.ListSerializer):  # pylint: disable=abstract-method
+    """Serializes a list of pages, loading the related data they need for the whole list
+    in a constant number of queries, rather than a few queries per page.
+    """
+
+    def to_representation(self, data: "Iterable[Page]") -> list[dict]:
+        pages = list(data)
+        load_deferred_release_date_changes(pages)
+        topic_ids = get_topic_ids_by_page(pages)
+        locale_names = get_locales_display_names()
+
+        return [
+            build_resource_dict(page, topic_ids=topic_ids.get(page.pk, []), locale_names=locale_names) for page in pages
+        ]
+
+
 class ResourceSerializer(serializers.BaseSerializer):  # pylint: disable=abstract-method
+    class Meta:
+        list_serializer_class = ResourceListSerializer
+
     def to_representation(self, instance: "Page") -> dict:
         return build_resource_dict(instance)
+
+
+def store_search_resources(pages: list["Page"]) -> None:
+    """Stores the Resource API payloads of the given specific pages in the SearchResource table,
+    building them in a constant number of queries.
+    """
+    SearchResource.objects.bulk_create(
+        [
+            SearchResource(page_id=page.pk, payload=payload, last_published_at=page.last_published_at)
+            for page, payload in zip(pages, ResourceSerializer(pages, many=True).data, strict=True)
+        ],
+        update_conflicts=True,
+        unique_fields=["page"],
+        update_fields=["payload", "last_published_at", "updated_at"],
+    )
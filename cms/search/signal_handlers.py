@@ -1,32 +1,149 @@
+from collections.abc import Iterable
 from functools import cache
+from typing import TYPE_CHECKING
 
 from django.conf import settings
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from wagtail.models import Page
-from wagtail.signals import page_published, page_unpublished
+from django.utils import timezone
+from wagtail.models import Page, PageViewRestriction
+from wagtail.signals import page_published, page_slug_changed, page_unpublished, post_page_move
 
-from cms.settings.base import SEARCH_INDEX_EXCLUDED_PAGE_TYPES
+from cms.articles.models import ArticleSeriesPage
 
-from .publishers import KafkaPublisher, LogPublisher
+from .models import SearchResource, SearchResourceTombstone
+from .publishers import BasePublisher, InMemoryPublisher, KafkaPublisher, LogPublisher, OutboxPublisher
+from .serializers import store_search_resources
+from .utils import (
+    build_page_uri,
+    build_resource_dict,
+    build_uri,
+    get_indexable_page_content_type_ids,
+    get_indexable_pages,
+    is_indexable_page_type,
+)
+
+if TYPE_CHECKING:
+    from wagtail.query import PageQuerySet
 
 
 @cache
-def get_publisher() -> KafkaPublisher | LogPublisher:
+def get_backend_publisher() -> KafkaPublisher | InMemoryPublisher | LogPublisher:
     """Return the configured publisher backend."""
     backend = settings.SEARCH_INDEX_PUBLISHER_BACKEND
     if backend == "kafka":
         return KafkaPublisher()
+    if backend == "memory":
+        return InMemoryPublisher()
     return LogPublisher()
 
 
+@cache
+def get_publisher() -> BasePublisher:
+    """Return the publisher used by the signal handlers.
+
+    When the outbox is enabled, messages are recorded in the database and relayed
+    to the backend separately, rather than sent during the request.
+    """
+    if settings.SEARCH_INDEX_OUTBOX_ENABLED:
+        return OutboxPublisher()
+    return get_backend_publisher()
+
+
+def record_tombstone(page: "Page") -> None:
+    """Record that the page was removed from the search index, for the Resource API delta feed."""
+    SearchResourceTombstone.objects.update_or_create(
+        uri=build_page_uri(page), defaults={"page_id": page.pk, "deleted_at": timezone.now()}
+    )
+
+
+def record_tombstones(uris_by_page_id: dict[int, str]) -> None:
+    """Record that several pages were removed from the given URIs, in one query."""
+    deleted_at = timezone.now()
+    SearchResourceTombstone.objects.bulk_create(
+        [
+            SearchResourceTombstone(uri=uri, page_id=page_id, deleted_at=deleted_at)
+            for page_id, uri in uris_by_page_id.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["uri"],
+        update_fields=["page_id", "deleted_at"],
+    )
+
+
+def clear_tombstone(page: "Page") -> None:
+    """Remove any tombstone left at the page's URI, now that it is published again."""
+    SearchResourceTombstone.objects.filter(uri=build_page_uri(page)).delete()
+
+
+def clear_tombstones(pages: Iterable["Page"]) -> None:
+    """Remove any tombstones left at the URIs of the given pages, now that they are listed there again."""
+    SearchResourceTombstone.objects.filter(uri__in=[build_page_uri(page) for page in pages]).delete()
+
+
+def record_moved_tombstones(page: "Page", url_path_before: str, url_path_after: str) -> None:
+    """Leave tombstones at the old URIs of a page whose URL path changed, and of its descendants,
+    as they are now listed at their new URIs.
+    """
+    if url_path_before == url_path_after:
+        return
+    pages = list(get_indexable_pages().descendant_of(page, inclusive=True).only("pk", "url_path"))
+    record_tombstones(
+        {
+            moved_page.pk: build_uri(url_path_before + moved_page.url_path.removeprefix(url_path_after))
+            for moved_page in pages
+        }
+    )
+    clear_tombstones(pages)
+
+
+def update_search_resource(page: "Page", payload: dict) -> None:
+    """Store the published page's Resource API payload, or remove it if the page is private.
+    Does nothing unless SEARCH_API_USE_PRECOMPUTED_RESOURCES is enabled.
+    """
+    if not settings.SEARCH_API_USE_PRECOMPUTED_RESOURCES:
+        return
+    if page.get_view_restrictions().exists():
+        SearchResource.objects.filter(page_id=page.pk).delete()
+    else:
+        SearchResource.objects.update_or_create(
+            page_id=page.pk, defaults={"payload": payload, "last_published_at": page.last_published_at}
+        )
+
+
+def refresh_search_resources(pages: "PageQuerySet") -> None:
+    """Rebuild the stored Resource API payloads of the given pages, after a change that affects them
+    without publishing them, e.g. a move, and remove those of the pages that are no longer indexable.
+    Does nothing unless SEARCH_API_USE_PRECOMPUTED_RESOURCES is enabled.
+    """
+    if not settings.SEARCH_API_USE_PRECOMPUTED_RESOURCES:
+        return
+    indexable_pages = list(get_indexable_pages().filter(pk__in=pages.values("pk")).specific().defer_streamfields())
+    store_search_resources(indexable_pages)
+    SearchResource.objects.filter(page__in=pages.values("pk")).exclude(
+        page__in=[page.pk for page in indexable_pages]
+    ).delete()
+
+
 @receiver(page_published)
 def on_page_published(sender: "Page", instance: "Page", **kwargs: dict) -> None:  # pylint: disable=unused-argument
     """Called whenever a Wagtail Page is published (UI or code).
     instance is the published Page object.
     """
-    if instance.specific_class.__name__ not in SEARCH_INDEX_EXCLUDED_PAGE_TYPES:
-        get_publisher().publish_created_or_updated(instance)
+    index_published_page(instance, get_publisher())
+
+
+def index_published_page(page: "Page", publisher: BasePublisher) -> None:
+    """Sends the published page to the search index with the given publisher, and updates the Resource API records."""
+    if is_indexable_page_type(page):
+        # Built once, for both the search service and the Resource API
+        message = build_resource_dict(page)
+        publisher.publish_created_or_updated(page, message=message)
+        clear_tombstone(page)
+        update_search_resource(page, message)
+    elif isinstance(page, ArticleSeriesPage):
+        # Statistical articles are listed under the topics of their series
+        refresh_search_resources(page.get_children())
 
 
 @receiver(page_unpublished)
@@ -34,8 +151,11 @@ def on_page_unpublished(sender: "Page", instance: "Page", **kwargs: dict) -> Non
     """Called whenever a Wagtail Page is unpublished (UI or code).
     instance is the unpublished Page object.
     """
-    if instance.specific_class.__name__ not in SEARCH_INDEX_EXCLUDED_PAGE_TYPES:
+    if is_indexable_page_type(instance):
         get_publisher().publish_deleted(instance)
+        record_tombstone(instance)
+        if settings.SEARCH_API_USE_PRECOMPUTED_RESOURCES:
+            SearchResource.objects.filter(page_id=instance.pk).delete()
 
 
 @receiver(post_delete, sender=Page)
@@ -44,5 +164,46 @@ def on_page_deleted(sender: "Page", instance: "Page", **kwargs: dict) -> None:
     Only fires if the page is published and not in SEARCH_INDEX_EXCLUDED_PAGE_TYPES.
     """
     # Only proceed if `sender` is a subclass of Wagtail Page and the page is published
-    if instance.live and instance.specific_class.__name__ not in SEARCH_INDEX_EXCLUDED_PAGE_TYPES:
+    if instance.live and is_indexable_page_type(instance):
         get_publisher().publish_deleted(instance)
+        record_tombstone(instance)
+
+
+@receiver(post_page_move)
+def on_page_moved(instance: "Page", url_path_before: str, url_path_after: str, **kwargs: dict) -> None:
+    """Called when a page is moved, which changes the URIs of the page and its descendants."""
+    record_moved_tombstones(instance, url_path_before, url_path_after)
+    refresh_search_resources(Page.objects.descendant_of(instance, inclusive=True))
+
+
+@receiver(page_slug_changed)
+def on_page_slug_changed(sender: "Page", instance: "Page", instance_before: "Page", **kwargs: dict) -> None:  # pylint: disable=unused-argument
+    """Called when a page's slug changes, which changes the URIs of the page and its descendants."""
+    record_moved_tombstones(instance, instance_before.url_path, instance.url_path)
+    refresh_search_resources(Page.objects.descendant_of(instance, inclusive=True))
+
+
+@receiver(post_save, sender=PageViewRestriction)
+def on_page_view_restriction_saved(instance: PageViewRestriction, created: bool, **kwargs: dict) -> None:
+    """Called when a page is made private, which removes it and its descendants from the index.
+    Pages that were already private get their tombstones refreshed, which consumers can ignore.
+    """
+    if not created:
+        return
+    pages = Page.objects.descendant_of(instance.page, inclusive=True)
+    record_tombstones(
+        {
+            page.pk: build_page_uri(page)
+            for page in pages.live()
+            .filter(content_type_id__in=get_indexable_page_content_type_ids())
+            .only("pk", "url_path")
+        }
+    )
+    refresh_search_resources(pages)
+
+
+@receiver(post_delete, sender=PageViewRestriction)
+def on_page_view_restriction_deleted(instance: PageViewRestriction, **kwargs: dict) -> None:
+    """Called when a page is made public again. Pages that are indexable again lose their tombstones."""
+    clear_tombstones(get_indexable_pages().descendant_of(instance.page, inclusive=True).only("pk", "url_path"))
+    refresh_search_resources(Page.objects.descendant_of(instance.page, inclusive=True))
@@ -1,21 +1,35 @@
+import json
+from datetime import timedelta
 from unittest.mock import patch
 
 import factory
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from wagtail.models import Page
 
 from cms.articles.tests.factories import ArticleSeriesPageFactory, StatisticalArticlePageFactory
 from cms.home.models import HomePage
 from cms.methodology.tests.factories import MethodologyPageFactory
 from cms.release_calendar.models import ReleaseCalendarIndex
 from cms.release_calendar.tests.factories import ReleaseCalendarPageFactory
+from cms.search.models import SearchResource, SearchResourceTombstone
+from cms.search.pagination import get_estimated_count
+from cms.search.serializers import store_search_resources
 from cms.search.tests.helpers import ExternalAPITestMixin, ResourceDictAssertions
-from cms.search.utils import build_page_uri
+from cms.search.utils import build_page_uri, build_resource_dict, get_indexable_pages
 from cms.standard_pages.tests.factories import IndexPageFactory, InformationPageFactory
+from cms.taxonomy.models import GenericPageToTaxonomyTopic, Topic
 from cms.themes.tests.factories import ThemePageFactory
 from cms.topics.tests.factories import TopicPageFactory
 
 RESOURCE_ENDPOINT = "/v1/resources/"
+DELETED_RESOURCE_ENDPOINT = "/v1/resources/deleted/"
+EXPORT_RESOURCE_ENDPOINT = "/v1/resources/export/"
 
 
 @override_settings(IS_EXTERNAL_ENV=False)
@@ -138,3 +152,441 @@ class ResourceListViewPaginationTests(TestCase, ExternalAPITestMixin):
         self.assertEqual(data["count"], 10)
         self.assertEqual(data["limit"], 10)
         self.assertEqual(data["total_count"], self.total_resources)
+
+
+@override_settings(
+    IS_EXTERNAL_ENV=False, CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ResourceListViewCountTests(TestCase, ExternalAPITestMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.index_page = IndexPageFactory(slug="count", last_published_at=cls.now - timedelta(days=2))
+        cls.pages = [
+            cls.index_page,
+            *InformationPageFactory.create_batch(2, parent=cls.index_page, last_published_at=cls.now),
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def get_total_count(self, url=RESOURCE_ENDPOINT, **params):
+        return self.parse_json(self.client.get(url, params))["total_count"]
+
+    @override_settings(SEARCH_API_COUNT_STRATEGY="cached")
+    def test_cached_count(self):
+        self.assertEqual(self.get_total_count(), 3)
+
+        InformationPageFactory(parent=self.index_page)
+
+        self.assertEqual(self.get_total_count(), 3)
+        self.assertEqual(self.get_total_count(exact_count="true"), 4)
+
+    @override_settings(SEARCH_API_COUNT_STRATEGY="cached")
+    def test_cached_count_is_per_query(self):
+        self.assertEqual(self.get_total_count(), 3)
+        self.assertEqual(self.get_total_count(since=(self.now - timedelta(hours=1)).isoformat()), 2)
+
+    @override_settings(SEARCH_API_COUNT_STRATEGY="cached")
+    @patch("cms.search.pagination.get_cached_count", return_value=0)
+    def test_items_are_listed_when_the_count_is_stale(self, _mock_get_cached_count):
+        data = self.parse_json(self.client.get(RESOURCE_ENDPOINT))
+
+        self.assertEqual(data["total_count"], 0)
+        self.assertEqual(len(data["items"]), 3)
+
+    @override_settings(SEARCH_API_COUNT_STRATEGY="estimated")
+    def test_estimated_count_is_exact_for_small_results(self):
+        self.assertEqual(self.get_total_count(), 3)
+
+    @override_settings(SEARCH_API_COUNT_ESTIMATE_THRESHOLD=0)
+    def test_estimated_count_uses_the_query_plan(self):
+        queryset = get_indexable_pages()
+        with CaptureQueriesContext(connection) as queries:
+            estimate = get_estimated_count(queryset)
+
+        self.assertGreater(estimate, 0)
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]["sql"].startswith("EXPLAIN (FORMAT JSON)"))
+
+
+@override_settings(IS_EXTERNAL_ENV=False)
+class ResourceListViewCursorPaginationTests(TestCase, ExternalAPITestMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.index_page = IndexPageFactory(slug="custom-slug-1")
+        cls.pages = InformationPageFactory.create_batch(
+            12, parent=cls.index_page, slug=factory.Sequence(lambda n: f"test_page_{n + 1}")
+        )
+        cls.expected_uris = [build_page_uri(page) for page in [cls.index_page, *cls.pages]]
+
+    def test_first_page(self):
+        response = self.client.get(f"{RESOURCE_ENDPOINT}?pagination=cursor&limit=5")
+        self.assertEqual(response.status_code, 200)
+
+        data = self.parse_json(response)
+        self.assertEqual([item["uri"] for item in data["items"]], self.expected_uris[:5])
+        self.assertEqual(data["count"], 5)
+        self.assertEqual(data["limit"], 5)
+        self.assertIsNone(data["previous"])
+        self.assertIn("cursor=", data["next"])
+        self.assertNotIn("total_count", data)
+
+    def test_following_next_links_crawls_everything_once(self):
+        url = f"{RESOURCE_ENDPOINT}?pagination=cursor&limit=5"
+        uris = []
+        while url:
+            data = self.parse_json(self.client.get(url))
+            uris += [item["uri"] for item in data["items"]]
+            url = data["next"]
+
+        self.assertEqual(uris, self.expected_uris)
+
+    def test_deep_pages_do_not_count(self):
+        data = self.parse_json(self.client.get(f"{RESOURCE_ENDPOINT}?pagination=cursor&limit=5"))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(data["next"])
+
+        # The pages are only counted with the other ETag aggregates, rather than to paginate them
+        self.assertFalse(
+            any(
+                "COUNT(" in query["sql"] and "wagtailcore_page" in query["sql"] and "MAX(" not in query["sql"]
+                for query in queries.captured_queries
+            )
+        )
+
+    @patch("cms.search.pagination.CustomCursorPagination.max_page_size", 10)
+    def test_limit_exceeds_max_uses_max(self):
+        data = self.parse_json(self.client.get(f"{RESOURCE_ENDPOINT}?pagination=cursor&limit=30"))
+        self.assertEqual(data["count"], 10)
+        self.assertEqual(data["limit"], 10)
+
+    def test_queries_do_not_grow_with_the_page_size(self):
+        with CaptureQueriesContext(connection) as small_page:
+            self.client.get(f"{RESOURCE_ENDPOINT}?pagination=cursor&limit=2")
+        with CaptureQueriesContext(connection) as large_page:
+            self.client.get(f"{RESOURCE_ENDPOINT}?pagination=cursor&limit=10")
+
+        self.assertEqual(len(large_page), len(small_page))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f"{RESOURCE_ENDPOINT}?pagination=cursor&cursor=invalid")
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(IS_EXTERNAL_ENV=False)
+class ResourceListViewSinceTests(TestCase, ExternalAPITestMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.old_page = InformationPageFactory(last_published_at=cls.now - timedelta(days=2))
+        cls.new_page = InformationPageFactory(last_published_at=cls.now - timedelta(minutes=1))
+
+    def get_uris(self, url):
+        response = self.client.get(url, {"since": (self.now - timedelta(hours=1)).isoformat()})
+        self.assertEqual(response.status_code, 200)
+        return [item["uri"] for item in self.parse_json(response)["items"]]
+
+    def test_since_only_lists_resources_published_since(self):
+        self.assertEqual(self.get_uris(RESOURCE_ENDPOINT), [build_page_uri(self.new_page)])
+
+    def test_since_with_cursor_pagination(self):
+        self.assertEqual(self.get_uris(f"{RESOURCE_ENDPOINT}?pagination=cursor"), [build_page_uri(self.new_page)])
+
+    def test_invalid_since(self):
+        response = self.client.get(RESOURCE_ENDPOINT, {"since": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("since", self.parse_json(response))
+
+
+@override_settings(IS_EXTERNAL_ENV=False)
+class DeletedResourceListViewTests(TestCase, ExternalAPITestMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.old_tombstone = SearchResourceTombstone.objects.create(
+            uri="/old/", page_id=1, deleted_at=cls.now - timedelta(days=2)
+        )
+        cls.new_tombstone = SearchResourceTombstone.objects.create(
+            uri="/new/", page_id=2, deleted_at=cls.now - timedelta(minutes=1)
+        )
+
+    def test_lists_all_tombstones(self):
+        data = self.parse_json(self.client.get(DELETED_RESOURCE_ENDPOINT))
+
+        self.assertEqual([item["uri"] for item in data["items"]], ["/old/", "/new/"])
+        self.assertEqual(data["total_count"], 2)
+        self.assertEqual(data["items"][1]["deleted_at"], self.new_tombstone.deleted_at.isoformat())
+
+    def test_since(self):
+        response = self.client.get(DELETED_RESOURCE_ENDPOINT, {"since": (self.now - timedelta(hours=1)).isoformat()})
+
+        self.assertEqual([item["uri"] for item in self.parse_json(response)["items"]], ["/new/"])
+
+    def test_unpublishing_a_page_lists_it(self):
+        page = InformationPageFactory()
+        page.unpublish()
+
+        data = self.parse_json(self.client.get(DELETED_RESOURCE_ENDPOINT))
+        self.assertIn(build_page_uri(page), [item["uri"] for item in data["items"]])
+
+    def test_available_in_external_env(self):
+        response = self.call_view_as_external(DELETED_RESOURCE_ENDPOINT)
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(IS_EXTERNAL_ENV=False)
+class ResourceListViewFilterTests(TestCase, ExternalAPITestMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.topic = Topic(id="api-topic", title="API topic")
+        Topic.save_new(cls.topic)
+
+        cls.information_page = InformationPageFactory()
+        GenericPageToTaxonomyTopic.objects.create(page=cls.information_page, topic=cls.topic)
+        cls.release_page = ReleaseCalendarPageFactory()
+        cls.series = ArticleSeriesPageFactory()
+        GenericPageToTaxonomyTopic.objects.create(page=cls.series, topic=cls.topic)
+        cls.article = StatisticalArticlePageFactory(parent=cls.series)
+        cls.methodology_page = MethodologyPageFactory()
+
+    def get_uris(self, url=RESOURCE_ENDPOINT, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return {item["uri"] for item in self.parse_json(response)["items"]}
+
+    def test_content_type(self):
+        self.assertEqual(self.get_uris(content_type="release"), {build_page_uri(self.release_page)})
+        self.assertEqual(self.get_uris(content_type="bulletin"), {build_page_uri(self.article)})
+
+    def test_invalid_content_type(self):
+        response = self.client.get(RESOURCE_ENDPOINT, {"content_type": "dataset"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("content_type", self.parse_json(response))
+
+    def test_topic(self):
+        self.assertEqual(
+            self.get_uris(topic=self.topic.pk), {build_page_uri(self.information_page), build_page_uri(self.article)}
+        )
+
+    def test_locale(self):
+        self.assertEqual(self.get_uris(locale="en-gb"), self.get_uris())
+        self.assertEqual(self.get_uris(locale="cy"), set())
+
+    def test_combined_filters(self):
+        self.assertEqual(
+            self.get_uris(content_type="static_page", topic=self.topic.pk, locale="en-gb"),
+            {build_page_uri(self.information_page)},
+        )
+
+    def test_filters_with_cursor_pagination_and_export(self):
+        self.assertEqual(
+            self.get_uris(pagination="cursor", content_type="release"), {build_page_uri(self.release_page)}
+        )
+        response = self.client.get(EXPORT_RESOURCE_ENDPOINT, {"content_type": "release"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["uri"] for line in lines], [build_page_uri(self.release_page)])
+
+    @override_settings(SEARCH_API_USE_PRECOMPUTED_RESOURCES=True)
+    def test_precomputed_resources(self):
+        SearchResource.objects.create(page=self.information_page, payload={"uri": "/information/"})
+        SearchResource.objects.create(page=self.release_page, payload={"uri": "/release/"})
+
+        self.assertEqual(self.get_uris(content_type="release"), {"/release/"})
+        self.assertEqual(self.get_uris(topic=self.topic.pk), {"/information/"})
+        self.assertEqual(self.get_uris(locale="en-gb"), {"/information/", "/release/"})
+
+
+@override_settings(IS_EXTERNAL_ENV=False, SEARCH_API_USE_PRECOMPUTED_RESOURCES=True)
+class ResourceListViewPrecomputedTests(TestCase, ExternalAPITestMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.old_page = InformationPageFactory()
+        cls.new_page = InformationPageFactory()
+        SearchResource.objects.create(
+            page=cls.old_page, payload={"uri": "/old/"}, last_published_at=cls.now - timedelta(days=2)
+        )
+        SearchResource.objects.create(
+            page=cls.new_page, payload={"uri": "/new/"}, last_published_at=cls.now - timedelta(minutes=1)
+        )
+
+    def test_lists_precomputed_payloads(self):
+        # The last modified aggregates, then the count and the payloads
+        with self.assertNumQueries(4):
+            data = self.parse_json(self.client.get(RESOURCE_ENDPOINT))
+
+        self.assertEqual(data["items"], [{"uri": "/old/"}, {"uri": "/new/"}])
+        self.assertEqual(data["total_count"], 2)
+
+    def test_since(self):
+        response = self.client.get(RESOURCE_ENDPOINT, {"since": (self.now - timedelta(hours=1)).isoformat()})
+
+        self.assertEqual(self.parse_json(response)["items"], [{"uri": "/new/"}])
+
+    def test_cursor_pagination(self):
+        data = self.parse_json(self.client.get(f"{RESOURCE_ENDPOINT}?pagination=cursor&limit=1"))
+
+        self.assertEqual(data["items"], [{"uri": "/old/"}])
+        self.assertEqual(self.parse_json(self.client.get(data["next"]))["items"], [{"uri": "/new/"}])
+
+
+@override_settings(IS_EXTERNAL_ENV=False)
+class ResourceExportViewTests(TestCase, ExternalAPITestMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.index_page = IndexPageFactory(slug="custom-slug-1", last_published_at=cls.now - timedelta(days=2))
+        cls.pages = InformationPageFactory.create_batch(
+            5,
+            parent=cls.index_page,
+            slug=factory.Sequence(lambda n: f"test_page_{n + 1}"),
+            last_published_at=cls.now - timedelta(minutes=1),
+        )
+        # Excluded from the search index
+        cls.article_series = ArticleSeriesPageFactory()
+
+    @staticmethod
+    def get_items(response):
+        return [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+
+    @patch("cms.search.views.ResourceExportView.chunk_size", 2)
+    def test_streams_all_resources_as_ndjson(self):
+        response = self.client.get(EXPORT_RESOURCE_ENDPOINT)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            self.get_items(response),
+            [build_resource_dict(page) for page in [self.index_page, *self.pages]],
+        )
+
+    def test_since(self):
+        response = self.client.get(EXPORT_RESOURCE_ENDPOINT, {"since": (self.now - timedelta(hours=1)).isoformat()})
+
+        self.assertEqual([item["uri"] for item in self.get_items(response)], [build_page_uri(p) for p in self.pages])
+
+    def test_invalid_since(self):
+        response = self.client.get(EXPORT_RESOURCE_ENDPOINT, {"since": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(SEARCH_API_USE_PRECOMPUTED_RESOURCES=True)
+    def test_precomputed_resources(self):
+        SearchResource.objects.create(page=self.index_page, payload={"uri": "/precomputed/"})
+
+        response = self.client.get(EXPORT_RESOURCE_ENDPOINT)
+
+        self.assertEqual(self.get_items(response), [{"uri": "/precomputed/"}])
+
+    def test_available_in_external_env(self):
+        response = self.call_view_as_external(EXPORT_RESOURCE_ENDPOINT)
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(IS_EXTERNAL_ENV=False)
+class ResourceListViewConditionalGetTests(TestCase, ExternalAPITestMixin):
+    @classmethod
+    def setUpTestData(cls):
+        cls.last_published_at = timezone.now() - timedelta(hours=1)
+        cls.page = InformationPageFactory(last_published_at=cls.last_published_at)
+
+    def test_response_has_validators(self):
+        response = self.client.get(RESOURCE_ENDPOINT)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["ETag"])
+        self.assertEqual(response["Last-Modified"], http_date(self.last_published_at.timestamp()))
+
+    def test_if_none_match(self):
+        etag = self.client.get(RESOURCE_ENDPOINT)["ETag"]
+
+        # Only the view restrictions lookup and the last modified aggregates are run
+        with self.assertNumQueries(4):
+            response = self.client.get(RESOURCE_ENDPOINT, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_is_not_answered(self):
+        """Last-Modified has a resolution of one second, so it is not used to skip responses."""
+        last_modified = self.client.get(RESOURCE_ENDPOINT)["Last-Modified"]
+
+        response = self.client.get(RESOURCE_ENDPOINT, headers={"if-modified-since": last_modified})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_publishing_changes_the_validators(self):
+        etag = self.client.get(RESOURCE_ENDPOINT)["ETag"]
+        InformationPageFactory(last_published_at=timezone.now())
+
+        response = self.client.get(RESOURCE_ENDPOINT, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_removing_a_resource_changes_the_validators(self):
+        etag = self.client.get(RESOURCE_ENDPOINT)["ETag"]
+        SearchResourceTombstone.objects.create(uri="/removed/")
+
+        response = self.client.get(RESOURCE_ENDPOINT, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_publishing_an_article_series_changes_the_validators(self):
+        """Statistical articles list the topics of their series, which is not listed itself."""
+        series = ArticleSeriesPageFactory()
+        Page.objects.filter(pk=series.pk).update(last_published_at=self.last_published_at - timedelta(hours=1))
+        etag = self.client.get(RESOURCE_ENDPOINT)["ETag"]
+        Page.objects.filter(pk=series.pk).update(last_published_at=timezone.now())
+
+        response = self.client.get(RESOURCE_ENDPOINT, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_leaving_a_filtered_listing_changes_the_validators(self):
+        """A page untagged from a topic leaves the ?topic= listing, without a newer publication in it."""
+        topic = Topic(id="etag-topic", title="ETag topic")
+        Topic.save_new(topic)
+        older_page = InformationPageFactory(last_published_at=self.last_published_at - timedelta(hours=1))
+        GenericPageToTaxonomyTopic.objects.create(page=self.page, topic=topic)
+        GenericPageToTaxonomyTopic.objects.create(page=older_page, topic=topic)
+        etag = self.client.get(f"{RESOURCE_ENDPOINT}?topic={topic.pk}")["ETag"]
+        GenericPageToTaxonomyTopic.objects.filter(page=older_page).delete()
+
+        response = self.client.get(f"{RESOURCE_ENDPOINT}?topic={topic.pk}", headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_clearing_a_tombstone_changes_the_validators(self):
+        """A page made public again leaves the tombstones no newer, but fewer."""
+        SearchResourceTombstone.objects.create(uri="/private/", deleted_at=self.last_published_at - timedelta(hours=1))
+        etag = self.client.get(RESOURCE_ENDPOINT)["ETag"]
+        SearchResourceTombstone.objects.filter(uri="/private/").delete()
+
+        response = self.client.get(RESOURCE_ENDPOINT, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(SEARCH_API_USE_PRECOMPUTED_RESOURCES=True)
+    def test_refreshing_a_precomputed_resource_changes_the_validators(self):
+        store_search_resources([self.page])
+        etag = self.client.get(RESOURCE_ENDPOINT)["ETag"]
+        store_search_resources([self.page])
+
+        response = self.client.get(RESOURCE_ENDPOINT, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_deleted_resources_are_not_modified_until_a_resource_changes(self):
+        etag = self.client.get(DELETED_RESOURCE_ENDPOINT)["ETag"]
+        self.assertEqual(
+            self.client.get(DELETED_RESOURCE_ENDPOINT, headers={"if-none-match": etag}).status_code,
+            304,
+        )
+
+        InformationPageFactory(last_published_at=timezone.now())
+
+        self.assertEqual(
+            self.client.get(DELETED_RESOURCE_ENDPOINT, headers={"if-none-match": etag}).status_code,
+            200,
+        )
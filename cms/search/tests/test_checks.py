@@ -3,7 +3,7 @@ from unittest.mock import patch
 from django.test import TestCase, override_settings
 from wagtail.models import Page
 
-from cms.search.checks import check_kafka_settings, check_search_index_content_type
+from cms.search.checks import check_kafka_settings, check_search_api_settings, check_search_index_content_type
 
 
 class KafkaSettingsCheckTests(TestCase):
@@ -53,6 +53,54 @@ class KafkaSettingsCheckTests(TestCase):
         errors = check_kafka_settings(app_configs=None)
         self.assertEqual(errors, [])
 
+    @override_settings(
+        SEARCH_INDEX_PUBLISHER_BACKEND="kafka",
+        KAFKA_SERVERS="localhost:9092",
+        KAFKA_COMPRESSION_TYPE="gzip",
+    )
+    def test_supported_compression_type(self):
+        errors = check_kafka_settings(app_configs=None)
+        self.assertEqual(errors, [])
+
+    @override_settings(
+        SEARCH_INDEX_PUBLISHER_BACKEND="kafka",
+        KAFKA_SERVERS="localhost:9092",
+        KAFKA_COMPRESSION_TYPE="zstd",
+    )
+    @patch("cms.search.checks.codec.has_zstd", return_value=False)
+    def test_compression_library_not_installed(self, _mock_has_zstd):
+        errors = check_kafka_settings(app_configs=None)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].id, "search.E003")
+
+    @override_settings(
+        SEARCH_INDEX_PUBLISHER_BACKEND="kafka",
+        KAFKA_SERVERS="localhost:9092",
+        KAFKA_COMPRESSION_TYPE="unknown",
+    )
+    def test_unknown_compression_type(self):
+        errors = check_kafka_settings(app_configs=None)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].id, "search.E003")
+
+    @override_settings(
+        SEARCH_INDEX_PUBLISHER_BACKEND="kafka",
+        KAFKA_SERVERS="localhost:9092",
+        KAFKA_PARTITIONER="kafka.partitioner.default.DefaultPartitioner",
+    )
+    def test_valid_partitioner(self):
+        self.assertEqual(check_kafka_settings(app_configs=None), [])
+
+    @override_settings(
+        SEARCH_INDEX_PUBLISHER_BACKEND="kafka",
+        KAFKA_SERVERS="localhost:9092",
+        KAFKA_PARTITIONER="kafka.partitioner.unknown",
+    )
+    def test_unknown_partitioner(self):
+        errors = check_kafka_settings(app_configs=None)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].id, "search.E004")
+
 
 class SearchIndexContentTypeCheckTests(TestCase):
     """Tests for the check_search_index_content_type system check,
@@ -137,3 +185,16 @@ class SearchIndexContentTypeCheckTests(TestCase):
         self.assertEqual(len(errors), 1)
         self.assertIn("IncludedPage", errors[0].msg)
         self.assertEqual(errors[0].id, "search.E002")
+
+
+class SearchAPISettingsCheckTests(TestCase):
+    def test_valid_count_strategy(self):
+        for strategy in ("exact", "cached", "estimated"):
+            with self.subTest(strategy=strategy), override_settings(SEARCH_API_COUNT_STRATEGY=strategy):
+                self.assertEqual(check_search_api_settings(app_configs=None), [])
+
+    @override_settings(SEARCH_API_COUNT_STRATEGY="approximate")
+    def test_unknown_count_strategy(self):
+        errors = check_search_api_settings(app_configs=None)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].id, "search.E005")
@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from cms.search.circuit_breaker import CircuitBreaker
+
+
+@patch("cms.search.circuit_breaker.time.monotonic", return_value=100)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+
+    def test_opens_after_consecutive_failures(self, _mock_monotonic):
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow_request())
+
+        with self.assertLogs("cms.search.circuit_breaker", level="WARNING"):
+            self.breaker.record_failure()
+
+        self.assertTrue(self.breaker.is_open)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_success_resets_the_failure_count(self, _mock_monotonic):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        self.assertFalse(self.breaker.is_open)
+
+    def test_lets_one_request_through_after_the_reset_timeout(self, mock_monotonic):
+        with self.assertLogs("cms.search.circuit_breaker", level="WARNING"):
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+
+        mock_monotonic.return_value = 129
+        self.assertFalse(self.breaker.allow_request())
+
+        mock_monotonic.return_value = 130
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_failed_probe_keeps_the_breaker_open(self, mock_monotonic):
+        with self.assertLogs("cms.search.circuit_breaker", level="WARNING"):
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+
+        mock_monotonic.return_value = 130
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure()
+
+        mock_monotonic.return_value = 159
+        self.assertFalse(self.breaker.allow_request())
+        mock_monotonic.return_value = 160
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_successful_probe_closes_the_breaker(self, mock_monotonic):
+        with self.assertLogs("cms.search.circuit_breaker", level="WARNING"):
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+
+        mock_monotonic.return_value = 130
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success()
+
+        self.assertFalse(self.breaker.is_open)
+        self.assertTrue(self.breaker.allow_request())
@@ -0,0 +1,142 @@
+from unittest.mock import patch
+
+from django.db import transaction
+from django.test import TestCase
+
+from cms.search.coalescing import coalesce_search_updates
+from cms.search.models import SearchIndexEvent
+from cms.search.publishers import LogPublisher, OutboxPublisher
+from cms.search.utils import build_page_uri
+from cms.standard_pages.tests.factories import InformationPageFactory
+
+
+class CoalesceSearchUpdatesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.page = InformationPageFactory()
+        cls.other_page = InformationPageFactory()
+
+    def setUp(self):
+        self.publisher = LogPublisher()
+        publish_messages_patcher = patch.object(self.publisher, "publish_messages")
+        self.mock_publish_messages = publish_messages_patcher.start()
+        self.addCleanup(publish_messages_patcher.stop)
+        flush_patcher = patch.object(self.publisher, "flush")
+        self.mock_flush = flush_patcher.start()
+        self.addCleanup(flush_patcher.stop)
+
+    def get_sent(self):
+        return [
+            (call.args[0], [message["uri"] for message in call.args[1]])
+            for call in self.mock_publish_messages.call_args_list
+        ]
+
+    def test_messages_are_sent_once_per_uri_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks, coalesce_search_updates():
+            self.publisher.publish_created_or_updated(self.page)
+            self.publisher.publish_created_or_updated(self.other_page)
+            self.publisher.publish_created_or_updated(self.page)
+
+        self.mock_publish_messages.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(
+            self.get_sent(),
+            [("search-content-updated", [build_page_uri(self.other_page), build_page_uri(self.page)])],
+        )
+        self.mock_flush.assert_called_once()
+
+    def test_messages_are_keyed_by_uri(self):
+        with self.captureOnCommitCallbacks(execute=True), coalesce_search_updates():
+            self.publisher.publish_deleted(self.page)
+
+        self.mock_publish_messages.assert_called_once_with(
+            "search-content-deleted", [{"uri": self.page.url_path}], keys=[build_page_uri(self.page)]
+        )
+
+    def test_last_message_for_a_uri_wins(self):
+        with self.captureOnCommitCallbacks(execute=True), coalesce_search_updates():
+            self.publisher.publish_created_or_updated(self.page)
+            self.publisher.publish_created_or_updated(self.other_page)
+            self.publisher.publish_deleted(self.page)
+
+        self.assertEqual(
+            self.get_sent(),
+            [
+                ("search-content-updated", [build_page_uri(self.other_page)]),
+                ("search-content-deleted", [self.page.url_path]),
+            ],
+        )
+
+    def test_nested_blocks_join_the_outer_one(self):
+        with self.captureOnCommitCallbacks(execute=True), coalesce_search_updates():
+            with coalesce_search_updates():
+                self.publisher.publish_created_or_updated(self.page)
+            self.mock_publish_messages.assert_not_called()
+            self.publisher.publish_created_or_updated(self.page)
+
+        self.assertEqual(self.get_sent(), [("search-content-updated", [build_page_uri(self.page)])])
+
+    def test_messages_are_dropped_when_the_transaction_is_rolled_back(self):
+        with (
+            self.captureOnCommitCallbacks(execute=True),
+            self.assertRaises(RuntimeError),
+            transaction.atomic(),
+            coalesce_search_updates(),
+        ):
+            self.publisher.publish_created_or_updated(self.page)
+            raise RuntimeError("Rollback")
+
+        self.mock_publish_messages.assert_not_called()
+
+    def test_messages_are_discarded_when_the_block_fails(self):
+        with (
+            self.captureOnCommitCallbacks(execute=True) as callbacks,
+            self.assertRaises(RuntimeError),
+            coalesce_search_updates(),
+        ):
+            self.publisher.publish_created_or_updated(self.page)
+            raise RuntimeError("Failed")
+
+        self.assertEqual(callbacks, [])
+        self.mock_publish_messages.assert_not_called()
+
+    def test_failed_nested_block_discards_its_own_messages(self):
+        with self.captureOnCommitCallbacks(execute=True), coalesce_search_updates():
+            self.publisher.publish_created_or_updated(self.page)
+            with self.assertRaises(RuntimeError), coalesce_search_updates():
+                self.publisher.publish_deleted(self.page)
+                self.publisher.publish_created_or_updated(self.other_page)
+                raise RuntimeError("Failed")
+
+        self.assertEqual(self.get_sent(), [("search-content-updated", [build_page_uri(self.page)])])
+
+    def test_send_failures_are_logged(self):
+        self.mock_publish_messages.side_effect = RuntimeError("Broker unavailable")
+
+        with (
+            self.assertLogs("cms.search.coalescing", level="ERROR"),
+            self.captureOnCommitCallbacks(execute=True),
+            coalesce_search_updates(),
+        ):
+            self.publisher.publish_created_or_updated(self.page)
+
+    def test_messages_are_sent_immediately_outside_a_block(self):
+        with self.assertLogs("cms.search.publishers", level="INFO"):
+            self.publisher.publish_created_or_updated(self.page)
+
+        self.mock_publish_messages.assert_not_called()
+        self.mock_flush.assert_not_called()
+
+    def test_outbox_events_are_recorded_in_the_transaction(self):
+        SearchIndexEvent.objects.all().delete()
+        publisher = OutboxPublisher()
+
+        with self.captureOnCommitCallbacks() as callbacks, coalesce_search_updates():
+            publisher.publish_created_or_updated(self.page)
+            publisher.publish_created_or_updated(self.page)
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(SearchIndexEvent.objects.count(), 1)
@@ -0,0 +1,191 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from cms.articles.tests.factories import ArticleSeriesPageFactory
+from cms.search.management.commands.reindex_search import CHECKPOINT_CACHE_KEY
+from cms.search.models import SearchIndexEvent, SearchResource
+from cms.search.signal_handlers import get_backend_publisher, get_publisher
+from cms.search.utils import build_page_uri, build_resource_dict
+from cms.standard_pages.models import InformationPage
+from cms.standard_pages.tests.factories import IndexPageFactory, InformationPageFactory
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class ReindexSearchCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.index_page = IndexPageFactory(slug="reindex")
+        cls.pages = [cls.index_page, *InformationPageFactory.create_batch(4, parent=cls.index_page)]
+        # Excluded from the search index
+        cls.article_series = ArticleSeriesPageFactory()
+        cls.draft_page = InformationPageFactory(parent=cls.index_page, live=False)
+
+    def setUp(self):
+        self.stdout = StringIO()
+        cache.delete(CHECKPOINT_CACHE_KEY)
+
+        get_backend_publisher_patcher = patch("cms.search.management.commands.reindex_search.get_backend_publisher")
+        self.mock_publisher = get_backend_publisher_patcher.start().return_value
+        self.mock_publisher.CREATED_OR_UPDATED_CHANNEL = "search-content-updated"
+        self.addCleanup(get_backend_publisher_patcher.stop)
+
+    def call_command(self, **kwargs):
+        call_command("reindex_search", stdout=self.stdout, **kwargs)
+
+    def get_sent_uris(self):
+        return [
+            message["uri"] for call in self.mock_publisher.publish_messages.call_args_list for message in call.args[1]
+        ]
+
+    def test_sends_all_indexable_pages_in_chunks(self):
+        self.call_command(chunk_size=2)
+
+        self.assertEqual(self.mock_publisher.publish_messages.call_count, 3)
+        for call in self.mock_publisher.publish_messages.call_args_list:
+            self.assertEqual(call.args[0], "search-content-updated")
+        self.assertEqual(self.get_sent_uris(), [build_page_uri(page) for page in self.pages])
+        self.assertEqual(
+            [key for call in self.mock_publisher.publish_messages.call_args_list for key in call.kwargs["keys"]],
+            [build_page_uri(page) for page in self.pages],
+        )
+        self.assertIn("Reindexed 5 page(s)", self.stdout.getvalue())
+
+    def test_chunks_are_serialized_in_a_constant_number_of_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.call_command()
+        InformationPageFactory.create_batch(3, parent=self.index_page)
+
+        with self.assertNumQueries(len(queries)):
+            self.call_command()
+
+        self.assertEqual(self.mock_publisher.publish_messages.call_count, 2)
+
+    def test_start_after(self):
+        self.call_command(start_after=self.pages[2].pk)
+
+        self.assertEqual(self.get_sent_uris(), [build_page_uri(page) for page in self.pages[3:]])
+
+    def test_resume_from_checkpoint(self):
+        cache.set(CHECKPOINT_CACHE_KEY, self.pages[1].pk)
+
+        self.call_command(resume=True)
+
+        self.assertEqual(self.get_sent_uris(), [build_page_uri(page) for page in self.pages[2:]])
+
+    def test_checkpoint_is_kept_when_interrupted(self):
+        self.mock_publisher.publish_messages.side_effect = [None, RuntimeError("Broker unavailable")]
+
+        with self.assertRaises(RuntimeError):
+            self.call_command(chunk_size=2)
+
+        self.assertEqual(cache.get(CHECKPOINT_CACHE_KEY), self.pages[1].pk)
+
+    def test_checkpoint_is_cleared_when_finished(self):
+        self.call_command()
+
+        self.assertIsNone(cache.get(CHECKPOINT_CACHE_KEY))
+
+    @patch("cms.search.management.commands.reindex_search.time.sleep")
+    def test_rate_limit(self, mock_sleep):
+        self.call_command(chunk_size=1, rate=1)
+
+        self.assertEqual(mock_sleep.call_count, 5)
+
+
+class RelaySearchIndexEventsCommandTests(TestCase):
+    def setUp(self):
+        SearchIndexEvent.objects.all().delete()
+        SearchIndexEvent.objects.bulk_create(
+            SearchIndexEvent(channel="search-content-deleted", payload={"uri": f"/page-{i}/"}) for i in range(5)
+        )
+
+    @patch("cms.search.management.commands.relay_search_index_events.get_backend_publisher")
+    def test_command_drains_the_outbox(self, mock_get_backend_publisher):
+        stdout = StringIO()
+        call_command("relay_search_index_events", batch_size=2, stdout=stdout)
+
+        self.assertEqual(mock_get_backend_publisher.return_value.publish_messages.call_count, 3)
+        self.assertFalse(SearchIndexEvent.objects.exists())
+        self.assertIn("Relayed 5 search index event(s).", stdout.getvalue())
+
+    @patch("cms.search.management.commands.relay_search_index_events.pglock.advisory")
+    @patch("cms.search.management.commands.relay_search_index_events.get_backend_publisher")
+    def test_command_exits_while_another_relay_is_running(self, mock_get_backend_publisher, mock_advisory):
+        mock_advisory.return_value.__enter__.return_value = False
+        stdout = StringIO()
+        call_command("relay_search_index_events", stdout=stdout)
+
+        mock_get_backend_publisher.return_value.publish_messages.assert_not_called()
+        self.assertEqual(SearchIndexEvent.objects.count(), 5)
+        self.assertIn("Another relay is running.", stdout.getvalue())
+
+
+class RebuildSearchResourcesCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.index_page = IndexPageFactory(slug="rebuild")
+        cls.pages = [cls.index_page, *InformationPageFactory.create_batch(2, parent=cls.index_page)]
+        cls.draft_page = InformationPageFactory(parent=cls.index_page, live=False)
+
+    def test_stores_indexable_pages_and_removes_stale_resources(self):
+        SearchResource.objects.create(page=self.draft_page, payload={"uri": "/stale/"})
+        SearchResource.objects.create(page=self.pages[0], payload={"uri": "/outdated/"})
+        stdout = StringIO()
+
+        call_command("rebuild_search_resources", chunk_size=2, stdout=stdout)
+
+        self.assertEqual(
+            {resource.page_id: resource.payload for resource in SearchResource.objects.all()},
+            {page.pk: build_resource_dict(page) for page in self.pages},
+        )
+        self.assertIn("Rebuilt 3 search resource(s), removed 1.", stdout.getvalue())
+
+
+@override_settings(SEARCH_INDEX_OUTBOX_ENABLED=True, SEARCH_INDEX_MEMORY_BROKER_LATENCY_MS=0)
+class BenchmarkSearchPublishingCommandTests(TestCase):
+    def test_publishes_synthetic_pages_and_rolls_them_back(self):
+        page_count = InformationPage.objects.count()
+        stdout = StringIO()
+
+        call_command("benchmark_search_publishing", pages=3, stdout=stdout)
+
+        self.assertEqual(InformationPage.objects.count(), page_count)
+        self.assertFalse(SearchIndexEvent.objects.exists())
+        output = stdout.getvalue()
+        self.assertIn("Published 3 page(s) with InMemoryPublisher", output)
+        self.assertIn("Publish latency: p50", output)
+        self.assertIn("Queries per event:", output)
+        self.assertIn("Sent 3 message(s) in 3 request(s)", output)
+
+    def test_outbox_publisher(self):
+        stdout = StringIO()
+
+        call_command("benchmark_search_publishing", pages=2, publisher="outbox", stdout=stdout)
+
+        self.assertIn("Published 2 page(s) with OutboxPublisher", stdout.getvalue())
+        self.assertFalse(SearchIndexEvent.objects.exists())
+
+    @override_settings(SEARCH_INDEX_OUTBOX_ENABLED=False, SEARCH_INDEX_PUBLISHER_BACKEND="kafka")
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_configured_kafka_publisher_is_rejected(self, mock_producer_class):
+        get_publisher.cache_clear()
+        get_backend_publisher.cache_clear()
+        self.addCleanup(get_publisher.cache_clear)
+        self.addCleanup(get_backend_publisher.cache_clear)
+        page_count = InformationPage.objects.count()
+
+        with self.assertRaisesMessage(CommandError, "--publisher=configured cannot be used with Kafka"):
+            call_command("benchmark_search_publishing", pages=2, publisher="configured")
+
+        mock_producer_class.return_value.send.assert_not_called()
+        self.assertEqual(InformationPage.objects.count(), page_count)
+
+    def test_pages_must_be_positive(self):
+        with self.assertRaisesMessage(CommandError, "--pages must be at least 1."):
+            call_command("benchmark_search_publishing", pages=0)
@@ -0,0 +1,236 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from cms.search.models import SearchIndexEvent
+from cms.search.outbox import CLAIM_TIMEOUT, relay_pending_events
+from cms.search.publishers import InMemoryPublisher, KafkaPublisher, LogPublisher, OutboxPublisher
+from cms.search.signal_handlers import get_backend_publisher, get_publisher
+from cms.search.tests.helpers import ResourceDictAssertions
+from cms.search.utils import build_page_uri
+from cms.standard_pages.tests.factories import InformationPageFactory
+
+
+class OutboxPublisherTests(TestCase, ResourceDictAssertions):
+    @classmethod
+    def setUpTestData(cls):
+        cls.information_page = InformationPageFactory()
+
+    def setUp(self):
+        SearchIndexEvent.objects.all().delete()
+        self.publisher = OutboxPublisher()
+
+    def test_publish_created_or_updated_records_event(self):
+        self.publisher.publish_created_or_updated(self.information_page)
+
+        event = SearchIndexEvent.objects.get()
+        self.assertEqual(event.channel, "search-content-updated")
+        self.assertEqual(event.key, build_page_uri(self.information_page))
+        self.assert_base_fields(event.payload, self.information_page)
+
+    def test_publish_deleted_records_event(self):
+        self.publisher.publish_deleted(self.information_page)
+
+        event = SearchIndexEvent.objects.get()
+        self.assertEqual(event.channel, "search-content-deleted")
+        self.assertEqual(event.payload, {"uri": self.information_page.url_path})
+
+    def test_no_event_is_recorded_for_rolled_back_transactions(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.publisher.publish_created_or_updated(self.information_page)
+            raise RuntimeError("Rollback")
+
+        self.assertFalse(SearchIndexEvent.objects.exists())
+
+    def test_publishing_a_page_records_an_event(self):
+        with override_settings(SEARCH_INDEX_OUTBOX_ENABLED=True):
+            get_publisher.cache_clear()
+            self.addCleanup(get_publisher.cache_clear)
+
+            self.information_page.save_revision().publish()
+
+        self.assertTrue(SearchIndexEvent.objects.filter(channel="search-content-updated").exists())
+
+
+class GetPublisherTests(TestCase):
+    def setUp(self):
+        get_publisher.cache_clear()
+        get_backend_publisher.cache_clear()
+        self.addCleanup(get_publisher.cache_clear)
+        self.addCleanup(get_backend_publisher.cache_clear)
+
+    @override_settings(SEARCH_INDEX_OUTBOX_ENABLED=True)
+    def test_outbox_enabled(self):
+        self.assertIsInstance(get_publisher(), OutboxPublisher)
+
+    @override_settings(SEARCH_INDEX_OUTBOX_ENABLED=False, SEARCH_INDEX_PUBLISHER_BACKEND="log")
+    def test_outbox_disabled(self):
+        self.assertIsInstance(get_publisher(), LogPublisher)
+
+    @override_settings(SEARCH_INDEX_PUBLISHER_BACKEND="memory")
+    def test_memory_backend_publisher(self):
+        self.assertIsInstance(get_backend_publisher(), InMemoryPublisher)
+
+    @override_settings(SEARCH_INDEX_PUBLISHER_BACKEND="kafka")
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_backend_publisher(self, _mock_producer_class):
+        self.assertIsInstance(get_backend_publisher(), KafkaPublisher)
+
+
+class RelayPendingEventsTests(TestCase):
+    def setUp(self):
+        SearchIndexEvent.objects.all().delete()
+        self.events = [
+            SearchIndexEvent.objects.create(
+                channel="search-content-updated", key=f"/page-{i}/", payload={"uri": f"/page-{i}/"}
+            )
+            for i in range(3)
+        ]
+        self.publisher = MagicMock()
+
+    def test_relays_events_in_order_and_removes_them(self):
+        relayed = relay_pending_events(self.publisher, batch_size=10)
+
+        self.assertEqual(relayed, 3)
+        self.publisher.publish_messages.assert_called_once_with(
+            "search-content-updated",
+            [event.payload for event in self.events],
+            keys=[event.key for event in self.events],
+        )
+        self.assertFalse(SearchIndexEvent.objects.exists())
+
+    def test_consecutive_events_are_grouped_by_channel(self):
+        deleted = SearchIndexEvent.objects.create(channel="search-content-deleted", payload={"uri": "/page-0/"})
+        updated = SearchIndexEvent.objects.create(channel="search-content-updated", payload={"uri": "/page-0/"})
+
+        relay_pending_events(self.publisher, batch_size=10)
+
+        self.assertEqual(
+            [call.args for call in self.publisher.publish_messages.call_args_list],
+            [
+                ("search-content-updated", [event.payload for event in self.events]),
+                ("search-content-deleted", [deleted.payload]),
+                ("search-content-updated", [updated.payload]),
+            ],
+        )
+
+    def test_relays_up_to_batch_size(self):
+        relayed = relay_pending_events(self.publisher, batch_size=2)
+
+        self.assertEqual(relayed, 2)
+        self.assertEqual(list(SearchIndexEvent.objects.values_list("pk", flat=True)), [self.events[2].pk])
+
+    def test_failure_keeps_the_failed_and_following_events(self):
+        failing = SearchIndexEvent.objects.create(channel="search-content-deleted", payload={"uri": "/page-0/"})
+        following = SearchIndexEvent.objects.create(channel="search-content-updated", payload={"uri": "/page-0/"})
+        self.publisher.publish_messages.side_effect = [
+            None,
+            RuntimeError("Broker unavailable"),
+            RuntimeError("Broker unavailable"),
+        ]
+
+        with self.assertLogs("cms.search.outbox", level="ERROR"):
+            relayed = relay_pending_events(self.publisher, batch_size=10)
+
+        self.assertEqual(relayed, 3)
+        self.assertEqual(self.publisher.publish_messages.call_count, 3)
+        self.assertEqual(list(SearchIndexEvent.objects.values_list("pk", flat=True)), [failing.pk, following.pk])
+
+        failing.refresh_from_db()
+        self.assertEqual(failing.attempts, 1)
+        self.assertEqual(failing.last_error, "Broker unavailable")
+        self.assertIsNotNone(failing.last_attempted_at)
+        following.refresh_from_db()
+        self.assertEqual(following.attempts, 0)
+
+    def test_failed_group_is_sent_one_by_one(self):
+        self.publisher.publish_messages.side_effect = [
+            RuntimeError("Message too large"),
+            None,
+            RuntimeError("Message too large"),
+        ]
+
+        with self.assertLogs("cms.search.outbox", level="ERROR"):
+            relayed = relay_pending_events(self.publisher, batch_size=10)
+
+        self.assertEqual(relayed, 1)
+        self.assertEqual(
+            [call.args for call in self.publisher.publish_messages.call_args_list[1:]],
+            [
+                ("search-content-updated", [self.events[0].payload]),
+                ("search-content-updated", [self.events[1].payload]),
+            ],
+        )
+        self.assertEqual(
+            dict(SearchIndexEvent.objects.values_list("pk", "attempts")), {self.events[1].pk: 1, self.events[2].pk: 0}
+        )
+
+    @override_settings(SEARCH_INDEX_OUTBOX_MAX_ATTEMPTS=2)
+    def test_events_are_dead_lettered_after_the_last_attempt(self):
+        SearchIndexEvent.objects.filter(pk=self.events[0].pk).update(attempts=1)
+        self.publisher.publish_messages.side_effect = RuntimeError("Message too large")
+
+        with self.assertLogs("cms.search.outbox", level="ERROR") as logs:
+            relay_pending_events(self.publisher, batch_size=10)
+
+        self.assertEqual(logs.records[-1].event, "search_event_dead_lettered")
+        self.events[0].refresh_from_db()
+        self.assertEqual(self.events[0].attempts, 2)
+        self.assertIsNotNone(self.events[0].dead_lettered_at)
+
+        self.publisher.publish_messages.side_effect = None
+        relayed = relay_pending_events(self.publisher, batch_size=10)
+
+        self.assertEqual(relayed, 2)
+        self.assertEqual(list(SearchIndexEvent.objects.values_list("pk", flat=True)), [self.events[0].pk])
+
+    @override_settings(SEARCH_INDEX_OUTBOX_MAX_ATTEMPTS=0)
+    def test_events_are_retried_forever_without_max_attempts(self):
+        SearchIndexEvent.objects.filter(pk=self.events[0].pk).update(attempts=100)
+        self.publisher.publish_messages.side_effect = RuntimeError("Broker unavailable")
+
+        with self.assertLogs("cms.search.outbox", level="ERROR"):
+            relay_pending_events(self.publisher, batch_size=10)
+
+        self.events[0].refresh_from_db()
+        self.assertEqual(self.events[0].attempts, 101)
+        self.assertIsNone(self.events[0].dead_lettered_at)
+
+    def test_events_are_claimed_while_they_are_sent(self):
+        def check_claimed(*args, **kwargs):
+            self.assertFalse(SearchIndexEvent.objects.filter(claimed_at__isnull=True).exists())
+
+        self.publisher.publish_messages.side_effect = check_claimed
+
+        relay_pending_events(self.publisher, batch_size=10)
+
+        self.publisher.publish_messages.assert_called_once()
+
+    def test_events_claimed_by_another_relay_are_skipped(self):
+        SearchIndexEvent.objects.filter(pk=self.events[0].pk).update(claimed_at=timezone.now())
+
+        relayed = relay_pending_events(self.publisher, batch_size=10)
+
+        self.assertEqual(relayed, 2)
+        self.assertEqual(list(SearchIndexEvent.objects.values_list("pk", flat=True)), [self.events[0].pk])
+
+    def test_expired_claims_are_sent(self):
+        SearchIndexEvent.objects.filter(pk=self.events[0].pk).update(
+            claimed_at=timezone.now() - CLAIM_TIMEOUT - timedelta(seconds=1)
+        )
+
+        relayed = relay_pending_events(self.publisher, batch_size=10)
+
+        self.assertEqual(relayed, 3)
+
+    def test_failure_releases_the_claims(self):
+        self.publisher.publish_messages.side_effect = RuntimeError("Broker unavailable")
+
+        with self.assertLogs("cms.search.outbox", level="ERROR"):
+            relayed = relay_pending_events(self.publisher, batch_size=10)
+
+        self.assertEqual(relayed, 0)
+        self.assertFalse(SearchIndexEvent.objects.filter(claimed_at__isnull=False).exists())
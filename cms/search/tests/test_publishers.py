@@ -1,21 +1,34 @@
+import json
 import logging
+from collections import deque
 from unittest.mock import ANY, MagicMock, patch
 
 from django.test import TestCase, override_settings
+from kafka.errors import KafkaTimeoutError
+from kafka.partitioner.default import DefaultPartitioner, murmur2
 from wagtail.test.utils import WagtailTestUtils
 
 from cms.articles.tests.factories import StatisticalArticlePageFactory
 from cms.methodology.tests.factories import MethodologyPageFactory
 from cms.release_calendar.tests.factories import ReleaseCalendarPageFactory
-from cms.search.publishers import BasePublisher, IAMKafkaTokenProvider, KafkaPublisher, LogPublisher
+from cms.search.models import SearchIndexEvent
+from cms.search.publishers import (
+    BasePublisher,
+    IAMKafkaTokenProvider,
+    InMemoryPublisher,
+    KafkaPublisher,
+    LogPublisher,
+    get_partitioner,
+)
 from cms.search.tests.helpers import ResourceDictAssertions
+from cms.search.utils import build_page_uri
 from cms.standard_pages.tests.factories import IndexPageFactory, InformationPageFactory
 
 
 class DummyPublisher(BasePublisher):
     """Concrete subclass of BasePublisher for testing the shared functionality."""
 
-    def _publish(self, channel, message):
+    def _publish(self, channel, message, key=None):
         # We don't actually publish in tests; we just want to spy on the calls.
         pass
 
@@ -82,9 +95,48 @@ class KafkaPublisherTests(TestCase, ResourceDictAssertions):
             bootstrap_servers=["localhost:9092"],
             api_version=(3, 5, 1),
             value_serializer=ANY,
+            key_serializer=ANY,
             retries=5,
+            linger_ms=5,
+            batch_size=65536,
+            compression_type=None,
+            max_block_ms=2000,
         )
 
+    @override_settings(KAFKA_LINGER_MS=50, KAFKA_BATCH_SIZE=1024, KAFKA_COMPRESSION_TYPE="gzip")
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_kafka_publisher_init_with_tuning(self, mock_producer_class):
+        KafkaPublisher()
+        _, kwargs = mock_producer_class.call_args
+        self.assertEqual(kwargs["linger_ms"], 50)
+        self.assertEqual(kwargs["batch_size"], 1024)
+        self.assertEqual(kwargs["compression_type"], "gzip")
+
+    @override_settings(KAFKA_PARTITIONER="kafka.partitioner.default.DefaultPartitioner")
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_kafka_publisher_init_with_partitioner(self, mock_producer_class):
+        KafkaPublisher()
+        _, kwargs = mock_producer_class.call_args
+        self.assertIsInstance(kwargs["partitioner"], DefaultPartitioner)
+
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_key_serializer(self, mock_producer_class):
+        KafkaPublisher()
+        key_serializer = mock_producer_class.call_args.kwargs["key_serializer"]
+        self.assertEqual(key_serializer("/economy/"), b"/economy/")
+        self.assertIsNone(key_serializer(None))
+
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_messages_are_keyed_by_page_uri(self, mock_producer_class):
+        mock_producer = mock_producer_class.return_value
+        publisher = KafkaPublisher()
+
+        publisher.publish_created_or_updated(self.information_page)
+        publisher.publish_deleted(self.information_page)
+
+        uri = build_page_uri(self.information_page)
+        self.assertEqual([call.kwargs["key"] for call in mock_producer.send.call_args_list], [uri, uri])
+
     @patch("cms.search.publishers.KafkaProducer")
     def test_publish_created_or_updated(self, mock_producer_class):
         """Check that publish_created_or_updated sends to Kafka with the correct channel & message."""
@@ -107,7 +159,7 @@ class KafkaPublisherTests(TestCase, ResourceDictAssertions):
         self.assertEqual(channel_called, "search-content-updated")
         self.assert_base_fields(message_called, page)
 
-        mock_future.get.assert_called_once_with(timeout=10)
+        mock_future.get.assert_called_once_with(timeout=2)
         self.assertEqual(result, mock_future.get.return_value)
 
     @patch("cms.search.publishers.KafkaProducer")
@@ -132,7 +184,181 @@ class KafkaPublisherTests(TestCase, ResourceDictAssertions):
         self.assertIn("uri", message_called)
         self.assertEqual(message_called["uri"], page.url_path)
 
-        mock_future.get.assert_called_once_with(timeout=10)
+        mock_future.get.assert_called_once_with(timeout=2)
+
+    @override_settings(KAFKA_ASYNC_SEND=True)
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_publish_asynchronously(self, mock_producer_class):
+        """In async mode, the message is sent without waiting, and delivery is reported by callbacks."""
+        mock_future = mock_producer_class.return_value.send.return_value
+
+        publisher = KafkaPublisher()
+        result = publisher.publish_created_or_updated(self.information_page)
+
+        self.assertEqual(result, mock_future)
+        mock_future.get.assert_not_called()
+        mock_future.add_callback.assert_called_once_with(ANY, "search-content-updated")
+        mock_future.add_errback.assert_called_once_with(ANY, "search-content-updated", ANY)
+
+    @override_settings(KAFKA_ASYNC_SEND=True)
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_send_error_callback_logs_and_counts_failures(self, mock_producer_class):
+        mock_future = mock_producer_class.return_value.send.return_value
+
+        publisher = KafkaPublisher()
+        publisher.publish_created_or_updated(self.information_page)
+        errback, *errback_args = mock_future.add_errback.call_args.args
+
+        with self.assertLogs("cms.search.publishers", level="ERROR") as logs:
+            errback(*errback_args, RuntimeError("Broker unavailable"))
+
+        self.assertEqual(publisher.failed_count, 1)
+        self.assertEqual(logs.records[0].uri, build_page_uri(self.information_page))
+        self.assertEqual(logs.records[0].event, "search_publish_failed")
+
+    @override_settings(KAFKA_FLUSH_TIMEOUT=3)
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_flush(self, mock_producer_class):
+        KafkaPublisher().flush()
+        mock_producer_class.return_value.flush.assert_called_once_with(timeout=3)
+
+    @override_settings(KAFKA_SEND_TIMEOUT=4)
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_publish_messages_pipelines_sends(self, mock_producer_class):
+        """Check that publish_messages sends every message before waiting for the results."""
+        mock_producer = mock_producer_class.return_value
+        mock_futures = [MagicMock(), MagicMock()]
+        mock_producer.send.side_effect = mock_futures
+
+        publisher = KafkaPublisher()
+        publisher.publish_messages("search-content-updated", [{"uri": "/one/"}, {"uri": "/two/"}], keys=["/one/", None])
+
+        self.assertEqual(
+            [(call.args, call.kwargs) for call in mock_producer.send.call_args_list],
+            [
+                (("search-content-updated", {"uri": "/one/"}), {"key": "/one/"}),
+                (("search-content-updated", {"uri": "/two/"}), {"key": None}),
+            ],
+        )
+        mock_producer.flush.assert_called_once()
+        for mock_future in mock_futures:
+            mock_future.get.assert_called_once_with(timeout=4)
+
+    @override_settings(SEARCH_PUBLISH_CIRCUIT_BREAKER_THRESHOLD=2)
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_failed_messages_are_spooled_and_the_breaker_opens(self, mock_producer_class):
+        mock_producer = mock_producer_class.return_value
+        mock_producer.send.side_effect = KafkaTimeoutError("Broker unavailable")
+        publisher = KafkaPublisher()
+        pages = [self.information_page, *InformationPageFactory.create_batch(2)]
+
+        with self.assertLogs("cms.search", level="WARNING") as logs:
+            for page in pages:
+                publisher.publish_created_or_updated(page)
+
+        # The third message is spooled without trying to send it
+        self.assertEqual(mock_producer.send.call_count, 2)
+        self.assertTrue(publisher.circuit_breaker.is_open)
+        self.assertIn("circuit_breaker_opened", [record.event for record in logs.records])
+
+        events = SearchIndexEvent.objects.all()
+        self.assertEqual(len(events), 3)
+        for event, page in zip(events, pages, strict=True):
+            self.assertEqual(event.channel, "search-content-updated")
+            self.assertEqual(event.key, build_page_uri(page))
+            self.assert_base_fields(event.payload, page)
+
+    @override_settings(SEARCH_PUBLISH_CIRCUIT_BREAKER_THRESHOLD=3)
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_messages_are_spooled_after_earlier_spooled_messages_for_the_same_uri(self, mock_producer_class):
+        uri = build_page_uri(self.information_page)
+        SearchIndexEvent.objects.create(channel="search-content-updated", key=uri, payload={"uri": uri})
+        publisher = KafkaPublisher()
+
+        with self.assertLogs("cms.search", level="WARNING"):
+            publisher.publish_deleted(self.information_page)
+
+        mock_producer_class.return_value.send.assert_not_called()
+        self.assertEqual(
+            list(SearchIndexEvent.objects.values_list("channel", flat=True)),
+            ["search-content-updated", "search-content-deleted"],
+        )
+        self.assertFalse(publisher.circuit_breaker.is_open)
+
+    @override_settings(KAFKA_ASYNC_SEND=True, SEARCH_PUBLISH_CIRCUIT_BREAKER_THRESHOLD=1)
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_asynchronous_send_failures_open_the_breaker_without_spooling(self, mock_producer_class):
+        mock_future = mock_producer_class.return_value.send.return_value
+        publisher = KafkaPublisher()
+        publisher.publish_deleted(self.information_page)
+        errback, *errback_args = mock_future.add_errback.call_args.args
+
+        with self.assertLogs("cms.search", level="WARNING"):
+            errback(*errback_args, KafkaTimeoutError("Broker unavailable"))
+
+        self.assertTrue(publisher.circuit_breaker.is_open)
+        self.assertFalse(SearchIndexEvent.objects.exists())
+
+    @override_settings(SEARCH_PUBLISH_CIRCUIT_BREAKER_THRESHOLD=3)
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_batches_skip_the_uris_with_spooled_messages(self, mock_producer_class):
+        SearchIndexEvent.objects.create(channel="search-content-updated", key="/spooled/", payload={"uri": "/spooled/"})
+        publisher = KafkaPublisher()
+
+        with self.assertLogs("cms.search", level="WARNING"):
+            publisher.publish_messages_or_spool(
+                "search-content-updated", [{"uri": "/spooled/"}, {"uri": "/sent/"}], ["/spooled/", "/sent/"]
+            )
+
+        mock_producer_class.return_value.send.assert_called_once_with(
+            "search-content-updated", {"uri": "/sent/"}, key="/sent/"
+        )
+        self.assertEqual(list(SearchIndexEvent.objects.values_list("key", flat=True)), ["/spooled/", "/spooled/"])
+
+    @override_settings(SEARCH_PUBLISH_CIRCUIT_BREAKER_THRESHOLD=3)
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_failed_batches_are_spooled(self, mock_producer_class):
+        mock_producer_class.return_value.send.side_effect = KafkaTimeoutError("Broker unavailable")
+        publisher = KafkaPublisher()
+
+        with self.assertLogs("cms.search", level="WARNING"):
+            publisher.publish_messages_or_spool(
+                "search-content-updated", [{"uri": "/one/"}, {"uri": "/two/"}], ["/one/", "/two/"]
+            )
+
+        self.assertEqual(list(SearchIndexEvent.objects.values_list("key", flat=True)), ["/one/", "/two/"])
+
+    @override_settings(SEARCH_PUBLISH_CIRCUIT_BREAKER_THRESHOLD=1, SEARCH_PUBLISH_CIRCUIT_BREAKER_RESET_TIMEOUT=30)
+    @patch("cms.search.circuit_breaker.time.monotonic")
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_sending_resumes_after_the_reset_timeout(self, mock_producer_class, mock_monotonic):
+        mock_producer = mock_producer_class.return_value
+        mock_producer.send.side_effect = [KafkaTimeoutError("Broker unavailable"), MagicMock()]
+        mock_monotonic.return_value = 100
+        publisher = KafkaPublisher()
+
+        with self.assertLogs("cms.search", level="WARNING"):
+            publisher.publish_deleted(self.information_page)
+
+        # Once relayed, later messages for the page are sent directly again
+        self.assertEqual(SearchIndexEvent.objects.count(), 1)
+        SearchIndexEvent.objects.all().delete()
+        mock_monotonic.return_value = 130
+        publisher.publish_deleted(self.information_page)
+
+        self.assertEqual(mock_producer.send.call_count, 2)
+        self.assertFalse(publisher.circuit_breaker.is_open)
+        self.assertFalse(SearchIndexEvent.objects.exists())
+
+    @patch("cms.search.publishers.KafkaProducer")
+    def test_circuit_breaker_disabled_by_default(self, mock_producer_class):
+        mock_producer_class.return_value.send.side_effect = KafkaTimeoutError("Broker unavailable")
+        publisher = KafkaPublisher()
+
+        self.assertIsNone(publisher.circuit_breaker)
+        with self.assertRaises(KafkaTimeoutError):
+            publisher.publish_created_or_updated(self.information_page)
+        self.assertFalse(SearchIndexEvent.objects.exists())
 
     def test_token_provider_cache_key(self):
         token_provider = IAMKafkaTokenProvider()
@@ -191,3 +417,68 @@ class LogPublisherTests(TestCase, ResourceDictAssertions):
         msg_dict = last_call_args[2]
         self.assertIn("uri", msg_dict, "Payload dict missing expected key 'uri'")
         self.assertEqual(msg_dict["uri"], self.information_page.url_path)
+
+
+@override_settings(SEARCH_INDEX_MEMORY_BROKER_LATENCY_MS=0)
+class InMemoryPublisherTests(TestCase, ResourceDictAssertions):
+    @classmethod
+    def setUpTestData(cls):
+        cls.information_page = InformationPageFactory()
+
+    def test_publish_created_or_updated(self):
+        publisher = InMemoryPublisher()
+
+        publisher.publish_created_or_updated(self.information_page)
+
+        self.assertEqual(publisher.message_count, 1)
+        self.assertEqual(publisher.request_count, 1)
+        [(channel, _partition, key, value)] = publisher.recent_messages
+        self.assertEqual(channel, "search-content-updated")
+        self.assertEqual(key, build_page_uri(self.information_page).encode("utf-8"))
+        self.assert_base_fields(json.loads(value), self.information_page)
+
+    def test_messages_for_the_same_key_go_to_the_same_partition(self):
+        publisher = InMemoryPublisher()
+
+        publisher.publish_messages("search-content-updated", [{"uri": "/one/"}, {"uri": "/two/"}], keys=["/a/", "/a/"])
+
+        self.assertEqual(list(publisher.message_counts.values()), [2])
+
+    @override_settings(KAFKA_BATCH_SIZE=50)
+    def test_messages_are_sent_in_batches(self):
+        publisher = InMemoryPublisher()
+        publisher.partitions = [0]
+
+        publisher.publish_messages("search-content-updated", [{"uri": f"/page-{i}/"} for i in range(5)])
+
+        self.assertEqual(publisher.message_count, 5)
+        # Each message is 19 bytes, so a batch is full after 3 messages, and the rest are sent by the flush
+        self.assertEqual(publisher.request_count, 2)
+
+    def test_only_the_recent_messages_are_kept(self):
+        publisher = InMemoryPublisher()
+        publisher.partitions = [0]
+        publisher.recent_messages = deque(maxlen=2)
+
+        publisher.publish_messages("search-content-updated", [{"uri": f"/page-{i}/"} for i in range(5)])
+
+        self.assertEqual(publisher.message_count, 5)
+        self.assertEqual(
+            [json.loads(value)["uri"] for _channel, _partition, _key, value in publisher.recent_messages],
+            ["/page-3/", "/page-4/"],
+        )
+
+    @override_settings(SEARCH_INDEX_MEMORY_BROKER_LATENCY_MS=10)
+    @patch("cms.search.publishers.time.sleep")
+    def test_latency(self, mock_sleep):
+        InMemoryPublisher().publish_deleted(self.information_page)
+        mock_sleep.assert_called_once_with(0.01)
+
+
+class GetPartitionerTests(TestCase):
+    def test_default(self):
+        self.assertIsInstance(get_partitioner(), DefaultPartitioner)
+
+    @override_settings(KAFKA_PARTITIONER="kafka.partitioner.default.murmur2")
+    def test_callable(self):
+        self.assertIs(get_partitioner(), murmur2)
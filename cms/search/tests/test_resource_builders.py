@@ -8,8 +8,9 @@ from cms.articles.tests.factories import ArticleSeriesPageFactory, StatisticalAr
 from cms.methodology.tests.factories import MethodologyPageFactory
 from cms.release_calendar.enums import ReleaseStatus
 from cms.release_calendar.tests.factories import ReleaseCalendarPageFactory
+from cms.search.serializers import ResourceSerializer
 from cms.search.tests.helpers import ResourceDictAssertions
-from cms.search.utils import build_resource_dict
+from cms.search.utils import build_resource_dict, get_indexable_pages, get_topic_ids_by_page
 from cms.standard_pages.tests.factories import IndexPageFactory, InformationPageFactory
 from cms.taxonomy.models import GenericPageToTaxonomyTopic, Topic
 
@@ -240,3 +241,34 @@ class ResourceBuildersTestCase(TestCase, ResourceDictAssertions):
 
         self.assert_base_fields(article_data, self.article_page)
         self.assertEqual(article_data["topics"], [self.topic_a.id, self.topic_b.id])
+
+    def test_get_topic_ids_by_page(self):
+        pages = [self.info_page, self.article_page, self.methodology_page, self.index_page]
+
+        with self.assertNumQueries(2):
+            topic_ids = get_topic_ids_by_page(pages)
+
+        self.assertEqual(
+            topic_ids,
+            {
+                self.info_page.pk: [self.topic_a.id, self.topic_b.id],
+                self.article_page.pk: [self.topic_a.id, self.topic_b.id],
+                self.methodology_page.pk: [],
+            },
+        )
+
+    def test_list_serializer_matches_single_serializer(self):
+        """Serializing a list of pages in one go gives the same result as serializing them one by one."""
+        self.release_page_confirmed.changes_to_release_date = [
+            {
+                "type": "date_change_log",
+                "value": {"previous_date": timezone.now() - timedelta(days=5), "reason_for_change": "Reason 1"},
+            },
+        ]
+        self.release_page_confirmed.save()
+        pages = list(get_indexable_pages().order_by("pk").specific().defer_streamfields())
+
+        data = ResourceSerializer(pages, many=True).data
+
+        self.assertEqual(data, [build_resource_dict(page) for page in get_indexable_pages().order_by("pk").specific()])
+        self.assertEqual(len(data[pages.index(self.release_page_confirmed)]["date_changes"]), 1)
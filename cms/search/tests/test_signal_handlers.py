@@ -1,8 +1,8 @@
 from unittest.mock import patch
 
 from django.db.models.signals import post_delete
-from django.test import TestCase
-from wagtail.models import Page
+from django.test import TestCase, override_settings
+from wagtail.models import Page, PageViewRestriction
 from wagtail.signals import page_published, page_unpublished
 
 from cms.articles.tests.factories import ArticleSeriesPageFactory, StatisticalArticlePageFactory
@@ -10,7 +10,12 @@ from cms.home.models import HomePage
 from cms.methodology.tests.factories import MethodologyPageFactory
 from cms.release_calendar.models import ReleaseCalendarIndex
 from cms.release_calendar.tests.factories import ReleaseCalendarPageFactory
+from cms.search.models import SearchResource, SearchResourceTombstone
+from cms.search.serializers import store_search_resources
+from cms.search.utils import build_page_uri, build_resource_dict
 from cms.standard_pages.tests.factories import IndexPageFactory, InformationPageFactory
+from cms.taxonomy.models import GenericPageToTaxonomyTopic
+from cms.taxonomy.tests.factories import TopicFactory
 from cms.themes.tests.factories import ThemePageFactory
 from cms.topics.tests.factories import TopicPageFactory
 
@@ -54,7 +59,9 @@ class SearchSignalsTest(TestCase):
         """Included pages should trigger publish_created_or_updated."""
         for page in self.included_pages:
             page_published.send(sender=type(page), instance=page)
-            self.mock_publisher.publish_created_or_updated.assert_called_once_with(page)
+            self.mock_publisher.publish_created_or_updated.assert_called_once_with(
+                page, message=build_resource_dict(page)
+            )
             self.mock_publisher.publish_created_or_updated.reset_mock()
 
     def test_on_page_unpublished_excluded_page_type(self):
@@ -71,6 +78,61 @@ class SearchSignalsTest(TestCase):
             self.mock_publisher.publish_deleted.assert_called_once_with(page)
             self.mock_publisher.publish_deleted.reset_mock()
 
+    def test_on_page_unpublished_records_tombstone(self):
+        page = self.included_pages[0]
+        page_unpublished.send(sender=type(page), instance=page)
+
+        tombstone = SearchResourceTombstone.objects.get()
+        self.assertEqual(tombstone.uri, build_page_uri(page))
+        self.assertEqual(tombstone.page_id, page.pk)
+
+    def test_on_page_unpublished_excluded_page_type_does_not_record_tombstone(self):
+        for page in self.excluded_pages:
+            page_unpublished.send(sender=type(page), instance=page)
+
+        self.assertFalse(SearchResourceTombstone.objects.exists())
+
+    def test_on_page_published_clears_tombstone(self):
+        page = self.included_pages[0]
+        page_unpublished.send(sender=type(page), instance=page)
+        page_unpublished.send(sender=type(page), instance=page)
+        self.assertEqual(SearchResourceTombstone.objects.count(), 1)
+
+        page_published.send(sender=type(page), instance=page)
+
+        self.assertFalse(SearchResourceTombstone.objects.exists())
+
+    @override_settings(SEARCH_API_USE_PRECOMPUTED_RESOURCES=True)
+    def test_on_page_published_stores_search_resource(self):
+        for page in self.included_pages:
+            page_published.send(sender=type(page), instance=page)
+
+            resource = SearchResource.objects.get(page=page)
+            self.assertEqual(resource.payload, build_resource_dict(page))
+            self.assertEqual(resource.last_published_at, page.last_published_at)
+
+    @override_settings(SEARCH_API_USE_PRECOMPUTED_RESOURCES=True)
+    def test_on_page_published_excluded_page_type_does_not_store_search_resource(self):
+        for page in self.excluded_pages:
+            page_published.send(sender=type(page), instance=page)
+
+        self.assertFalse(SearchResource.objects.exists())
+
+    def test_on_page_published_does_not_store_search_resource_when_disabled(self):
+        page = self.included_pages[0]
+        page_published.send(sender=type(page), instance=page)
+
+        self.assertFalse(SearchResource.objects.exists())
+
+    @override_settings(SEARCH_API_USE_PRECOMPUTED_RESOURCES=True)
+    def test_on_page_unpublished_removes_search_resource(self):
+        page = self.included_pages[0]
+        page_published.send(sender=type(page), instance=page)
+
+        page_unpublished.send(sender=type(page), instance=page)
+
+        self.assertFalse(SearchResource.objects.filter(page=page).exists())
+
     def test_on_page_deleted_excluded_page_type(self):
         """Excluded pages should not trigger publish_deleted on delete."""
         for page in self.excluded_pages:
@@ -85,6 +147,11 @@ class SearchSignalsTest(TestCase):
             self.mock_publisher.publish_deleted.assert_called_once_with(page)
             self.mock_publisher.publish_deleted.reset_mock()
 
+        self.assertEqual(
+            set(SearchResourceTombstone.objects.values_list("uri", flat=True)),
+            {build_page_uri(page) for page in self.included_pages},
+        )
+
     def test_on_page_deleted_draft_page(self):
         """Draft pages should not trigger publish_deleted on delete."""
         for page in self.included_pages:
@@ -95,3 +162,116 @@ class SearchSignalsTest(TestCase):
             # Fire the Django post_delete signal for a Wagtail Page
             post_delete.send(sender=Page, instance=page)
             self.mock_publisher.publish_deleted.assert_not_called()
+
+
+class SearchTombstoneSignalsTest(TestCase):
+    """Tombstones are also left when pages stop being listed at a URI without being unpublished."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.index_page = IndexPageFactory(slug="old-index")
+        cls.other_index_page = IndexPageFactory(slug="other-index")
+        cls.page = InformationPageFactory(parent=cls.index_page, slug="info")
+
+    def setUp(self):
+        super().setUp()
+
+        get_publisher_patcher = patch("cms.search.signal_handlers.get_publisher")
+        get_publisher_patcher.start()
+        self.addCleanup(get_publisher_patcher.stop)
+
+    def test_moving_a_page_records_tombstones_at_the_old_uris(self):
+        old_uris = {build_page_uri(self.index_page), build_page_uri(self.page)}
+        SearchResourceTombstone.objects.create(uri="/other-index/old-index/info/")
+
+        self.index_page.move(self.other_index_page, pos="last-child")
+
+        self.assertEqual(set(SearchResourceTombstone.objects.values_list("uri", flat=True)), old_uris)
+        self.assertEqual(
+            SearchResourceTombstone.objects.get(uri=build_page_uri(self.page)).page_id,
+            self.page.pk,
+        )
+
+    def test_reordering_a_page_does_not_record_tombstones(self):
+        self.other_index_page.move(self.index_page, pos="left")
+
+        self.assertFalse(SearchResourceTombstone.objects.exists())
+
+    def test_changing_a_page_slug_records_tombstones_at_the_old_uris(self):
+        old_uris = {build_page_uri(self.index_page), build_page_uri(self.page)}
+
+        self.index_page.slug = "new-index"
+        # page_slug_changed is sent once the transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.index_page.save_revision().publish()
+
+        self.assertEqual(set(SearchResourceTombstone.objects.values_list("uri", flat=True)), old_uris)
+
+    def test_making_a_page_private_records_tombstones(self):
+        PageViewRestriction.objects.create(page=self.index_page, restriction_type=PageViewRestriction.LOGIN)
+
+        self.assertEqual(
+            set(SearchResourceTombstone.objects.values_list("uri", flat=True)),
+            {build_page_uri(self.index_page), build_page_uri(self.page)},
+        )
+
+    def test_making_a_page_public_again_clears_tombstones(self):
+        restriction = PageViewRestriction.objects.create(
+            page=self.index_page, restriction_type=PageViewRestriction.LOGIN
+        )
+
+        restriction.delete()
+
+        self.assertFalse(SearchResourceTombstone.objects.exists())
+
+
+@override_settings(SEARCH_API_USE_PRECOMPUTED_RESOURCES=True)
+class SearchResourceSignalsTest(TestCase):
+    """The stored Resource API payloads are kept up to date when pages change without being published."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.index_page = IndexPageFactory(slug="old-index")
+        cls.other_index_page = IndexPageFactory(slug="other-index")
+        cls.page = InformationPageFactory(parent=cls.index_page, slug="info")
+        store_search_resources([cls.index_page, cls.page])
+
+    def setUp(self):
+        super().setUp()
+
+        get_publisher_patcher = patch("cms.search.signal_handlers.get_publisher")
+        get_publisher_patcher.start()
+        self.addCleanup(get_publisher_patcher.stop)
+
+    def test_moving_a_page_refreshes_its_resources_and_those_of_its_descendants(self):
+        self.index_page.move(self.other_index_page, pos="last-child")
+
+        self.assertEqual(SearchResource.objects.get(page=self.page).payload["uri"], "/other-index/old-index/info/")
+        self.assertEqual(SearchResource.objects.get(page=self.index_page).payload["uri"], "/other-index/old-index/")
+
+    def test_making_a_page_private_removes_its_resources(self):
+        PageViewRestriction.objects.create(page=self.index_page, restriction_type=PageViewRestriction.LOGIN)
+
+        self.assertFalse(SearchResource.objects.exists())
+
+    def test_making_a_page_public_again_stores_its_resources(self):
+        restriction = PageViewRestriction.objects.create(
+            page=self.index_page, restriction_type=PageViewRestriction.LOGIN
+        )
+
+        restriction.delete()
+
+        self.assertEqual(
+            set(SearchResource.objects.values_list("page_id", flat=True)), {self.index_page.pk, self.page.pk}
+        )
+
+    def test_publishing_an_article_series_refreshes_the_topics_of_its_articles(self):
+        article = StatisticalArticlePageFactory()
+        series = article.get_parent().specific
+        store_search_resources([article])
+        topic = TopicFactory()
+
+        GenericPageToTaxonomyTopic.objects.create(page=series, topic=topic)
+        page_published.send(sender=type(series), instance=series)
+
+        self.assertEqual(SearchResource.objects.get(page=article).payload["topics"], [str(topic.id)])
@@ -0,0 +1,93 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from cms.articles.models import ArticleSeriesPage
+from cms.articles.tests.factories import ArticleSeriesPageFactory, StatisticalArticlePageFactory
+from cms.home.models import HomePage
+from cms.release_calendar.models import ReleaseCalendarPage
+from cms.search.utils import (
+    filter_pages_by_topic,
+    get_excluded_page_models,
+    get_indexable_content_type_ids_by_search_type,
+    get_indexable_page_content_type_ids,
+    get_indexable_page_models,
+    get_indexable_pages,
+    is_indexable_page_type,
+)
+from cms.standard_pages.models import InformationPage
+from cms.standard_pages.tests.factories import InformationPageFactory
+from cms.taxonomy.models import GenericPageToTaxonomyTopic, Topic
+from cms.topics.tests.factories import TopicPageFactory
+
+
+class IndexablePageTypesTests(TestCase):
+    def test_excluded_and_indexable_page_models(self):
+        self.assertIn(HomePage, get_excluded_page_models())
+        self.assertIn(ArticleSeriesPage, get_excluded_page_models())
+        self.assertIn(InformationPage, get_indexable_page_models())
+        self.assertFalse(set(get_excluded_page_models()) & set(get_indexable_page_models()))
+
+    def test_indexable_page_content_type_ids(self):
+        content_type_ids = get_indexable_page_content_type_ids()
+
+        self.assertIn(ContentType.objects.get_for_model(InformationPage).pk, content_type_ids)
+        self.assertNotIn(ContentType.objects.get_for_model(HomePage).pk, content_type_ids)
+
+    def test_is_indexable_page_type(self):
+        information_page = InformationPage()
+        home_page = HomePage()
+        # Warm the registry, so that the checks themselves do not query
+        get_indexable_page_content_type_ids()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(is_indexable_page_type(information_page))
+            self.assertFalse(is_indexable_page_type(home_page))
+
+    def test_get_indexable_pages_filters_on_content_type_ids(self):
+        page = InformationPageFactory()
+        topic_page = TopicPageFactory()
+
+        pages = get_indexable_pages()
+
+        self.assertIn("content_type_id", str(pages.query))
+        self.assertIn(page.page_ptr, pages)
+        self.assertNotIn(topic_page.page_ptr, pages)
+
+    def test_indexable_content_type_ids_by_search_type(self):
+        content_type_ids = get_indexable_content_type_ids_by_search_type()
+
+        self.assertEqual(content_type_ids["release"], {ContentType.objects.get_for_model(ReleaseCalendarPage).pk})
+        self.assertEqual(content_type_ids["static_page"], {ContentType.objects.get_for_model(InformationPage).pk})
+        self.assertEqual(frozenset().union(*content_type_ids.values()), get_indexable_page_content_type_ids())
+
+
+class FilterPagesByTopicTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.topic = Topic(id="filter-topic", title="Filter topic")
+        Topic.save_new(cls.topic)
+        cls.other_topic = Topic(id="other-topic", title="Other topic")
+        Topic.save_new(cls.other_topic)
+
+        cls.tagged_page = InformationPageFactory()
+        GenericPageToTaxonomyTopic.objects.create(page=cls.tagged_page, topic=cls.topic)
+        cls.other_page = InformationPageFactory()
+        GenericPageToTaxonomyTopic.objects.create(page=cls.other_page, topic=cls.other_topic)
+
+        cls.series = ArticleSeriesPageFactory()
+        GenericPageToTaxonomyTopic.objects.create(page=cls.series, topic=cls.topic)
+        cls.article = StatisticalArticlePageFactory(parent=cls.series)
+        cls.other_article = StatisticalArticlePageFactory()
+
+    def test_lists_tagged_pages_and_articles_in_tagged_series(self):
+        pages = filter_pages_by_topic(get_indexable_pages(), self.topic.pk)
+
+        self.assertEqual(set(pages), {self.tagged_page.page_ptr, self.article.page_ptr})
+
+    def test_matches_the_resource_topics(self):
+        for page in (self.tagged_page, self.other_page, self.article, self.other_article):
+            with self.subTest(page=page):
+                self.assertEqual(
+                    filter_pages_by_topic(get_indexable_pages(), self.topic.pk).filter(pk=page.pk).exists(),
+                    self.topic.pk in page.topic_ids,
+                )
@@ -1,7 +1,9 @@
 from django.urls import path
 
-from .views import ResourceListView
+from .views import DeletedResourceListView, ResourceExportView, ResourceListView
 
 urlpatterns = [
     path("v1/resources/", ResourceListView.as_view(), name="resources-list"),
+    path("v1/resources/export/", ResourceExportView.as_view(), name="resources-export"),
+    path("v1/resources/deleted/", DeletedResourceListView.as_view(), name="resources-deleted-list"),
 ]
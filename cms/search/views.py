@@ -1,42 +1,242 @@
-from typing import TYPE_CHECKING
+import json
+from datetime import datetime
+from itertools import batched
+from typing import TYPE_CHECKING, cast
 
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from wagtail.models import Page
 
-from cms.settings.base import SEARCH_INDEX_EXCLUDED_PAGE_TYPES
-
-from .pagination import CustomLimitOffsetPagination
+from .models import SearchResource, SearchResourceTombstone
+from .pagination import CustomCursorPagination, CustomLimitOffsetPagination
 from .serializers import ResourceSerializer
-from .utils import get_model_by_name
+from .utils import filter_pages_by_topic, get_indexable_content_type_ids_by_search_type, get_indexable_pages
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from django.http import HttpRequest
+    from wagtail.query import PageQuerySet
+
+
+def get_since(request: "HttpRequest") -> datetime | None:
+    """Returns the ?since= ISO 8601 timestamp from the request, if given.
+    Timestamps without a timezone are taken to be in the current timezone.
+    """
+    if not (value := request.GET.get("since")):
+        return None
+
+    try:
+        since = parse_datetime(value)
+    except ValueError:
+        since = None
+    if since is None:
+        raise ValidationError({"since": "Enter a valid ISO 8601 date and time."})
+
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def filter_pages(request: "HttpRequest", pages: "PageQuerySet") -> "PageQuerySet":
+    """Applies the ?content_type=, ?topic= and ?locale= filters from the request, if given."""
+    if content_type := request.GET.get("content_type"):
+        content_type_ids_by_search_type = get_indexable_content_type_ids_by_search_type()
+        if content_type not in content_type_ids_by_search_type:
+            choices = ", ".join(sorted(content_type_ids_by_search_type))
+            raise ValidationError({"content_type": f"Enter one of: {choices}."})
+        pages = pages.filter(content_type_id__in=content_type_ids_by_search_type[content_type])
+
+    if topic := request.GET.get("topic"):
+        pages = filter_pages_by_topic(pages, topic)
+
+    if locale := request.GET.get("locale"):
+        pages = pages.filter(locale__language_code=locale)
+
+    return pages
 
 
 class ResourceListView(APIView):
-    """Provides the list of indexable Wagtail resources."""
+    """Provides the list of indexable Wagtail resources.
+
+    Paginated with limit/offset by default. Pass ?pagination=cursor to use keyset
+    pagination instead, which is cheaper for crawling the whole set.
+    Pass ?since=<ISO 8601 timestamp> to only list the resources published since then.
+    Pass ?content_type=<search content type>, ?topic=<topic id> or ?locale=<language code>
+    to only list the matching resources.
+
+    With SEARCH_API_USE_PRECOMPUTED_RESOURCES enabled, the resources are read from the
+    SearchResource table, rather than built from the pages on each request.
+
+    Responses have ETag and Last-Modified headers, based on when the resources last changed,
+    and conditional requests get a 304 response if nothing changed since.
+    """
 
     pagination_class = CustomLimitOffsetPagination
+    cursor_pagination_class = CustomCursorPagination
 
-    def get(self, request: "HttpRequest", *args: tuple, **kwargs: dict) -> Response:
+    def get(self, request: "HttpRequest", *args: tuple, **kwargs: dict) -> Response | HttpResponse:
         queryset = self.get_queryset()
 
-        paginator = self.pagination_class()
-        paginated_qs = paginator.paginate_queryset(queryset, request, view=self)
+        # Checked before loading any resources, so unchanged polls only cost the aggregate queries.
+        # Last-Modified only has a resolution of one second, and cannot reflect changes that do not
+        # make the listing newer, so only If-None-Match is answered with a 304 response.
+        etag, last_modified_at = self.get_validators(queryset)
+        if not_modified := get_conditional_response(request, etag=etag):
+            return not_modified
+
+        paginator = self.get_paginator(request)
+        paginated_qs = paginator.paginate_queryset(self.prepare_queryset(queryset), request, view=self)
+
+        data = self.serialize(paginated_qs)
 
-        data = []
-        for page in paginated_qs:
-            serializer = ResourceSerializer(page)
-            data.append(serializer.data)
+        response = paginator.get_paginated_response(data)
+        response["ETag"] = etag
+        if last_modified_at:
+            response["Last-Modified"] = http_date(last_modified_at.timestamp())
+        return response
 
-        return paginator.get_paginated_response(data)
+    def get_paginator(self, request: "HttpRequest") -> CustomLimitOffsetPagination | CustomCursorPagination:
+        if request.GET.get("pagination") == "cursor":
+            return self.cursor_pagination_class()
+        return self.pagination_class()
 
-    def get_queryset(self) -> list[Page]:
+    def get_queryset(self) -> "PageQuerySet | QuerySet[SearchResource]":
         """Returns a queryset of 'published' pages that are indexable,
-        excluding pages we do not want to index.
+        excluding pages we do not want to index, or of their precomputed resources.
         """
-        excluded_classes = [get_model_by_name(name) for name in SEARCH_INDEX_EXCLUDED_PAGE_TYPES]
-        qs: list[Page] = Page.objects.live().public().not_exact_type(*excluded_classes).specific().defer_streamfields()
+        if settings.SEARCH_API_USE_PRECOMPUTED_RESOURCES:
+            resources = SearchResource.objects.all()
+            if since := get_since(self.request):
+                resources = resources.filter(last_published_at__gte=since)
+            if any(self.request.GET.get(name) for name in ("content_type", "topic", "locale")):
+                resources = resources.filter(page_id__in=filter_pages(self.request, Page.objects.all()).values("pk"))
+            return resources
+
+        qs = filter_pages(self.request, get_indexable_pages())
+
+        if since := get_since(self.request):
+            qs = qs.filter(last_published_at__gte=since)
 
         return qs
+
+    def prepare_queryset(
+        self, queryset: "PageQuerySet | QuerySet[SearchResource]"
+    ) -> "PageQuerySet | QuerySet[SearchResource]":
+        """Returns the queryset that the listed items are loaded from, i.e. specific pages."""
+        if settings.SEARCH_API_USE_PRECOMPUTED_RESOURCES:
+            return queryset
+        return cast("PageQuerySet", queryset).specific().defer_streamfields()
+
+    def get_validators(self, queryset: "PageQuerySet | QuerySet[SearchResource]") -> tuple[str, datetime | None]:
+        """Returns the ETag of the listed resources, and when they last changed, that is the latest publication
+        in the queryset, or the latest unpublication or deletion, as a removal also changes the listing.
+
+        The ETag also includes:
+        - the number of listed resources, as a page can leave a filtered listing, e.g. ?topic=,
+          without a newer publication in it;
+        - the number of tombstones, as a page made public again only clears its tombstones;
+        - for precomputed resources, when they were last refreshed, e.g. after a move;
+        - otherwise, the latest publication of an article series, which changes the topics of
+          its statistical articles, as article series are not listed themselves.
+        Moves and privacy changes otherwise leave newer tombstones.
+        """
+        from cms.articles.models import ArticleSeriesPage  # pylint: disable=import-outside-toplevel
+
+        aggregates = {"latest_published_at": Max("last_published_at"), "count": Count("pk")}
+        if settings.SEARCH_API_USE_PRECOMPUTED_RESOURCES:
+            aggregates["latest_updated_at"] = Max("updated_at")
+        validators = queryset.aggregate(**aggregates)
+        if not settings.SEARCH_API_USE_PRECOMPUTED_RESOURCES:
+            validators |= Page.objects.filter(
+                live=True, content_type=ContentType.objects.get_for_model(ArticleSeriesPage)
+            ).aggregate(latest_series_published_at=Max("last_published_at"))
+        validators |= SearchResourceTombstone.objects.aggregate(
+            latest_deleted_at=Max("deleted_at"), tombstone_count=Count("pk")
+        )
+
+        last_modified_at = max(
+            filter(
+                None,
+                [
+                    validators["latest_published_at"],
+                    validators.get("latest_series_published_at"),
+                    validators["latest_deleted_at"],
+                ],
+            ),
+            default=None,
+        )
+        etag = "-".join(
+            str(value.timestamp() if isinstance(value, datetime) else value) for value in validators.values()
+        )
+        return quote_etag(etag), last_modified_at
+
+    def serialize(self, pages: list[Page] | list[SearchResource]) -> list[dict]:
+        if settings.SEARCH_API_USE_PRECOMPUTED_RESOURCES:
+            return [resource.payload for resource in pages]
+        data: list[dict] = ResourceSerializer(pages, many=True).data
+        return data
+
+
+class ResourceExportView(ResourceListView):
+    """Streams all the indexable resources as newline-delimited JSON, one resource per line,
+    so a full sync takes one request.
+
+    The queryset is iterated in chunks, so memory use stays flat however many resources there are.
+    Accepts the same ?since= parameter as ResourceListView.
+    """
+
+    chunk_size = 500
+
+    def get(self, request: "HttpRequest", *args: tuple, **kwargs: dict) -> StreamingHttpResponse:
+        # Built before streaming starts, so that an invalid ?since= still gets a 400 response.
+        queryset = self.prepare_queryset(self.get_queryset())
+        return StreamingHttpResponse(self.stream(queryset), content_type="application/x-ndjson")
+
+    def stream(self, queryset: "PageQuerySet | QuerySet[SearchResource]") -> "Iterator[str]":
+        for chunk in batched(queryset.iterator(chunk_size=self.chunk_size), self.chunk_size, strict=False):
+            for item in self.serialize(list(chunk)):
+                yield json.dumps(item, cls=DjangoJSONEncoder) + "\n"
+
+
+class DeletedResourceListView(ResourceListView):
+    """Provides the list of resources that were unpublished or deleted.
+
+    Pass ?since=<ISO 8601 timestamp> to only list the resources removed since then.
+    Together with ResourceListView, this lets consumers poll for changes only.
+    """
+
+    def get_queryset(self) -> QuerySet[SearchResourceTombstone]:
+        qs = SearchResourceTombstone.objects.all()
+
+        if since := get_since(self.request):
+            qs = qs.filter(deleted_at__gte=since)
+
+        return qs
+
+    def prepare_queryset(  # type: ignore[override]
+        self,
+        queryset: QuerySet[SearchResourceTombstone],
+    ) -> QuerySet[SearchResourceTombstone]:
+        return queryset
+
+    def get_validators(  # type: ignore[override]
+        self,
+        queryset: QuerySet[SearchResourceTombstone],
+    ) -> tuple[str, datetime | None]:
+        # Republishing a page removes its tombstone, so take the resources into account too
+        return super().get_validators(super().get_queryset())
+
+    def serialize(self, pages: list[SearchResourceTombstone]) -> list[dict]:  # type: ignore[override]
+        # The items are tombstones, but the base class's parameter name is kept for overriding
+        return [{"uri": tombstone.uri, "deleted_at": tombstone.deleted_at.isoformat()} for tombstone in pages]
@@ -963,6 +963,26 @@ START_TIME = datetime.datetime.now(tz=datetime.UTC)
 
 SLACK_NOTIFICATIONS_WEBHOOK_URL = env.get("SLACK_NOTIFICATIONS_WEBHOOK_URL")
 
+# How many pages of a bundle to publish concurrently. With more than 1, each page is published
+# and committed in its own thread and database connection, so the bundle is no longer published atomically.
+BUNDLE_PUBLISHING_MAX_WORKERS = int(env.get("BUNDLE_PUBLISHING_MAX_WORKERS", "1"))
+
+# How many pages of a bundle to publish and commit in one transaction, when publishing them one at a time.
+# 0 publishes the whole bundle in one transaction. Otherwise, each chunk is live once committed,
+# and a failed publication is retried from the first chunk that was not committed.
+BUNDLE_PUBLISHING_CHUNK_SIZE = int(env.get("BUNDLE_PUBLISHING_CHUNK_SIZE", "0"))
+
+# Whether bundles are published by the long-running bundle_scheduler command, rather than by
+# running publish_bundles every minute from the scheduler.
+BUNDLE_SCHEDULER_ENABLED = env.get("BUNDLE_SCHEDULER_ENABLED", "false").lower() == "true"
+# How often, in seconds, the bundle scheduler reloads the approved bundles, in case a change notification
+# was missed. Bundles that failed to publish are retried after the same delay.
+BUNDLE_SCHEDULER_RESYNC_INTERVAL = int(env.get("BUNDLE_SCHEDULER_RESYNC_INTERVAL", "60"))
+
+# How often, in seconds, each scheduler replica checks it is still the leader, or tries to become it.
+# The jobs that must not run concurrently only run on the leader.
+SCHEDULER_LEADER_ELECTION_INTERVAL = int(env.get("SCHEDULER_LEADER_ELECTION_INTERVAL", "10"))
+
 ONS_API_BASE_URL = env.get("ONS_API_BASE_URL", "https://api.beta.ons.gov.uk/v1")
 ONS_WEBSITE_BASE_URL = env.get("ONS_WEBSITE_BASE_URL", "https://www.ons.gov.uk")
 ONS_ORGANISATION_NAME = env.get("ONS_ORGANISATION_NAME", "Office for National Statistics")
@@ -976,6 +996,36 @@ SEARCH_INDEX_PUBLISHER_BACKEND = os.getenv("SEARCH_INDEX_PUBLISHER_BACKEND")
 KAFKA_SERVERS = os.getenv("KAFKA_SERVERS", "").split(",")
 KAFKA_USE_IAM_AUTH = os.getenv("KAFKA_USE_IAM_AUTH", "false").lower() == "true"
 KAFKA_API_VERSION = tuple(map(int, os.getenv("KAFKA_API_VERSION", "3.5.1").split(".")))
+# Producer tuning. See https://kafka-python.readthedocs.io/en/master/apidoc/KafkaProducer.html
+KAFKA_LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", "5"))
+KAFKA_BATCH_SIZE = int(os.getenv("KAFKA_BATCH_SIZE", "65536"))
+# One of "gzip", "snappy", "lz4" or "zstd". lz4 and zstd need the lz4 / zstandard packages installed.
+KAFKA_COMPRESSION_TYPE = os.getenv("KAFKA_COMPRESSION_TYPE") or None
+# Don't wait for each message to be acknowledged. Failures are logged by delivery callbacks.
+KAFKA_ASYNC_SEND = os.getenv("KAFKA_ASYNC_SEND", "false").lower() == "true"
+KAFKA_FLUSH_TIMEOUT = int(os.getenv("KAFKA_FLUSH_TIMEOUT", "30"))
+# How long to wait, in seconds, for a single message to be sent while a page is being published.
+KAFKA_SEND_TIMEOUT = float(os.getenv("KAFKA_SEND_TIMEOUT", "2"))
+# Messages are keyed by page URI. By default, partitions are assigned by a murmur2 hash of the key, like the Java
+# client, so all the messages for a page go to the same partition, in order. Set to the dotted path of a callable
+# taking (key_bytes, all_partitions, available_partitions) to use another partitioner.
+KAFKA_PARTITIONER = os.getenv("KAFKA_PARTITIONER") or None
+# The simulated round trip time of the "memory" backend, which stands in for Kafka in benchmarks.
+SEARCH_INDEX_MEMORY_BROKER_LATENCY_MS = float(os.getenv("SEARCH_INDEX_MEMORY_BROKER_LATENCY_MS", "5"))
+
+# Record search index messages in the database and relay them to the publisher backend
+# separately, rather than sending them while the page is being published.
+# This needs relay_search_index_events to run frequently, e.g. as a deployment of the scheduler.
+SEARCH_INDEX_OUTBOX_ENABLED = os.getenv("SEARCH_INDEX_OUTBOX_ENABLED", "false").lower() == "true"
+SEARCH_INDEX_OUTBOX_BATCH_SIZE = int(os.getenv("SEARCH_INDEX_OUTBOX_BATCH_SIZE", "100"))
+# How many times the relay tries to send an outbox message before dead lettering it, so that it no longer
+# holds up the messages recorded after it. Set to 0 to retry forever.
+SEARCH_INDEX_OUTBOX_MAX_ATTEMPTS = int(os.getenv("SEARCH_INDEX_OUTBOX_MAX_ATTEMPTS", "5"))
+# When sending directly to Kafka, stop trying after this many consecutive failures, and spool the messages
+# to the outbox instead, for the relay to send. Sending is retried after the reset timeout, in seconds.
+# Disabled by default (0), as spooled messages are only sent where relay_search_index_events runs frequently.
+SEARCH_PUBLISH_CIRCUIT_BREAKER_THRESHOLD = int(os.getenv("SEARCH_PUBLISH_CIRCUIT_BREAKER_THRESHOLD", "0"))
+SEARCH_PUBLISH_CIRCUIT_BREAKER_RESET_TIMEOUT = int(os.getenv("SEARCH_PUBLISH_CIRCUIT_BREAKER_RESET_TIMEOUT", "30"))
 
 SEARCH_INDEX_EXCLUDED_PAGE_TYPES = (
     "HomePage",
@@ -1000,6 +1050,16 @@ ALLOW_TEAM_MANAGEMENT = env.get("ALLOW_TEAM_MANAGEMENT", "false").lower() == "tr
 
 SEARCH_API_DEFAULT_PAGE_SIZE = int(os.getenv("SEARCH_API_DEFAULT_PAGE_SIZE", "20"))
 SEARCH_API_MAX_PAGE_SIZE = int(os.getenv("SEARCH_API_MAX_PAGE_SIZE", "500"))
+# How the Resource API computes total_count: "exact" counts the resources on each request, "cached" caches the
+# count for SEARCH_API_COUNT_CACHE_TIMEOUT seconds, and "estimated" uses the Postgres query planner estimate,
+# unless it is below SEARCH_API_COUNT_ESTIMATE_THRESHOLD. Clients can pass ?exact_count=true for an exact count.
+SEARCH_API_COUNT_STRATEGY = os.getenv("SEARCH_API_COUNT_STRATEGY", "exact")
+SEARCH_API_COUNT_CACHE_TIMEOUT = int(os.getenv("SEARCH_API_COUNT_CACHE_TIMEOUT", "60"))
+SEARCH_API_COUNT_ESTIMATE_THRESHOLD = int(os.getenv("SEARCH_API_COUNT_ESTIMATE_THRESHOLD", "10000"))
+
+# Serve the Resource API from the precomputed SearchResource table. Run the rebuild_search_resources
+# management command once before enabling.
+SEARCH_API_USE_PRECOMPUTED_RESOURCES = os.getenv("SEARCH_API_USE_PRECOMPUTED_RESOURCES", "false").lower() == "true"
 
 # Auth
 SERVICE_AUTH_TOKEN = env.get("SERVICE_AUTH_TOKEN")
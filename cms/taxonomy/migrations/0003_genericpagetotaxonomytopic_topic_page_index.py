@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("taxonomy", "0002_initial_data"),
+        ("wagtailcore", "0094_alter_page_locale"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="genericpagetotaxonomytopic",
+            index=models.Index(fields=["topic", "page"], name="taxonomy_topic_page_idx"),
+        ),
+        migrations.AlterField(
+            model_name="genericpagetotaxonomytopic",
+            name="topic",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="related_pages",
+                to="taxonomy.topic",
+            ),
+        ),
+    ]
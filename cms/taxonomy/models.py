@@ -97,7 +97,8 @@ class GenericPageToTaxonomyTopic(models.Model):
     """This model enables many-to-many relationships between pages and topics."""
 
     page = ParentalKey("wagtailcore.Page", related_name="topics")
-    topic = models.ForeignKey("taxonomy.Topic", on_delete=models.CASCADE, related_name="related_pages")
+    # Indexed together with the page below
+    topic = models.ForeignKey("taxonomy.Topic", on_delete=models.CASCADE, related_name="related_pages", db_index=False)
 
     panels: ClassVar[list[FieldPanel]] = [FieldPanel("topic")]
 
@@ -105,3 +106,5 @@ class GenericPageToTaxonomyTopic(models.Model):
         constraints: ClassVar[list[UniqueConstraint]] = [
             UniqueConstraint(fields=["page", "topic"], name="unique_generic_taxonomy")
         ]
+        # Covers the topic foreign key and the Resource API ?topic= filter, which reads the page ids
+        indexes: ClassVar[list[models.Index]] = [models.Index(fields=["topic", "page"], name="taxonomy_topic_page_idx")]
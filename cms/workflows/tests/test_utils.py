@@ -7,7 +7,13 @@ from cms.workflows.tests.utils import (
     mark_page_as_ready_for_review,
     mark_page_as_ready_to_publish,
 )
-from cms.workflows.utils import is_page_ready_to_preview, is_page_ready_to_publish
+from cms.workflows.utils import (
+    get_current_task_types,
+    get_pages_ready_to_preview,
+    get_pages_ready_to_publish,
+    is_page_ready_to_preview,
+    is_page_ready_to_publish,
+)
 
 
 class UtilsTestCase(TestCase):
@@ -53,3 +59,27 @@ class UtilsTestCase(TestCase):
         # Mark the page as ready to publish to put it in the ready to publish task
         mark_page_as_ready_to_publish(self.page)
         self.assertTrue(is_page_ready_to_publish(self.page))
+
+    def test_batch_readiness(self):
+        page_in_review = InformationPageFactory()
+        mark_page_as_ready_for_review(page_in_review)
+        page_ready_to_publish = InformationPageFactory()
+        mark_page_as_ready_to_publish(page_ready_to_publish)
+        page_ids = [self.page.pk, page_in_review.pk, page_ready_to_publish.pk]
+
+        self.assertEqual(
+            get_current_task_types(page_ids),
+            {page_in_review.pk: GroupReviewTask, page_ready_to_publish.pk: ReadyToPublishGroupTask},
+        )
+        self.assertEqual(get_pages_ready_to_preview(page_ids), {page_in_review.pk, page_ready_to_publish.pk})
+        self.assertEqual(get_pages_ready_to_publish(page_ids), {page_ready_to_publish.pk})
+
+    def test_batch_readiness_uses_one_query(self):
+        pages = InformationPageFactory.create_batch(3)
+        for page in pages:
+            mark_page_as_ready_to_publish(page)
+        # Warm up the content type cache
+        get_current_task_types([])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_pages_ready_to_publish(page.pk for page in pages), {page.pk for page in pages})
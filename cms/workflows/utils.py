@@ -1,9 +1,13 @@
+from collections.abc import Iterable
 from typing import TYPE_CHECKING
 
+from django.contrib.contenttypes.models import ContentType
+from wagtail.models import Page, WorkflowState
+
 from .models import GroupReviewTask, ReadyToPublishGroupTask
 
 if TYPE_CHECKING:
-    from wagtail.models import Page
+    from django.db.models import Model
 
 
 def is_page_ready_to_preview(page: "Page") -> bool:
@@ -18,3 +22,40 @@ def is_page_ready_to_publish(page: "Page") -> bool:
     workflow_state = page.current_workflow_state
 
     return workflow_state and isinstance(workflow_state.current_task_state.task.specific, ReadyToPublishGroupTask)
+
+
+def get_current_task_types(page_ids: Iterable[int]) -> dict[int, type["Model"]]:
+    """Returns the specific class of the current task of the pages in an active workflow, keyed by page id.
+
+    This is a batch version of page.current_workflow_state.current_task_state.task.specific, that uses
+    a single query, whatever the number of pages. Pages that are not in an active workflow are left out.
+    """
+    page_content_type = ContentType.objects.get_for_model(Page)
+    current_tasks = (
+        WorkflowState.objects.active()
+        .filter(base_content_type=page_content_type, object_id__in=[str(page_id) for page_id in page_ids])
+        .values_list("object_id", "current_task_state__task__content_type")
+    )
+    task_types: dict[int, type[Model]] = {}
+    for object_id, content_type_id in current_tasks:
+        if content_type_id and (task_type := ContentType.objects.get_for_id(content_type_id).model_class()):
+            task_types[int(object_id)] = task_type
+    return task_types
+
+
+def get_pages_ready_to_preview(page_ids: Iterable[int]) -> set[int]:
+    """Returns the ids of the given pages that are ready to preview, like is_page_ready_to_preview()."""
+    return {
+        page_id
+        for page_id, task_type in get_current_task_types(page_ids).items()
+        if issubclass(task_type, GroupReviewTask | ReadyToPublishGroupTask)
+    }
+
+
+def get_pages_ready_to_publish(page_ids: Iterable[int]) -> set[int]:
+    """Returns the ids of the given pages that are ready to publish, like is_page_ready_to_publish()."""
+    return {
+        page_id
+        for page_id, task_type in get_current_task_types(page_ids).items()
+        if issubclass(task_type, ReadyToPublishGroupTask)
+    }